@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 import sys
 import os
 import warnings
-import ruamel.yaml as yaml
+import importlib
 
 __author__ = "Pymatgen Development Team"
 __email__ ="pymatgen@googlegroups.com"
@@ -17,6 +17,7 @@ SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".pmgrc.yaml")
 
 def _load_pmg_settings():
     try:
+        import ruamel.yaml as yaml
         with open(SETTINGS_FILE, "rt") as f:
             d = yaml.safe_load(f)
     except IOError:
@@ -39,8 +40,6 @@ def _load_pmg_settings():
             clean_d[k] = v
     return clean_d
 
-SETTINGS = _load_pmg_settings()
-
 
 # Order of imports is important on some systems to avoid
 # failures when loading shared libraries.
@@ -49,12 +48,52 @@ SETTINGS = _load_pmg_settings()
 # del(spglib, optimization, util)
 
 # Useful aliases for commonly used objects and modules.
-# Allows from pymatgen import <class> for quick usage.
-
-from pymatgen.core import *
-from .electronic_structure.core import Spin, Orbital
-from .ext.matproj import MPRester
-from monty.json import MontyEncoder, MontyDecoder, MSONable
+# Allows from pymatgen import <class> for quick usage. On Python >= 3.7,
+# the aliases and SETTINGS are only loaded when first accessed (PEP 562), so
+# that importing pymatgen or one of its submodules does not pay for
+# importing all of pymatgen.core, the Materials Project REST interface and
+# the settings file parser.
+_LAZY_ATTRIBUTES = {
+    "Element": "pymatgen.core", "Specie": "pymatgen.core",
+    "DummySpecie": "pymatgen.core", "Composition": "pymatgen.core",
+    "Structure": "pymatgen.core", "IStructure": "pymatgen.core",
+    "Molecule": "pymatgen.core", "IMolecule": "pymatgen.core",
+    "Lattice": "pymatgen.core", "Site": "pymatgen.core",
+    "PeriodicSite": "pymatgen.core", "SymmOp": "pymatgen.core",
+    "Unit": "pymatgen.core", "FloatWithUnit": "pymatgen.core",
+    "ArrayWithUnit": "pymatgen.core",
+    "Spin": "pymatgen.electronic_structure.core",
+    "Orbital": "pymatgen.electronic_structure.core",
+    "MPRester": "pymatgen.ext.matproj",
+    "MontyEncoder": "monty.json", "MontyDecoder": "monty.json",
+    "MSONable": "monty.json"
+}
+
+__all__ = ["SETTINGS", "get_structure_from_mp"] + sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name == "SETTINGS":
+        value = _load_pmg_settings()
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(
+            __name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | {"SETTINGS"})
+
+
+if sys.version_info < (3, 7):
+    SETTINGS = _load_pmg_settings()
+    from pymatgen.core import *
+    from .electronic_structure.core import Spin, Orbital
+    from .ext.matproj import MPRester
+    from monty.json import MontyEncoder, MontyDecoder, MSONable
 
 
 def get_structure_from_mp(formula):
@@ -69,7 +108,8 @@ def get_structure_from_mp(formula):
         (Structure) The lowest energy structure in Materials Project with that
             formula.
     """
-    m = MPRester()
+    from pymatgen.ext import matproj
+    m = matproj.MPRester()
     entries = m.get_entries(formula, inc_structure="final")
     if len(entries) == 0:
         raise ValueError("No structure with formula %s in Materials Project!" %
@@ -25,7 +25,8 @@ import warnings
 from pymatgen.core.operations import SymmOp
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pymatgen.symmetry.analyzer import generate_full_symmops
-from pymatgen.util.coord import in_coord_list, in_coord_list_pbc
+from pymatgen.util.coord import in_coord_list, in_coord_list_pbc, \
+    coords_in_list_pbc
 from pymatgen.core.sites import PeriodicSite
 from pymatgen.analysis.structure_analyzer import VoronoiCoordFinder
 from pymatgen.core.surface import generate_all_slabs
@@ -332,13 +333,9 @@ class AdsorbateSiteFinder(object):
         coords_set = [self.slab.lattice.get_fractional_coords(coords)
                       for coords in coords_set]
         for coords in coords_set:
-            incoord = False
-            for op in symm_ops:
-                if in_coord_list_pbc(unique_coords, op.operate(coords),
-                                     atol=threshold):
-                    incoord = True
-                    break
-            if not incoord:
+            equiv = SymmOp.operate_all(symm_ops, [coords])[:, 0]
+            if not unique_coords or not np.any(coords_in_list_pbc(
+                    equiv, unique_coords, atol=threshold)):
                 unique_coords += [coords]
         # convert back to cartesian
         return [self.slab.lattice.get_cartesian_coords(coords)
@@ -13,13 +13,12 @@ from math import exp, sqrt
 from six.moves import filter
 from six.moves import zip
 
-from monty.serialization import loadfn
-
 import six
 
 from pymatgen.core.periodic_table import Element, Specie
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pymatgen.core.periodic_table import get_el_sp
+from pymatgen.util.io_utils import LazyMapping, load_data_file
 
 """
 This module implements classes to perform bond valence analyses.
@@ -44,17 +43,24 @@ ELECTRONEG = [Element(sym) for sym in ["H", "B", "C", "Si",
 
 module_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Read in BV parameters.
-BV_PARAMS = {}
-for k, v in loadfn(os.path.join(module_dir, "bvparam_1991.yaml")).items():
-    BV_PARAMS[Element(k)] = v
-
-# Read in yaml containing data-mined ICSD BV data.
-all_data = loadfn(os.path.join(module_dir, "icsd_bv.yaml"))
-ICSD_BV_DATA = {Specie.from_string(sp): data
-                for sp, data in all_data["bvsum"].items()}
-PRIOR_PROB = {Specie.from_string(sp): data
-              for sp, data in all_data["occurrence"].items()}
+
+
+def _load_bv_params():
+    return {Element(k): v for k, v in
+            load_data_file(os.path.join(module_dir,
+                                        "bvparam_1991.yaml")).items()}
+
+
+def _load_icsd_bv_data(key):
+    all_data = load_data_file(os.path.join(module_dir, "icsd_bv.yaml"))
+    return {Specie.from_string(sp): data for sp, data in all_data[key].items()}
+
+
+# BV parameters and data-mined ICSD BV data. The yaml files are only read
+# when the data is first used.
+BV_PARAMS = LazyMapping(_load_bv_params)
+ICSD_BV_DATA = LazyMapping(lambda: _load_icsd_bv_data("bvsum"))
+PRIOR_PROB = LazyMapping(lambda: _load_icsd_bv_data("occurrence"))
 
 
 def calculate_bv_sum(site, nn_list, scale_factor=1.0):
@@ -29,6 +29,7 @@ from monty.json import MSONable, MontyDecoder
 import json
 import os
 from six import with_metaclass
+from pymatgen.util.io_utils import load_data_file
 
 module_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -38,6 +39,11 @@ EXPLICIT_PERMUTATIONS = 'EXPLICIT_PERMUTATIONS'
 SEPARATION_PLANE = 'SEPARATION_PLANE'
 
 
+def _load_json(filename):
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
 class AbstractChemenvAlgorithm(with_metaclass(abc.ABCMeta, MSONable)):
     """
     Class used to define a Chemenv strategy for the neighbors and coordination environment to be applied to a
@@ -784,18 +790,14 @@ class AllCoordinationGeometries(dict):
             f.close()
             for line in data:
                 cg_file = '{}/{}'.format(module_dir, line.strip())
-                f = open(cg_file, 'r')
-                dd = json.load(f)
-                f.close()
+                dd = load_data_file(cg_file, loader=_load_json)
                 self.cg_list.append(CoordinationGeometry.from_dict(dd))
         else:
             for symbol in only_symbols:
                 fsymbol = symbol.replace(':', '#')
                 cg_file = '{}/coordination_geometries_files/{}.json'.format(
                     module_dir, fsymbol)
-                f = open(cg_file, 'r')
-                dd = json.load(f)
-                f.close()
+                dd = load_data_file(cg_file, loader=_load_json)
                 self.cg_list.append(CoordinationGeometry.from_dict(dd))
 
         self.cg_list.append(CoordinationGeometry(UNKNOWN_ENVIRONMENT_SYMBOL,
@@ -483,15 +483,12 @@ class Vacancy(Defect):
         oldf_coords = defect_site.frac_coords
         coords = defect_site.lattice.get_cartesian_coords(oldf_coords)
         newf_coords = sc.lattice.get_fractional_coords(coords)
-        sc_defect_site = PeriodicSite(defect_site.species_and_occu, newf_coords,
-                                      sc.lattice,
-                                      properties=defect_site.properties)
-        for i in range(len(sc.sites)):
-            #if sc_defect_site == sc.sites[i]:
-            if sc_defect_site.distance(sc.sites[i]) < 1e-3:
-                del sc[i]
-                return sc
-        raise ValueError('Something wrong if reached here')
+        dists = sc.lattice.get_all_distances(newf_coords, sc.frac_coords)[0]
+        inds = np.where(dists < 1e-3)[0]
+        if len(inds) == 0:
+            raise ValueError('Something wrong if reached here')
+        del sc[inds[0]]
+        return sc
 
     def make_supercells_with_defects(self, scaling_matrix, species=None,
                                      limit_return_structures=False):
@@ -209,10 +209,12 @@ class XRDCalculator(object):
 
         # Obtain crystallographic reciprocal lattice points within range
         recip_latt = latt.reciprocal_lattice_crystallographic
-        recip_pts = recip_latt.get_points_in_sphere(
-            [[0, 0, 0]], [0, 0, 0], max_r)
+        recip_fcoords, recip_dists, _ = recip_latt.get_points_in_sphere(
+            [[0, 0, 0]], [0, 0, 0], max_r, zip_results=False)
         if min_r:
-            recip_pts = [pt for pt in recip_pts if pt[1] >= min_r]
+            inds = recip_dists >= min_r
+            recip_fcoords = recip_fcoords[inds]
+            recip_dists = recip_dists[inds]
 
         # Create a flattened array of zs, coeffs, fcoords and occus. This is
         # used to perform vectorized computation of atomic scattering factors
@@ -247,10 +249,12 @@ class XRDCalculator(object):
         peaks = {}
         two_thetas = []
 
-        for hkl, g_hkl, ind in sorted(
-                recip_pts, key=lambda i: (i[1], -i[0][0], -i[0][1], -i[0][2])):
-            # Force miller indices to be integers.
-            hkl = [int(round(i)) for i in hkl]
+        # Sort by |g_hkl|, then by descending hkl.
+        order = np.lexsort((-recip_fcoords[:, 2], -recip_fcoords[:, 1],
+                            -recip_fcoords[:, 0], recip_dists))
+        # Force miller indices to be integers.
+        recip_hkls = np.round(recip_fcoords[order]).astype(int).tolist()
+        for hkl, g_hkl in zip(recip_hkls, recip_dists[order]):
             if g_hkl != 0:
 
                 d_hkl = 1 / g_hkl
@@ -368,6 +368,36 @@ class DiffusionAnalyzer(MSONable):
                 coords + self.corrected_displacements[:, i, :],
                 coords_are_cartesian=True)
 
+    def get_drift_corrected_trajectory(self, start=None, stop=None,
+                                       step=None):
+        """
+        Returns the drift-corrected structures as a Trajectory, which stores
+        the coordinates of all frames in a single array instead of creating
+        one Structure per frame.
+
+        Args:
+            start, stop, step (int): applies a start/stop/step to the frames.
+
+        Returns:
+            Trajectory
+        """
+        from pymatgen.core.trajectory import Trajectory
+        nsites, nsteps, dim = self.corrected_displacements.shape
+        frames = np.arange(start or 0, stop or nsteps, step or 1)
+        coords = np.array(self.structure.cart_coords)
+        cart = coords[None] + \
+            self.corrected_displacements[:, frames, :].transpose(1, 0, 2)
+        if len(self.lattices) == 1:
+            lattices = self.lattices[0]
+            fcoords = np.dot(cart, np.linalg.inv(lattices))
+        else:
+            lattices = self.lattices[frames]
+            fcoords = np.einsum("fij,fjk->fik", cart,
+                                np.linalg.inv(lattices))
+        return Trajectory(lattices, self.structure.species_and_occu, fcoords,
+                          time_step=self.time_step * self.step_skip *
+                          (step or 1))
+
     def get_summary_dict(self, include_msd_t=False, include_mscd_t=False):
         """
         Provides a summary of diffusion information.
@@ -268,10 +268,10 @@ class EwaldSummation(object):
         forces = np.zeros((numsites, 3), dtype=np.float)
         coords = self._coords
         rcp_latt = self._s.lattice.reciprocal_lattice
-        recip_nn = rcp_latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0],
-                                                 self._gmax)
+        recip_fcoords, recip_dists, _ = rcp_latt.get_points_in_sphere(
+            [[0, 0, 0]], [0, 0, 0], self._gmax, zip_results=False)
 
-        frac_coords = [fcoords for (fcoords, dist, i) in recip_nn if dist != 0]
+        frac_coords = recip_fcoords[recip_dists != 0]
 
         gs = rcp_latt.get_cartesian_coords(frac_coords)
         g2s = np.sum(gs ** 2, 1)
@@ -326,34 +326,47 @@ class EwaldSummation(object):
 
         epoint = - qs ** 2 * sqrt(self._eta / pi)
 
-        for i in range(numsites):
-            nfcoords, rij, js = self._s.lattice.get_points_in_sphere(fcoords,
-                                    coords[i], self._rmax, zip_results=False)
+        # Neighbors are found for blocks of centers at once, with the block
+        # size chosen so that roughly a million pairs are held at a time.
+        nn_per_site = numsites * 4 / 3 * pi * self._rmax ** 3 / self._vol
+        block = int(max(1, 2 ** 20 // max(1, nn_per_site)))
+        latt = self._s.lattice
+        for start in range(0, numsites, block):
+            end = min(start + block, numsites)
+            nfcoords, rij, js, indptr = latt.get_points_in_spheres(
+                fcoords, coords[start:end], self._rmax)
+            i_s = np.repeat(np.arange(start, end), np.diff(indptr))
 
             # remove the rii term
             inds = rij > 1e-8
             js = js[inds]
             rij = rij[inds]
             nfcoords = nfcoords[inds]
+            i_s = i_s[inds]
 
-            qi = qs[i]
+            qi = qs[i_s]
             qj = qs[js]
 
             erfcval = erfc(self._sqrt_eta * rij)
             new_ereals = erfcval * qi * qj / rij
 
-            # insert new_ereals
-            for k in range(numsites):
-                ereal[k, i] = np.sum(new_ereals[js == k])
+            # insert new_ereals, i.e., ereal[k, i] is the sum of the terms
+            # between center i and all images of site k.
+            ereal[:, start:end] = np.bincount(
+                js * (end - start) + i_s - start, weights=new_ereals,
+                minlength=numsites * (end - start)).reshape(
+                (numsites, end - start))
 
             if self._compute_forces:
-                nccoords = self._s.lattice.get_cartesian_coords(nfcoords)
+                nccoords = latt.get_cartesian_coords(nfcoords)
 
                 fijpf = qj / rij ** 3 * (erfcval + forcepf * rij *
                                          np.exp(-self._eta * rij ** 2))
-                forces[i] += np.sum(np.expand_dims(fijpf, 1) *
-                                    (np.array([coords[i]]) - nccoords) *
-                                    qi * EwaldSummation.CONV_FACT, axis=0)
+                fij = np.expand_dims(fijpf * qi, 1) * \
+                    (coords[i_s] - nccoords) * EwaldSummation.CONV_FACT
+                for k in range(3):
+                    forces[:, k] += np.bincount(i_s, weights=fij[:, k],
+                                                minlength=numsites)
 
         ereal *= 0.5 * EwaldSummation.CONV_FACT
         epoint *= EwaldSummation.CONV_FACT
@@ -561,26 +561,17 @@ class StructureGraph(MSONable):
         f_lat = lattice_points_in_supercell(scale_matrix)
         c_lat = new_lattice.get_cartesian_coords(f_lat)
 
-        new_sites = []
-        new_graphs = []
-
-        for v in c_lat:
+        # the sites of each image of the original cell are consecutive
+        new_structure = Structure.from_sites(
+            self.structure.sites.tile(c_lat, new_lattice, by_site=False))
 
+        new_graphs = []
+        nsites = len(self.structure)
+        for i in range(len(c_lat)):
             # create a map of nodes from original graph to its image
-            mapping = {n: n + len(new_sites) for n in range(len(self.structure))}
-
-            for idx, site in enumerate(self.structure):
-
-                s = PeriodicSite(site.species_and_occu, site.coords + v,
-                                 new_lattice, properties=site.properties,
-                                 coords_are_cartesian=True, to_unit_cell=False)
-
-                new_sites.append(s)
-
+            mapping = {n: n + i * nsites for n in range(nsites)}
             new_graphs.append(nx.relabel_nodes(self.graph, mapping, copy=True))
 
-        new_structure = Structure.from_sites(new_sites)
-
         # merge all graphs into one big graph
         new_g = nx.MultiDiGraph()
         for new_graph in new_graphs:
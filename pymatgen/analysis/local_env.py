@@ -7,7 +7,6 @@ from __future__ import division, unicode_literals
 import six
 import ruamel.yaml as yaml
 import os
-import json
 
 """
 This module provides classes to perform analyses of
@@ -34,14 +33,19 @@ from scipy.spatial import Voronoi
 from pymatgen import Element
 from pymatgen.core.structure import Structure
 from pymatgen.util.num import abs_cap
+from pymatgen.util.io_utils import load_data_file
 from pymatgen.analysis.bond_valence import BV_PARAMS
 from pymatgen.analysis.structure_analyzer import OrderParameters
 
 
 file_dir = os.path.dirname(__file__)
 rad_file = os.path.join(file_dir, 'ionic_radii.json')
-with open(rad_file, 'r') as fp:
-    _ion_radii = json.load(fp)
+_ion_radii = load_data_file(rad_file)
+
+
+def _load_yaml(filename):
+    with open(filename, 'r') as f:
+        return yaml.safe_load(f)
 
 
 class ValenceIonicRadiusEvaluator(object):
@@ -440,8 +444,7 @@ class JMolNN(NearNeighbors):
         # Load elemental radii table
         bonds_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
                                   "bonds_jmol_ob.yaml")
-        with open(bonds_file, 'r') as f:
-            self.el_radius = yaml.safe_load(f)
+        self.el_radius = load_data_file(bonds_file, loader=_load_yaml)
 
         # Update any user preference elemental radii
         if el_radius_updates:
@@ -491,14 +494,15 @@ class JMolNN(NearNeighbors):
         min_rad = min(bonds.values())
 
         siw = []
-        for neighb, dist in structure.get_neighbors(site, max_rad):
+        for neighb, dist, index in structure.get_neighbors(
+                site, max_rad, include_index=True):
             # Confirm neighbor based on bond length specific to atom pair
             if dist <= bonds[(site.specie, neighb.specie)] + self.tol:
                 weight = min_rad / dist
                 siw.append({'site': neighb,
                             'image': self._get_image(neighb.frac_coords),
                             'weight': weight,
-                            'site_index': self._get_original_site(structure, neighb)})
+                            'site_index': index})
         return siw
 
 
@@ -539,17 +543,18 @@ class MinimumDistanceNN(NearNeighbors):
         """
 
         site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
-        min_dist = min([dist for neigh, dist in neighs_dists])
+        neighs_dists = structure.get_neighbors(site, self.cutoff,
+                                               include_index=True)
+        min_dist = min([dist for neigh, dist, index in neighs_dists])
 
         siw = []
-        for s, dist in neighs_dists:
+        for s, dist, index in neighs_dists:
             if dist < (1.0 + self.tol) * min_dist:
                 w = min_dist / dist
                 siw.append({'site': s,
                             'image': self._get_image(s.frac_coords),
                             'weight': w,
-                            'site_index': self._get_original_site(structure, s)})
+                            'site_index': index})
         return siw
 
 
@@ -591,30 +596,32 @@ class MinimumOKeeffeNN(NearNeighbors):
         """
 
         site = structure[n]
-        neighs_dists = structure.get_neighbors(site, self.cutoff)
+        neighs_dists = structure.get_neighbors(site, self.cutoff,
+                                               include_index=True)
         try:
             eln = site.specie.element
         except:
             eln = site.species_string
 
         reldists_neighs = []
-        for neigh, dist in neighs_dists:
+        for neigh, dist, index in neighs_dists:
             try:
                 el2 = neigh.specie.element
             except:
                 el2 = neigh.species_string
             reldists_neighs.append([dist / get_okeeffe_distance_prediction(
-                    eln, el2), neigh])
+                    eln, el2), neigh, index])
 
         siw = []
-        min_reldist = min([reldist for reldist, neigh in reldists_neighs])
-        for reldist, s in reldists_neighs:
+        min_reldist = min([reldist for reldist, neigh, index in
+                           reldists_neighs])
+        for reldist, s, index in reldists_neighs:
             if reldist < (1.0 + self.tol) * min_reldist:
                 w = min_reldist / reldist
                 siw.append({'site': s,
                             'image': self._get_image(s.frac_coords),
                             'weight': w,
-                            'site_index': self._get_original_site(structure, s)})
+                            'site_index': index})
 
         return siw
 
@@ -658,23 +665,25 @@ class MinimumVIRENN(NearNeighbors):
 
         vire = ValenceIonicRadiusEvaluator(structure)
         site = vire.structure[n]
-        neighs_dists = vire.structure.get_neighbors(site, self.cutoff)
+        neighs_dists = vire.structure.get_neighbors(site, self.cutoff,
+                                                    include_index=True)
         rn = vire.radii[vire.structure[n].species_string]
 
         reldists_neighs = []
-        for neigh, dist in neighs_dists:
+        for neigh, dist, index in neighs_dists:
             reldists_neighs.append([dist / (
-                    vire.radii[neigh.species_string] + rn), neigh])
+                    vire.radii[neigh.species_string] + rn), neigh, index])
 
         siw = []
-        min_reldist = min([reldist for reldist, neigh in reldists_neighs])
-        for reldist, s in reldists_neighs:
+        min_reldist = min([reldist for reldist, neigh, index in
+                           reldists_neighs])
+        for reldist, s, index in reldists_neighs:
             if reldist < (1.0 + self.tol) * min_reldist:
                 w = min_reldist / reldist
                 siw.append({'site': s,
                             'image': self._get_image(s.frac_coords),
                             'weight': w,
-                            'site_index': self._get_original_site(structure, s)})
+                            'site_index': index})
 
         return siw
 
@@ -0,0 +1,252 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import math
+
+import numpy as np
+
+from pymatgen.core.periodic_table import get_el_sp
+from pymatgen.util.coord import iter_points_in_spheres
+
+"""
+This module implements the calculation of total and partial radial
+distribution functions (RDF) and coordination numbers of structures and of
+molecular dynamics trajectories.
+"""
+
+
+class RadialDistributionFunction(object):
+    """
+    Accumulates the radial distribution functions of one or more frames,
+    e.g., the structures of a MD run. For each frame, all pairs of sites
+    within rmax are found with a periodic cell list search and binned into
+    one histogram per pair of species. Only the histograms are kept, so any
+    number of frames can be processed in constant memory by passing them as
+    an iterator, e.g., Xdatcar.iter_structures.
+
+    The partial RDF of species b around species a is
+
+        g_ab(r) = H_ab(r) / (V_shell(r) * sum_frames(N_a * N_b / V))
+
+    where H_ab(r) is the total number of b sites in the shell at distance r
+    of all a sites over all frames, V_shell(r) is the volume of the shell
+    and V the volume of a frame. The total RDF is the same with all sites.
+    The normalization per frame makes the RDF of NPT runs well defined.
+
+    .. attribute:: edges
+
+        Edges of the distance bins.
+
+    .. attribute:: nframes
+
+        Number of frames added.
+    """
+
+    def __init__(self, rmax=10.0, bin_width=0.02):
+        """
+        Args:
+            rmax (float): Maximum distance in Angstrom. Defaults to 10.
+            bin_width (float): Width of the distance bins in Angstrom.
+                Defaults to 0.02.
+        """
+        if rmax <= 0 or bin_width <= 0:
+            raise ValueError("rmax and bin_width must be positive.")
+        self.nbins = int(math.ceil(rmax / bin_width - 1e-8))
+        self.bin_width = bin_width
+        self.rmax = self.nbins * bin_width
+        self.edges = np.arange(self.nbins + 1) * bin_width
+        self.nframes = 0
+        self._species = []
+        self._hist = np.zeros((0, 0, self.nbins))
+        # Sums over the frames of N_a and of N_a * N_b / V.
+        self._counts = np.zeros(0)
+        self._pair_density = np.zeros((0, 0))
+
+    @classmethod
+    def from_structures(cls, structures, rmax=10.0, bin_width=0.02):
+        """
+        Calculates the RDF of a sequence or an iterator of structures.
+
+        Args:
+            structures: Structures, e.g., a list, a Trajectory or a
+                generator of structures.
+            rmax (float): Maximum distance in Angstrom.
+            bin_width (float): Width of the distance bins in Angstrom.
+
+        Returns:
+            RadialDistributionFunction
+        """
+        rdf = cls(rmax=rmax, bin_width=bin_width)
+        rdf.add_structures(structures)
+        return rdf
+
+    @classmethod
+    def from_xdatcar(cls, filename, rmax=10.0, bin_width=0.02,
+                     ionicstep_start=1, ionicstep_end=None):
+        """
+        Calculates the RDF of the ionic steps of a XDATCAR file. The steps
+        are read one by one, so the file can be arbitrarily long.
+
+        Args:
+            filename (str): Name of the XDATCAR file.
+            rmax (float): Maximum distance in Angstrom.
+            bin_width (float): Width of the distance bins in Angstrom.
+            ionicstep_start (int): Starting number of ionic step.
+            ionicstep_end (int): Ending number of ionic step.
+
+        Returns:
+            RadialDistributionFunction
+        """
+        from pymatgen.io.vasp.outputs import Xdatcar
+        return cls.from_structures(
+            Xdatcar.iter_structures(filename, ionicstep_start=ionicstep_start,
+                                    ionicstep_end=ionicstep_end),
+            rmax=rmax, bin_width=bin_width)
+
+    @classmethod
+    def from_lammps_dump(cls, dump_file, species, rmax=10.0, bin_width=0.02):
+        """
+        Calculates the RDF of the frames of a LAMMPS dump file. The frames
+        are read one by one, so the file can be arbitrarily long.
+
+        Args:
+            dump_file (str): Name of the dump file.
+            species (dict/list): Species of each atom type, as accepted by
+                LammpsDump.iter_structures.
+            rmax (float): Maximum distance in Angstrom.
+            bin_width (float): Width of the distance bins in Angstrom.
+
+        Returns:
+            RadialDistributionFunction
+        """
+        from pymatgen.io.lammps.output import LammpsDump
+        return cls.from_structures(
+            LammpsDump.iter_structures(dump_file, species), rmax=rmax,
+            bin_width=bin_width)
+
+    @property
+    def species(self):
+        """
+        List of the species found in the frames.
+        """
+        return list(self._species)
+
+    @property
+    def r(self):
+        """
+        Centers of the distance bins.
+        """
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    def add_structures(self, structures):
+        """
+        Adds a sequence or an iterator of frames.
+
+        Args:
+            structures: Structures to add.
+        """
+        for s in structures:
+            self.add_structure(s)
+
+    def add_structure(self, structure):
+        """
+        Adds the pair distances of one frame to the histograms.
+
+        Args:
+            structure (Structure): An ordered structure.
+        """
+        if not structure.is_ordered:
+            raise ValueError("The RDF can only be calculated for ordered "
+                             "structures.")
+        store = structure._sites
+        table = np.array([self._get_species_index(list(comp.keys())[0])
+                          for comp in store.unique_species], dtype=int)
+        sp = table[store.species_indices] if len(store) else \
+            np.zeros(0, dtype=int)
+        nsp = len(self._species)
+        nbins = self.nbins
+        hist = np.zeros(nsp * nsp * nbins, dtype=np.int64)
+        for centers, points, images, dists in iter_points_in_spheres(
+                structure.lattice, store.frac_coords, store.cart_coords,
+                self.rmax):
+            bins = np.minimum((dists / self.bin_width).astype(int), nbins - 1)
+            keys = (sp[centers] * nsp + sp[points]) * nbins + bins
+            hist += np.bincount(keys, minlength=len(hist))
+        self._hist += hist.reshape((nsp, nsp, nbins))
+
+        counts = np.bincount(sp, minlength=nsp).astype(float)
+        self._counts += counts
+        self._pair_density += np.outer(counts, counts) / structure.volume
+        self.nframes += 1
+
+    def get_rdf(self, species1=None, species2=None):
+        """
+        Returns the total RDF, or the partial RDF of species2 around
+        species1 if both species are given.
+
+        Args:
+            species1: Species of the central sites, e.g., "Si". Defaults to
+                None for all sites.
+            species2: Species of the neighbors. Defaults to None for all
+                sites.
+
+        Returns:
+            Array of g(r) at the bin centers r.
+        """
+        inds1, inds2 = self._get_indices(species1, species2)
+        hist = self._hist[np.ix_(inds1, inds2)].sum(axis=(0, 1))
+        density = self._pair_density[np.ix_(inds1, inds2)].sum()
+        shells = 4 / 3 * math.pi * np.diff(self.edges ** 3)
+        if density == 0:
+            return np.zeros(self.nbins)
+        return hist / (shells * density)
+
+    def get_coordination_number(self, species1=None, species2=None):
+        """
+        Returns the running coordination number, i.e., the average number of
+        neighbors within the upper edge of each bin. This is the integral of
+        the RDF, calculated exactly from the pair counts.
+
+        Args:
+            species1: Species of the central sites, e.g., "Si". Defaults to
+                None for all sites.
+            species2: Species of the neighbors. Defaults to None for all
+                sites.
+
+        Returns:
+            Array of coordination numbers at the upper bin edges.
+        """
+        inds1, inds2 = self._get_indices(species1, species2)
+        hist = self._hist[np.ix_(inds1, inds2)].sum(axis=(0, 1))
+        count = self._counts[inds1].sum()
+        if count == 0:
+            return np.zeros(self.nbins)
+        return np.cumsum(hist) / count
+
+    def _get_species_index(self, sp):
+        try:
+            return self._species.index(sp)
+        except ValueError:
+            self._species.append(sp)
+            nsp = len(self._species)
+            hist = np.zeros((nsp, nsp, self.nbins))
+            hist[:-1, :-1] = self._hist
+            self._hist = hist
+            self._counts = np.append(self._counts, 0)
+            density = np.zeros((nsp, nsp))
+            density[:-1, :-1] = self._pair_density
+            self._pair_density = density
+            return nsp - 1
+
+    def _get_indices(self, species1, species2):
+        def get(sp):
+            if sp is None:
+                return list(range(len(self._species)))
+            sp = get_el_sp(sp)
+            if sp not in self._species:
+                raise ValueError("%s is not present in the frames." % sp)
+            return [self._species.index(sp)]
+        return get(species1), get(species2)
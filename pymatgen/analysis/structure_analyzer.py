@@ -724,9 +724,8 @@ class OxideType(object):
         """
         structure = self.structure
         relative_cutoff = self.relative_cutoff
-        o_sites_frac_coords = []
-        h_sites_frac_coords = []
-        lattice = structure.lattice
+        o_inds = []
+        h_inds = []
 
         if isinstance(structure.composition.elements[0], Element):
             comp = structure.composition
@@ -739,31 +738,36 @@ class OxideType(object):
         if Element("O") not in comp or comp.is_element:
             return "None", 0
 
-        for site in structure:
+        for i, site in enumerate(structure):
             syms = [sp.symbol for sp in site.species_and_occu.keys()]
             if "O" in syms:
-                o_sites_frac_coords.append(site.frac_coords)
+                o_inds.append(i)
             if "H" in syms:
-                h_sites_frac_coords.append(site.frac_coords)
-
-        if h_sites_frac_coords:
-            dist_matrix = lattice.get_all_distances(o_sites_frac_coords,
-                                                    h_sites_frac_coords)
-            if np.any(dist_matrix < relative_cutoff * 0.93):
-                return "hydroxide", len(
-                    np.where(dist_matrix < relative_cutoff * 0.93)[0]) / 2.0
-        dist_matrix = lattice.get_all_distances(o_sites_frac_coords,
-                                                o_sites_frac_coords)
-        np.fill_diagonal(dist_matrix, 1000)
+                h_inds.append(i)
+
+        # Only pairs within the largest cutoff used below are needed.
+        dist_matrix, _ = structure.get_sparse_distance_matrix(
+            relative_cutoff * 1.49)
+        if h_inds:
+            # A site holding both O and H is at distance zero from itself,
+            # but the diagonal is not stored in the sparse matrix.
+            noh_bonds = np.sum(dist_matrix[o_inds][:, h_inds].data <
+                               relative_cutoff * 0.93) + \
+                len(set(o_inds).intersection(h_inds))
+            if noh_bonds:
+                return "hydroxide", noh_bonds / 2.0
+        dist_matrix = dist_matrix[o_inds][:, o_inds].tocoo()
         is_superoxide = False
         is_peroxide = False
         is_ozonide = False
-        if np.any(dist_matrix < relative_cutoff * 1.35):
-            bond_atoms = np.where(dist_matrix < relative_cutoff * 1.35)[0]
+        if np.any(dist_matrix.data < relative_cutoff * 1.35):
+            bond_atoms = dist_matrix.row[
+                dist_matrix.data < relative_cutoff * 1.35]
             is_superoxide = True
-        elif np.any(dist_matrix < relative_cutoff * 1.49):
+        elif np.any(dist_matrix.data < relative_cutoff * 1.49):
             is_peroxide = True
-            bond_atoms = np.where(dist_matrix < relative_cutoff * 1.49)[0]
+            bond_atoms = dist_matrix.row[
+                dist_matrix.data < relative_cutoff * 1.49]
         if is_superoxide:
             if len(bond_atoms) > len(set(bond_atoms)):
                 is_superoxide = False
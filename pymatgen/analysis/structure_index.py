@@ -0,0 +1,219 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import json
+import sqlite3
+
+from pymatgen.analysis.structure_matcher import StructureMatcher, \
+    AbstractComparator, PreparedStructure
+from pymatgen.core.composition import Composition
+from pymatgen.entries.computed_entries import ComputedStructureEntry
+from pymatgen.io.compact import dumps_npz, loads_npz
+
+"""
+This module implements a persistent index of known structures, which answers
+whether a structure is already known with StructureMatcher semantics without
+fitting it against every known structure.
+"""
+
+
+class StructureIndex(object):
+    """
+    An index of known structures stored in a SQLite database. Structures are
+    bucketed by their reduced formula and the number of sites in their
+    reduced cell, which are equal for any two structures that fit (see
+    StructureMatcher.get_fingerprint). A query is only fitted against the
+    structures in its own bucket, which are loaded from the database once
+    and then kept in memory in their preprocessed form, so that queries need
+    few fit calls and no reduction of the indexed structures.
+
+    Besides structures, ComputedStructureEntries can be indexed, e.g., to
+    keep track of the ids of known structures. They are matched on their
+    structure.
+
+    Usage::
+
+        index = StructureIndex("known.db")
+        for s in candidates:
+            if not index.contains(s):
+                index.add(s)
+    """
+
+    def __init__(self, filename=":memory:", matcher=None):
+        """
+        Args:
+            filename (str): Name of the SQLite database file, which is created
+                if it does not exist. Defaults to an in-memory database.
+            matcher (StructureMatcher): Matcher used to fit structures.
+                Defaults to the matcher the index was created with, or
+                StructureMatcher() for a new index. The tolerances can differ
+                from those the index was created with, but the preprocessing
+                (comparator, primitive_cell, attempt_supercell and
+                ignored_species) must be the same.
+        """
+        self._conn = sqlite3.connect(filename)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings "
+                           "(name TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS structures "
+                           "(id INTEGER PRIMARY KEY, bucket TEXT NOT NULL, "
+                           "data BLOB NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bucket_index ON "
+                           "structures (bucket)")
+        row = self._conn.execute("SELECT value FROM settings WHERE "
+                                 "name = 'matcher'").fetchone()
+        if row is None:
+            matcher = matcher or StructureMatcher()
+            self._conn.execute(
+                "INSERT INTO settings VALUES ('matcher', ?)",
+                (json.dumps(self._get_matcher_settings(matcher)),))
+            self._conn.commit()
+        else:
+            settings = json.loads(row[0])
+            if matcher is None:
+                d = dict(settings)
+                d["comparator"] = AbstractComparator.from_dict(
+                    d["comparator"])
+                matcher = StructureMatcher(**d)
+            else:
+                keys = ["comparator", "primitive_cell", "attempt_supercell",
+                        "ignored_species"]
+                new_settings = self._get_matcher_settings(matcher)
+                if any(settings[k] != new_settings[k] for k in keys):
+                    raise ValueError(
+                        "The preprocessing settings of the matcher differ "
+                        "from those of the index: %s" %
+                        {k: settings[k] for k in keys})
+        if matcher._subset:
+            raise ValueError("allow_subset cannot be used with an index")
+        self.matcher = matcher
+        self._buckets = {}
+
+    @staticmethod
+    def _get_matcher_settings(matcher):
+        return {"ltol": matcher.ltol, "stol": matcher.stol,
+                "angle_tol": matcher.angle_tol,
+                "primitive_cell": matcher._primitive_cell,
+                "scale": matcher._scale,
+                "attempt_supercell": matcher._supercell,
+                "supercell_size": matcher._supercell_size,
+                "comparator": matcher._comparator.as_dict(),
+                "ignored_species": [str(sp) for sp in
+                                    matcher._ignored_species]}
+
+    def __len__(self):
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM structures").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self._conn.close()
+
+    def _get_bucket_key(self, prepared):
+        comp_hash, num_sites = self.matcher.get_fingerprint(prepared)
+        if isinstance(comp_hash, Composition):
+            # Compositions are equal within a tolerance, so the amounts of
+            # the fractional element composition are rounded to make equal
+            # compositions give the same key.
+            comp = prepared.processed.composition.element_composition \
+                .fractional_composition
+            comp_hash = " ".join("%s%.4f" % (el, amt)
+                                 for el, amt in sorted(comp.items()))
+        return json.dumps([str(comp_hash), num_sites])
+
+    def _prepare(self, obj, reduced=None):
+        structure = obj.structure if isinstance(obj, ComputedStructureEntry) \
+            else obj
+        if reduced is None:
+            return self.matcher.prepare(structure)
+        return PreparedStructure(
+            structure, self.matcher._process_species([structure])[0],
+            self.matcher._primitive_cell, self.matcher._ignored_species,
+            reduced=reduced)
+
+    def _get_bucket(self, key):
+        """
+        Returns the (object, PreparedStructure) pairs of a bucket.
+        """
+        if key not in self._buckets:
+            bucket = []
+            for data, in self._conn.execute(
+                    "SELECT data FROM structures WHERE bucket = ? "
+                    "ORDER BY id", (key,)):
+                obj, reduced = loads_npz(bytes(data))
+                bucket.append((obj, self._prepare(obj, reduced)))
+            self._buckets[key] = bucket
+        return self._buckets[key]
+
+    def add(self, obj):
+        """
+        Adds a structure or ComputedStructureEntry to the index. Duplicates
+        are not checked, use contains for that.
+
+        Args:
+            obj (Structure/ComputedStructureEntry): Object to add.
+        """
+        self.extend([obj])
+
+    def extend(self, objs):
+        """
+        Adds structures or ComputedStructureEntries to the index in a single
+        transaction.
+
+        Args:
+            objs ([Structure/ComputedStructureEntry]): Objects to add.
+        """
+        rows = []
+        for obj in objs:
+            prepared = self._prepare(obj)
+            key = self._get_bucket_key(prepared)
+            data = dumps_npz([obj, prepared.reduced], compressed=False)
+            rows.append((key, sqlite3.Binary(data)))
+            if key in self._buckets:
+                self._buckets[key].append((obj, prepared))
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO structures (bucket, data) VALUES (?, ?)", rows)
+
+    def contains(self, structure):
+        """
+        Checks whether a structure fits any indexed structure. Stops at the
+        first match.
+
+        Args:
+            structure (Structure/ComputedStructureEntry/PreparedStructure):
+                Query structure.
+
+        Returns:
+            True if the structure fits an indexed structure.
+        """
+        prepared = self._prepare(structure)
+        bucket = self._get_bucket(self._get_bucket_key(prepared))
+        return self.matcher.fit_many(prepared,
+                                     [p for obj, p in bucket]) is not None
+
+    def find_matches(self, structure):
+        """
+        Finds all indexed structures that a structure fits.
+
+        Args:
+            structure (Structure/ComputedStructureEntry/PreparedStructure):
+                Query structure.
+
+        Returns:
+            List of the matching indexed structures or entries, in the order
+            in which they were added.
+        """
+        prepared = self._prepare(structure)
+        bucket = self._get_bucket(self._get_bucket_key(prepared))
+        return [obj for obj, p in bucket if self.matcher.fit(p, prepared)]
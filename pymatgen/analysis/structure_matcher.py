@@ -9,12 +9,13 @@ This module provides classes to perform fitting of structures.
 from __future__ import division, unicode_literals
 
 import six
-from six.moves import filter
 from six.moves import zip
 
 import numpy as np
 import itertools
 import abc
+import collections
+import logging
 
 from monty.json import MSONable
 from pymatgen.core.structure import Structure
@@ -22,7 +23,8 @@ from pymatgen.core.lattice import Lattice
 from pymatgen.core.composition import Composition
 
 from pymatgen.core.periodic_table import get_el_sp
-from pymatgen.optimization.linear_assignment import LinearAssignment
+from pymatgen.optimization.linear_assignment import LinearAssignment, \
+    linear_assignment_many
 from pymatgen.util.coord_cython import pbc_shortest_vectors, is_coord_subset_pbc
 from pymatgen.util.coord import lattice_points_in_supercell
 
@@ -34,6 +36,12 @@ __email__ = "wrichard@mit.edu"
 __status__ = "Production"
 __date__ = "Dec 3, 2012"
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of elements of the stacked (translations x sites x sites)
+# distance matrices matched in one batch by StructureMatcher._strict_match.
+_MAX_BATCH_ELEMENTS = 2 ** 16
+
 
 class AbstractComparator(six.with_metaclass(abc.ABCMeta, MSONable)):
     """
@@ -285,6 +293,49 @@ class OccupancyComparator(AbstractComparator):
         # Difficult to define sensible hash
         return 1
 
+
+class PreparedStructure(object):
+    """
+    A structure together with the preprocessing that StructureMatcher
+    applies to every input of fit, i.e., the removal of ignored species and
+    the reduction to the Niggli reduced (primitive) cell. The reduced
+    structure is computed on first use and then reused by every fit.
+    Use StructureMatcher.prepare to create one.
+
+    .. attribute:: structure
+
+        The original structure.
+
+    .. attribute:: processed
+
+        Copy of the structure without the ignored species.
+    """
+
+    def __init__(self, structure, processed, primitive_cell,
+                 ignored_species, reduced=None):
+        self.structure = structure
+        self.processed = processed
+        self._primitive_cell = primitive_cell
+        self._ignored_species = ignored_species
+        self._reduced = reduced
+
+    @property
+    def reduced(self):
+        """
+        The Niggli reduced structure, which is also a primitive cell if the
+        matcher uses primitive cells. Must not be modified.
+        """
+        if self._reduced is None:
+            s = self.processed.get_reduced_structure(reduction_algo="niggli")
+            if self._primitive_cell:
+                s = s.get_primitive_structure()
+            self._reduced = s
+        return self._reduced
+
+    def __len__(self):
+        return len(self.structure)
+
+
 class StructureMatcher(MSONable):
     """
     Class to match structures by similarity.
@@ -513,6 +564,42 @@ class StructureMatcher(MSONable):
 
         return new_d2 ** 0.5 * normalization, f_translation, s
 
+    def _cart_dists_many(self, s1, s2_list, avg_lattice, mask, normalization,
+                         lll_frac_tol=None):
+        """
+        Same as _cart_dists for several translated copies of s2, e.g., the
+        candidate translations on one lattice. The linear assignment
+        problems of all copies are solved in a single call.
+
+        Returns:
+            List of (distances, fractional translation, mapping) tuples, one
+            per element of s2_list.
+        """
+        if any(len(s2) > len(s1) for s2 in s2_list):
+            raise ValueError("s1 must be larger than s2")
+        if any(mask.shape != (len(s2), len(s1)) for s2 in s2_list):
+            raise ValueError("mask has incorrect shape")
+
+        # vectors are from s2 to s1
+        all_vecs, all_d2 = [], []
+        for s2 in s2_list:
+            vecs, d_2 = pbc_shortest_vectors(avg_lattice, s2, s1, mask,
+                                             return_d2=True,
+                                             lll_frac_tol=lll_frac_tol)
+            all_vecs.append(vecs)
+            all_d2.append(d_2)
+        solutions, _ = linear_assignment_many(
+            np.reshape(all_d2, (len(s2_list),) + mask.shape))
+
+        results = []
+        for vecs, s in zip(all_vecs, solutions):
+            short_vecs = vecs[np.arange(len(s)), s]
+            translation = np.average(short_vecs, axis=0)
+            f_translation = avg_lattice.get_fractional_coords(translation)
+            new_d2 = np.sum((short_vecs - translation) ** 2, axis=-1)
+            results.append((new_d2 ** 0.5 * normalization, f_translation, s))
+        return results
+
     def _get_mask(self, struct1, struct2, fu, s1_supercell):
         """
         Returns mask for matching struct2 to struct1. If struct1 has sites
@@ -558,19 +645,21 @@ class StructureMatcher(MSONable):
         Fit two structures.
 
         Args:
-            struct1 (Structure): 1st structure
-            struct2 (Structure): 2nd structure
+            struct1 (Structure/PreparedStructure): 1st structure
+            struct2 (Structure/PreparedStructure): 2nd structure
 
         Returns:
             True or False.
         """
-        struct1, struct2 = self._process_species([struct1, struct2])
+        struct1, struct2 = self.prepare(struct1), self.prepare(struct2)
 
-        if not self._subset and self._comparator.get_hash(struct1.composition) \
-                != self._comparator.get_hash(struct2.composition):
+        if not self._subset and \
+                self._comparator.get_hash(struct1.processed.composition) != \
+                self._comparator.get_hash(struct2.processed.composition):
             return None
 
-        struct1, struct2, fu, s1_supercell = self._preprocess(struct1, struct2)
+        struct1, struct2, fu, s1_supercell = self._preprocess_reduced(
+            struct1.reduced, struct2.reduced)
         match = self._match(struct1, struct2, fu, s1_supercell,
                             break_on_match=True)
 
@@ -579,6 +668,52 @@ class StructureMatcher(MSONable):
         else:
             return match[0] <= self.stol
 
+    def prepare(self, structure):
+        """
+        Preprocesses a structure for fitting, so that structures that are
+        fitted many times, e.g., known structures against which candidates
+        are checked, are only preprocessed once. The result can be passed
+        to fit, fit_anonymous and fit_many instead of the structure.
+
+        Args:
+            structure (Structure/PreparedStructure): Input structure.
+
+        Returns:
+            PreparedStructure. A PreparedStructure created by a matcher
+            with the same preprocessing settings is returned unchanged.
+        """
+        if isinstance(structure, PreparedStructure):
+            if structure._primitive_cell == self._primitive_cell and \
+                    structure._ignored_species == self._ignored_species:
+                return structure
+            structure = structure.structure
+        return PreparedStructure(structure,
+                                 self._process_species([structure])[0],
+                                 self._primitive_cell, self._ignored_species)
+
+    def fit_many(self, structure, references, anonymous=False):
+        """
+        Fits a structure against many references, e.g., to check whether a
+        candidate is already known. The structure is only preprocessed once,
+        and references that are PreparedStructures are not preprocessed at
+        all. The search stops at the first match.
+
+        Args:
+            structure (Structure/PreparedStructure): Structure to fit.
+            references ([Structure/PreparedStructure]): References. Each one
+                is fitted as fit(reference, structure).
+            anonymous (bool): Whether to use fit_anonymous instead of fit.
+
+        Returns:
+            Index of the first reference that fits, or None.
+        """
+        structure = self.prepare(structure)
+        fit = self.fit_anonymous if anonymous else self.fit
+        for i, ref in enumerate(references):
+            if fit(ref, structure):
+                return i
+        return None
+
     def get_rms_dist(self, struct1, struct2):
         """
         Calculate RMS displacement between two structures
@@ -632,6 +767,14 @@ class StructureMatcher(MSONable):
             struct1 = struct1.get_primitive_structure()
             struct2 = struct2.get_primitive_structure()
 
+        return self._preprocess_reduced(struct1, struct2, copy=False)
+
+    def _preprocess_reduced(self, struct1, struct2, copy=True):
+        """
+        Finds fu, the supercell size to make struct1 comparable to s2, and
+        rescales the reduced structures. The structures are copied before
+        rescaling unless copy is False.
+        """
         if self._supercell:
             fu, s1_supercell = self._get_supercell_size(struct1, struct2)
         else:
@@ -640,6 +783,9 @@ class StructureMatcher(MSONable):
 
         # rescale lattice to same volume
         if self._scale:
+            if copy:
+                struct1 = struct1.copy()
+                struct2 = struct2.copy()
             ratio = (struct2.volume / (struct1.volume * mult)) ** (1 / 6)
             nl1 = Lattice(struct1.lattice.matrix * ratio)
             struct1.modify_lattice(nl1)
@@ -663,6 +809,19 @@ class StructureMatcher(MSONable):
                 struct2, struct1, fu, s1_supercell=(not s1_supercell),
                 break_on_match=break_on_match, use_rms=use_rms)
 
+    def _get_translations(self, s1fc, s2fc, s1_t_inds, s2_t_ind, frac_tol,
+                          mask):
+        """
+        Generates the translations of s2fc onto s1fc that pass the
+        fractional tolerance check, as (translation, translated s2fc)
+        tuples. Translations are only checked as they are requested.
+        """
+        for s1i in s1_t_inds:
+            t = s1fc[s1i] - s2fc[s2_t_ind]
+            t_s2fc = s2fc + t
+            if self._cmp_fstruct(s1fc, t_s2fc, frac_tol, mask):
+                yield t, t_s2fc
+
     def _strict_match(self, struct1, struct2, fu, s1_supercell=True,
                       use_rms=False, break_on_match=False):
         """
@@ -703,15 +862,35 @@ class StructureMatcher(MSONable):
             normalization = (len(s1fc) / avg_l.volume) ** (1/3)
             inv_abc = np.array(avg_l.reciprocal_lattice.abc)
             frac_tol = inv_abc * self.stol / (np.pi * normalization)
-            # loop over all translations
-            for s1i in s1_t_inds:
-                t = s1fc[s1i] - s2fc[s2_t_ind]
-                t_s2fc = s2fc + t
-                if self._cmp_fstruct(s1fc, t_s2fc, frac_tol, mask):
-                    inv_lll_abc = np.array(avg_l.get_lll_reduced_lattice().reciprocal_lattice.abc)
-                    lll_frac_tol = inv_lll_abc * self.stol / (np.pi * normalization)
-                    dist, t_adj, mapping = self._cart_dists(
-                        s1fc, t_s2fc, avg_l, mask, normalization, lll_frac_tol)
+            candidates = self._get_translations(s1fc, s2fc, s1_t_inds,
+                                                s2_t_ind, frac_tol, mask)
+            # The translations are matched in chunks of doubling size, so
+            # that little work is wasted when the search stops at an early
+            # match, and the chunks are capped to bound the memory. With
+            # break_on_match, each translation is matched on its own.
+            max_chunk = 1 if break_on_match else \
+                max(1, _MAX_BATCH_ELEMENTS // mask.size)
+            chunk = 1
+            lll_frac_tol = None
+            while True:
+                batch = list(itertools.islice(candidates, chunk))
+                if not batch:
+                    break
+                chunk = min(2 * chunk, max_chunk)
+                if lll_frac_tol is None:
+                    inv_lll_abc = np.array(avg_l.get_lll_reduced_lattice()
+                                           .reciprocal_lattice.abc)
+                    lll_frac_tol = inv_lll_abc * self.stol / \
+                        (np.pi * normalization)
+                if len(batch) == 1:
+                    results = [self._cart_dists(
+                        s1fc, batch[0][1], avg_l, mask, normalization,
+                        lll_frac_tol)]
+                else:
+                    results = self._cart_dists_many(
+                        s1fc, [t_s2fc for t, t_s2fc in batch], avg_l, mask,
+                        normalization, lll_frac_tol)
+                for (t, t_s2fc), (dist, t_adj, mapping) in zip(batch, results):
                     if use_rms:
                         val = np.linalg.norm(dist) / len(dist) ** 0.5
                     else:
@@ -726,14 +905,26 @@ class StructureMatcher(MSONable):
         if best_match and best_match[0] < self.stol:
             return best_match
 
-    def group_structures(self, s_list, anonymous=False):
+    def group_structures(self, s_list, anonymous=False, ncpus=None):
         """
         Given a list of structures, use fit to group
         them by structural equality.
 
+        Structures are first bucketed by invariants that must be equal for
+        two structures to fit, namely the composition hash and, unless
+        supercells are allowed, the number of sites in the reduced cell.
+        Without scaling, pairs whose volumes cannot be matched within ltol
+        are also skipped without calling fit. Since these invariants only
+        rule out pairs that would not fit anyway, the groups are the same
+        as if all pairs with equal composition hash were fitted. The
+        buckets are independent and can be processed in parallel.
+
         Args:
             s_list ([Structure]): List of structures to be grouped
             anonymous (bool): Wheher to use anonymous mode.
+            ncpus (int): Number of processes to use to fit the buckets in
+                parallel. Defaults to None, i.e., serial processing.
+                Progress is logged at the INFO level.
 
         Returns:
             A list of lists of matched structures
@@ -747,35 +938,123 @@ class StructureMatcher(MSONable):
         original_s_list = list(s_list)
         s_list = self._process_species(s_list)
 
-        # Use structure hash to pre-group structures
+        # Use structure hash to pre-group structures, and the other
+        # invariants to split these pre-groups into buckets.
         if anonymous:
             c_hash = lambda c: c.anonymized_formula
         else:
             c_hash = self._comparator.get_hash
-        s_hash = lambda s: c_hash(s[1].composition)
-        sorted_s_list = sorted(enumerate(s_list), key=s_hash)
+        c_hashes = [c_hash(s.composition) for s in s_list]
+        buckets = collections.OrderedDict()
+        for i in sorted(range(len(s_list)), key=lambda i: c_hashes[i]):
+            prepared = self.prepare(s_list[i])
+            num_sites, bound = self._get_group_invariants(prepared)
+            buckets.setdefault((c_hashes[i], num_sites), []).append(
+                (i, prepared, bound))
+        buckets = list(buckets.values())
+
+        # Start with the largest buckets for better load balancing.
+        order = sorted(range(len(buckets)), key=lambda i: -len(buckets[i]))
+        args = [(self, anonymous, buckets[i]) for i in order]
+        results = [None] * len(buckets)
+        pool = None
+        if ncpus and len(buckets) > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(ncpus)
+            groups_iter = pool.imap(_group_bucket, args)
+        else:
+            groups_iter = (_group_bucket(a) for a in args)
+        try:
+            ndone = 0
+            for n, (i, groups) in enumerate(zip(order, groups_iter)):
+                results[i] = groups
+                ndone += len(buckets[i])
+                logger.info("Grouped {} of {} buckets ({} of {} structures)"
+                            .format(n + 1, len(buckets), ndone, len(s_list)))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        # Groups of the same composition hash are put back in the order of
+        # their first structure, as if there were no buckets.
         all_groups = []
-
-        # For each pre-grouped list of structures, perform actual matching.
-        for k, g in itertools.groupby(sorted_s_list, key=s_hash):
-            unmatched = list(g)
-            while len(unmatched) > 0:
-                i, refs = unmatched.pop(0)
-                matches = [i]
-                if anonymous:
-                    inds = filter(lambda i: self.fit_anonymous(refs,
-                            unmatched[i][1]), list(range(len(unmatched))))
-                else:
-                    inds = filter(lambda i: self.fit(refs, unmatched[i][1]),
-                                  list(range(len(unmatched))))
-                inds = list(inds)
-                matches.extend([unmatched[i][0] for i in inds])
-                unmatched = [unmatched[i] for i in range(len(unmatched))
-                             if i not in inds]
-                all_groups.append([original_s_list[i] for i in matches])
+        for k, g in itertools.groupby(zip(buckets, results),
+                                      key=lambda x: c_hashes[x[0][0][0]]):
+            groups = sorted((grp for b, r in g for grp in r),
+                            key=lambda grp: grp[0])
+            all_groups.extend([original_s_list[i] for i in grp]
+                              for grp in groups)
 
         return all_groups
 
+    def _get_group_invariants(self, prepared):
+        """
+        Returns the number of sites of the reduced structure (None if
+        supercells are allowed) and, if the structures are not scaled, the
+        volume and the product of the lattice parameters of the reduced
+        structure, which are used to rule out pairs of structures in
+        group_structures.
+        """
+        if self._supercell:
+            return None, None
+        s = prepared.reduced
+        bound = None if self._scale else (s.volume, np.prod(s.lattice.abc))
+        return len(s), bound
+
+    def get_fingerprint(self, structure):
+        """
+        Returns a hashable key for a structure, such that structures that
+        fit under this matcher always have the same key. It combines the
+        comparator hash of the composition with the number of sites in the
+        reduced cell (see Structure.fingerprint), which must be equal for
+        structures to fit.
+
+        Args:
+            structure (Structure/PreparedStructure): Input structure.
+
+        Returns:
+            A hashable key.
+        """
+        if self._subset:
+            raise ValueError("allow_subset cannot be used with fingerprints")
+        s = self.prepare(structure)
+        key = self._comparator.get_hash(s.processed.composition)
+        if self._supercell:
+            # the number of sites is not invariant if supercells are allowed
+            return key, None
+        if self._primitive_cell:
+            return key, len(s.reduced)
+        return key, len(s.processed)
+
+    def get_unique_structures(self, s_list):
+        """
+        Removes duplicates from a list of structures. Structures are
+        bucketed by get_fingerprint, and each structure is only fitted
+        against the unique structures in its own bucket, so that the number
+        of fit calls per structure is usually small even for very large
+        lists.
+
+        The result is the same as taking the first structure of each group
+        from group_structures, but in the order of s_list.
+
+        Args:
+            s_list ([Structure]): List of structures.
+
+        Returns:
+            List of unique structures, i.e., the structures that do not fit
+            any structure earlier in s_list.
+        """
+        buckets = collections.defaultdict(list)
+        unique = []
+        for s in s_list:
+            prepared = self.prepare(s)
+            bucket = buckets[self.get_fingerprint(prepared)]
+            if self.fit_many(prepared, bucket) is None:
+                bucket.append(prepared)
+                unique.append(s)
+        return unique
+
     def as_dict(self):
         return {"version": __version__, "@module": self.__class__.__module__,
                 "@class": self.__class__.__name__,
@@ -938,15 +1217,19 @@ class StructureMatcher(MSONable):
         structures are similar.
 
         Args:
-            struct1 (Structure): 1st structure
-            struct2 (Structure): 2nd structure
+            struct1 (Structure/PreparedStructure): 1st structure
+            struct2 (Structure/PreparedStructure): 2nd structure
 
         Returns:
             True/False: Whether a species mapping can map struct1 to stuct2
         """
-        struct1, struct2 = self._process_species([struct1, struct2])
-        struct1, struct2, fu, s1_supercell = self._preprocess(struct1, struct2,
-                                                              niggli)
+        struct1, struct2 = self.prepare(struct1), self.prepare(struct2)
+        if niggli:
+            struct1, struct2, fu, s1_supercell = self._preprocess_reduced(
+                struct1.reduced, struct2.reduced)
+        else:
+            struct1, struct2, fu, s1_supercell = self._preprocess(
+                struct1.processed, struct2.processed, niggli)
 
         matches = self._anonymous_match(struct1, struct2, fu, s1_supercell,
                                         break_on_match=True, single_match=True)
@@ -1105,3 +1388,37 @@ class StructureMatcher(MSONable):
             return None
 
         return match[4]
+
+
+def _group_bucket(args):
+    """
+    Groups the structures of one bucket of group_structures. Module level
+    function to support multiprocessing.
+
+    Args:
+        args: (matcher, anonymous, [(index, structure, bound)]).
+
+    Returns:
+        List of lists of indices.
+    """
+    matcher, anonymous, unmatched = args
+    fit = matcher.fit_anonymous if anonymous else matcher.fit
+    max_ratio = (1 + matcher.ltol) ** 3 * (1 + 1e-8)
+    groups = []
+    while len(unmatched) > 0:
+        i, ref, ref_bound = unmatched[0]
+        matches = [i]
+        remaining = []
+        for j, s, bound in unmatched[1:]:
+            # The reference lattice must contain a basis with lengths below
+            # (1 + ltol) times those of the reduced lattice of s.
+            if ref_bound is not None and \
+                    ref_bound[0] > max_ratio * bound[1]:
+                remaining.append((j, s, bound))
+            elif fit(ref, s):
+                matches.append(j)
+            else:
+                remaining.append((j, s, bound))
+        groups.append(matches)
+        unmatched = remaining
+    return groups
@@ -138,6 +138,11 @@ class DiffusionAnalyzerTest(PymatgenTest):
                 ss[n].cart_coords - d.structure.cart_coords + d.drift[:, n_orig, :],
                 d.disp[:, n_orig, :])
 
+            traj = d.get_drift_corrected_trajectory(10, 1000, 20)
+            self.assertEqual(len(traj), 50)
+            self.assertArrayAlmostEqual(traj[n].cart_coords,
+                                        ss[n].cart_coords)
+
             d = DiffusionAnalyzer.from_dict(d.as_dict())
             self.assertIsInstance(d, DiffusionAnalyzer)
 
@@ -0,0 +1,94 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import os
+import unittest
+
+import numpy as np
+
+from pymatgen.analysis.rdf import RadialDistributionFunction
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.structure import Structure
+from pymatgen.io.vasp.outputs import Xdatcar
+from pymatgen.util.testing import PymatgenTest
+
+test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                        "test_files")
+
+
+class RadialDistributionFunctionTest(PymatgenTest):
+
+    def setUp(self):
+        self.nacl = Structure.from_spacegroup(
+            "Fm-3m", Lattice.cubic(5.69), ["Na", "Cl"],
+            [[0, 0, 0], [0.5, 0.5, 0.5]])
+
+    def test_rdf(self):
+        rdf = RadialDistributionFunction.from_structures([self.nacl],
+                                                         rmax=6, bin_width=0.05)
+        self.assertEqual(len(rdf.r), 120)
+        self.assertEqual(rdf.nframes, 1)
+        self.assertEqual(set(rdf.species), {self.nacl[0].specie,
+                                            self.nacl[-1].specie})
+        # First shell of 6 Cl around Na at a / 2, second shell of 12 Na.
+        cn = rdf.get_coordination_number("Na", "Cl")
+        self.assertAlmostEqual(cn[55], 0)
+        self.assertAlmostEqual(cn[56], 6)
+        self.assertAlmostEqual(rdf.get_coordination_number("Na", "Na")[80],
+                               12)
+        self.assertAlmostEqual(rdf.get_coordination_number()[80], 18)
+        g = rdf.get_rdf("Na", "Cl")
+        self.assertAlmostEqual(rdf.r[np.argmax(g)], 2.825)
+
+        # The total RDF is the average of the partials weighted by the
+        # pair densities.
+        g_total = rdf.get_rdf()
+        partials = sum(rdf.get_rdf(a, b) for a in ["Na", "Cl"]
+                       for b in ["Na", "Cl"])
+        self.assertArrayAlmostEqual(g_total, partials / 4)
+        self.assertRaises(ValueError, rdf.get_rdf, "Fe", "Cl")
+
+    def test_normalization(self):
+        # The RDF of an ideal gas tends to one.
+        np.random.seed(0)
+        s = Structure(Lattice.cubic(20), ["Ar"] * 1000,
+                      np.random.rand(1000, 3))
+        rdf = RadialDistributionFunction.from_structures([s], rmax=8,
+                                                         bin_width=0.5)
+        self.assertAlmostEqual(np.mean(rdf.get_rdf()[4:]), 1, 1)
+
+    def test_streaming(self):
+        filename = os.path.join(test_dir, "XDATCAR_4")
+        structures = Xdatcar(filename).structures
+        rdf = RadialDistributionFunction.from_xdatcar(filename, rmax=5,
+                                                      bin_width=0.1)
+        self.assertEqual(rdf.nframes, 4)
+        rdf2 = RadialDistributionFunction(rmax=5, bin_width=0.1)
+        for s in structures:
+            rdf2.add_structure(s)
+        self.assertArrayAlmostEqual(rdf.get_rdf("Li", "O"),
+                                    rdf2.get_rdf("Li", "O"))
+
+        # Frames with new species.
+        rdf2.add_structure(self.nacl)
+        self.assertEqual(len(rdf2.species), 4)
+        self.assertArrayAlmostEqual(rdf.get_rdf("Li", "O"),
+                                    rdf2.get_rdf("Li", "O"))
+        self.assertArrayAlmostEqual(rdf.get_coordination_number("Li", "O"),
+                                    rdf2.get_coordination_number("Li", "O"))
+
+    def test_lammps_dump(self):
+        filename = os.path.join(test_dir, "lammps", "nvt.dump")
+        rdf = RadialDistributionFunction.from_lammps_dump(
+            filename, {1: "O", 2: "H"}, rmax=3, bin_width=0.05)
+        self.assertEqual(rdf.nframes, 51)
+        # Two H bonded to each O in water.
+        cn = rdf.get_coordination_number("O", "H")
+        self.assertAlmostEqual(cn[23], 2, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from monty.json import MontyDecoder
+
+from pymatgen.analysis.structure_index import StructureIndex
+from pymatgen.analysis.structure_matcher import StructureMatcher, \
+    ElementComparator
+from pymatgen.entries.computed_entries import ComputedStructureEntry
+from pymatgen.util.testing import PymatgenTest
+
+test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                        "test_files")
+
+
+class StructureIndexTest(PymatgenTest):
+
+    def setUp(self):
+        with open(os.path.join(test_dir, "TiO2_entries.json"), 'r') as fp:
+            entries = json.load(fp, cls=MontyDecoder)
+        self.struct_list = [e.structure for e in entries]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_contains_and_find_matches(self):
+        sm = StructureMatcher()
+        index = StructureIndex()
+        unique = []
+        for s in self.struct_list:
+            if not index.contains(s):
+                index.add(s)
+                unique.append(s)
+        self.assertEqual(len(index), 11)
+        self.assertEqual(list(map(id, unique)),
+                         list(map(id, sm.get_unique_structures(
+                             self.struct_list))))
+        for s in self.struct_list:
+            matches = index.find_matches(s)
+            self.assertEqual(matches, [u for u in unique if sm.fit(u, s)])
+            self.assertEqual(len(matches), 1)
+        self.assertFalse(index.contains(self.get_structure("Li2O")))
+        self.assertEqual(index.find_matches(self.get_structure("Li2O")), [])
+
+    def test_fractional_occupancy(self):
+        # Compositions equal within the tolerance, with reduced formulas
+        # that differ in the last digit.
+        s1 = self.get_structure("Li2O")
+        s1.replace_species({"Li+": {"Li+": 0.3000000015,
+                                    "Na+": 0.6999999985}})
+        s2 = self.get_structure("Li2O")
+        s2.replace_species({"Li+": {"Li+": 0.3000000025,
+                                    "Na+": 0.6999999975}})
+        index = StructureIndex()
+        index.add(s1)
+        self.assertTrue(index.contains(s2))
+        self.assertEqual(index.find_matches(s2), [s1])
+
+    def test_persistence(self):
+        fname = os.path.join(self.tmp_dir, "index.db")
+        with StructureIndex(fname) as index:
+            index.extend(ComputedStructureEntry(s, -1, entry_id=i)
+                         for i, s in enumerate(self.struct_list[:5]))
+            index.add(self.struct_list[5])
+
+        s = self.struct_list[0].copy()
+        s.perturb(0.01)
+        with StructureIndex(fname) as index:
+            self.assertEqual(len(index), 6)
+            self.assertTrue(index.contains(s))
+            matches = index.find_matches(s)
+            self.assertEqual(matches[0].entry_id, 0)
+            self.assertEqual(matches[0].structure, self.struct_list[0])
+            self.assertEqual(index.find_matches(self.struct_list[5]),
+                             [self.struct_list[5]])
+            index.add(self.get_structure("Li2O"))
+            self.assertTrue(index.contains(self.get_structure("Li2O")))
+
+        with StructureIndex(fname, StructureMatcher(stol=0.1)) as index:
+            self.assertEqual(len(index), 7)
+        self.assertRaises(ValueError, StructureIndex, fname,
+                          StructureMatcher(comparator=ElementComparator()))
+
+
+if __name__ == "__main__":
+    unittest.main()
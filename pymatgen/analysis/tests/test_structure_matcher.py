@@ -296,6 +296,69 @@ class StructureMatcherTest(PymatgenTest):
         out = sm.group_structures(self.struct_list, anonymous=True)
         self.assertEqual(list(map(len, out)), [4, 1, 1, 1, 1, 1, 1, 1, 2, 2, 1])
 
+    def test_group_structures_parallel(self):
+        structures = self.struct_list + [s * [1, 1, 2]
+                                         for s in self.struct_list[:4]]
+        for sm in [StructureMatcher(), StructureMatcher(scale=False),
+                   StructureMatcher(attempt_supercell=True)]:
+            out = sm.group_structures(structures)
+            self.assertEqual(sum(map(len, out)), len(structures))
+            par = sm.group_structures(structures, ncpus=2)
+            self.assertEqual([list(map(id, g)) for g in out],
+                             [list(map(id, g)) for g in par])
+            # Groups are the same as fitting all pairs with the same
+            # composition.
+            for g in out:
+                for s in g[1:]:
+                    self.assertTrue(sm.fit(g[0], s))
+            firsts = [g[0] for g in out]
+            for i, s in enumerate(firsts):
+                for s2 in firsts[i + 1:]:
+                    if structures.index(s) < structures.index(s2):
+                        self.assertFalse(sm.fit(s, s2))
+
+    def test_get_unique_structures(self):
+        sm = StructureMatcher()
+        unique = sm.get_unique_structures(self.struct_list)
+        self.assertEqual(len(unique), 11)
+        firsts = [g[0] for g in sm.group_structures(self.struct_list)]
+        self.assertEqual(sorted(map(id, unique)), sorted(map(id, firsts)))
+        s = self.struct_list[0].copy()
+        self.assertEqual(sm.get_fingerprint(s),
+                         sm.get_fingerprint(s * [1, 2, 1]))
+        self.assertEqual(len(sm.get_unique_structures([s, s * [2, 1, 1]])), 1)
+        sm = StructureMatcher(allow_subset=True)
+        self.assertRaises(ValueError, sm.get_fingerprint, s)
+
+    def test_prepare_and_fit_many(self):
+        sm = StructureMatcher()
+        refs = [sm.prepare(s) for s in self.struct_list]
+        self.assertIs(sm.prepare(refs[0]), refs[0])
+        self.assertIs(refs[0].reduced, refs[0].reduced)
+        for s, p in zip(self.struct_list[:4], refs[:4]):
+            for s2, p2 in zip(self.struct_list, refs):
+                self.assertEqual(sm.fit(s, s2), sm.fit(p, p2))
+                self.assertEqual(sm.fit_anonymous(s, s2),
+                                 sm.fit_anonymous(p, s2))
+
+        s = self.struct_list[1].copy()
+        s.perturb(0.01)
+        i = sm.fit_many(s, refs)
+        self.assertTrue(sm.fit(self.struct_list[i], s))
+        self.assertFalse(any(sm.fit(r, s) for r in self.struct_list[:i]))
+        rev = refs[::-1]
+        self.assertEqual(sm.fit_many(s, rev),
+                         next(j for j, r in enumerate(rev) if sm.fit(r, s)))
+        li2o = self.get_structure("Li2O")
+        self.assertIsNone(sm.fit_many(li2o, refs))
+        self.assertEqual(sm.fit_many(li2o, [li2o * 2], anonymous=True), 0)
+
+        # Prepared structures are redone for other preprocessing settings.
+        li2o.remove_oxidation_states()
+        sm2 = StructureMatcher(ignored_species=["Li"])
+        p = sm2.prepare(sm.prepare(li2o))
+        self.assertEqual(p.processed.composition.elements, [Element("O")])
+
     def test_mix(self):
         structures = [self.get_structure("Li2O"),
                       self.get_structure("Li2O2"),
@@ -21,6 +21,7 @@ Tran, R.; Xu, Z.; Radhakrishnan, B.; Winston, D.; Persson, K. A.; Ong, S. P.
 from __future__ import division, unicode_literals
 from pymatgen.core.structure import Structure
 from pymatgen.core.surface import get_recp_symmetry_operation
+from pymatgen.core.operations import SymmOp
 from pymatgen.util.coord import get_angle
 import numpy as np
 import scipy as sp
@@ -232,8 +233,8 @@ class WulffShape(object):
 
         for i, (hkl, energy) in enumerate(zip(self.hkl_list,
                                               self.e_surf_list)):
-            for op in recp_symmops:
-                miller = tuple([int(x) for x in op.operate(hkl)])
+            for equiv in SymmOp.operate_all(recp_symmops, [hkl])[:, 0]:
+                miller = tuple([int(x) for x in equiv])
                 if miller not in all_hkl:
                     all_hkl.append(miller)
                     normal = recp.get_cartesian_coords(miller)
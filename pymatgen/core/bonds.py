@@ -4,11 +4,11 @@
 
 from __future__ import division, unicode_literals
 import os
-import json
 import collections
 import warnings
 
 from pymatgen.core.periodic_table import get_el_sp
+from pymatgen.util.io_utils import LazyMapping, load_data_file
 
 """
 This class implements definitions for various kinds of bonds. Typically used in
@@ -26,15 +26,14 @@ __date__ = "Jul 26, 2012"
 
 def _load_bond_length_data():
     """Loads bond length data from json file"""
-    with open(os.path.join(os.path.dirname(__file__),
-                           "bond_lengths.json")) as f:
-        data = collections.defaultdict(dict)
-        for row in json.load(f):
-            els = sorted(row['elements'])
-            data[tuple(els)][row['bond_order']] = row['length']
-        return data
-
-bond_lengths = _load_bond_length_data()
+    data = collections.defaultdict(dict)
+    for row in load_data_file(os.path.join(os.path.dirname(__file__),
+                                           "bond_lengths.json")):
+        els = sorted(row['elements'])
+        data[tuple(els)][row['bond_order']] = row['length']
+    return data
+
+bond_lengths = LazyMapping(_load_bond_length_data)
 
 
 class CovalentBond(object):
@@ -18,7 +18,12 @@ from collections import defaultdict
 from monty.serialization import loadfn
 from six.moves import filter, map, zip
 
-from functools import total_ordering
+from functools import total_ordering, wraps
+
+try:
+    from functools import lru_cache
+except ImportError:
+    from monty.functools import lru_cache
 
 from monty.fractions import gcd, gcd_float
 from pymatgen.core.periodic_table import get_el_sp, Element, Specie
@@ -41,6 +46,34 @@ __status__ = "Production"
 __date__ = "Nov 10, 2012"
 
 
+# Maximum number of distinct formula strings for which parsed formulas and
+# interned Compositions are kept.
+FORMULA_CACHE_SIZE = 4096
+
+
+def _cached_on_composition(method):
+    """
+    Caches the result of an argument-less Composition method on the
+    instance. Compositions are immutable, so the derived value can never
+    become stale. The result must be immutable too, since it is returned
+    as is on every call.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapped(self):
+        try:
+            cache = self._cache
+        except AttributeError:
+            cache = self._cache = {}
+        try:
+            return cache[name]
+        except KeyError:
+            val = cache[name] = method(self)
+            return val
+    return wrapped
+
+
 @total_ordering
 class Composition(collections.Hashable, collections.Mapping, MSONable):
     """
@@ -128,8 +161,16 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         # to pass the composition to dict()
         if len(args) == 1 and isinstance(args[0], Composition):
             elmap = args[0]
+            if self.allow_negative or not elmap.allow_negative:
+                self._data = elmap._data
+                self._natoms = elmap._natoms
+                # Same data, so the derived values of the original apply,
+                # unless they depend on a different allow_negative.
+                if self.allow_negative == elmap.allow_negative:
+                    self._cache = getattr(elmap, "_cache", {})
+                return
         elif len(args) == 1 and isinstance(args[0], six.string_types):
-            elmap = self._parse_formula(args[0])
+            elmap = _parse_formula(args[0])
         else:
             elmap = dict(*args, **kwargs)
         elamt = {}
@@ -139,7 +180,10 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
                 raise CompositionError("Amounts in Composition cannot be "
                                        "negative!")
             if abs(v) >= Composition.amount_tolerance:
-                elamt[get_el_sp(k)] = v
+                if isinstance(k, six.string_types):
+                    elamt[_get_el_sp_from_string(k)] = v
+                else:
+                    elamt[get_el_sp(k)] = v
                 self._natoms += abs(v)
         self._data = elamt
 
@@ -246,7 +290,7 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         Compositions with different elements.
         """
         hashcode = 0
-        for el, amt in self.items():
+        for el, amt in self._data.items():
             if abs(amt) > Composition.amount_tolerance:
                 hashcode += el.Z
         return hashcode
@@ -288,7 +332,26 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
     def copy(self):
         return Composition(self, allow_negative=self.allow_negative)
 
+    @classmethod
+    def interned(cls, formula):
+        """
+        Returns a shared Composition for a formula string. Up to
+        FORMULA_CACHE_SIZE recently used formulas are kept, so that code
+        creating many Compositions from a small set of formulas, e.g., when
+        processing entries, reuses both the objects and their cached
+        formulas. Since Compositions are immutable, this is only visible
+        through identity checks.
+
+        Args:
+            formula (str): A string formula, e.g. Fe2O3, Li3Fe2(PO4)3
+
+        Returns:
+            Composition
+        """
+        return _get_interned(formula)
+
     @property
+    @_cached_on_composition
     def formula(self):
         """
         Returns a formula string, with elements sorted by electronegativity,
@@ -300,6 +363,7 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         return " ".join(formula)
 
     @property
+    @_cached_on_composition
     def alphabetical_formula(self):
         """
         Returns a formula string, with elements sorted by alphabetically
@@ -339,6 +403,7 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         """
         return self.get_reduced_composition_and_factor()[0]
 
+    @_cached_on_composition
     def get_reduced_composition_and_factor(self):
         """
         Calculates a reduced composition and factor.
@@ -350,6 +415,7 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         factor = self.get_reduced_formula_and_factor()[1]
         return self / factor, factor
 
+    @_cached_on_composition
     def get_reduced_formula_and_factor(self):
         """
         Calculates a reduced formula and factor.
@@ -363,7 +429,7 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         if not all_int:
             return self.formula.replace(" ", ""), 1
         d = {k: int(round(v)) for k, v in self.get_el_amt_dict().items()}
-        (formula, factor) = reduce_formula(d)
+        (formula, factor) = _reduce_int_formula(tuple(sorted(d.items())))
 
         if formula in Composition.special_formulas:
             formula = Composition.special_formulas[formula]
@@ -402,6 +468,7 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         return self.get_reduced_formula_and_factor()[0]
 
     @property
+    @_cached_on_composition
     def hill_formula(self):
         c = self.element_composition
         elements = sorted([el.symbol for el in c.keys()])
@@ -465,40 +532,8 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
         """
         return get_el_sp(el).atomic_mass * abs(self[el]) / self.weight
 
-    def _parse_formula(self, formula):
-        """
-        Args:
-            formula (str): A string formula, e.g. Fe2O3, Li3Fe2(PO4)3
-
-        Returns:
-            Composition with that formula.
-        """
-        def get_sym_dict(f, factor):
-            sym_dict = collections.defaultdict(float)
-            for m in re.finditer(r"([A-Z][a-z]*)\s*([-*\.\d]*)", f):
-                el = m.group(1)
-                amt = 1
-                if m.group(2).strip() != "":
-                    amt = float(m.group(2))
-                sym_dict[el] += amt * factor
-                f = f.replace(m.group(), "", 1)
-            if f.strip():
-                raise CompositionError("{} is an invalid formula!".format(f))
-            return sym_dict
-
-        m = re.search(r"\(([^\(\)]+)\)\s*([\.\d]*)", formula)
-        if m:
-            factor = 1
-            if m.group(2) != "":
-                factor = float(m.group(2))
-            unit_sym_dict = get_sym_dict(m.group(1), factor)
-            expanded_sym = "".join(["{}{}".format(el, amt)
-                                    for el, amt in unit_sym_dict.items()])
-            expanded_formula = formula.replace(m.group(), expanded_sym)
-            return self._parse_formula(expanded_formula)
-        return get_sym_dict(formula, 1)
-
     @property
+    @_cached_on_composition
     def anonymized_formula(self):
         """
         An anonymized formula. Unique species are arranged in ordering of
@@ -897,6 +932,64 @@ class Composition(collections.Hashable, collections.Mapping, MSONable):
                         yield match
 
 
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _parse_formula(formula):
+    """
+    Args:
+        formula (str): A string formula, e.g. Fe2O3, Li3Fe2(PO4)3
+
+    Returns:
+        Dict of {symbol: amount} for the formula. Results are cached, so the
+        returned dict must not be modified.
+    """
+    def get_sym_dict(f, factor):
+        sym_dict = collections.defaultdict(float)
+        for m in re.finditer(r"([A-Z][a-z]*)\s*([-*\.\d]*)", f):
+            el = m.group(1)
+            amt = 1
+            if m.group(2).strip() != "":
+                amt = float(m.group(2))
+            sym_dict[el] += amt * factor
+            f = f.replace(m.group(), "", 1)
+        if f.strip():
+            raise CompositionError("{} is an invalid formula!".format(f))
+        return dict(sym_dict)
+
+    m = re.search(r"\(([^\(\)]+)\)\s*([\.\d]*)", formula)
+    if m:
+        factor = 1
+        if m.group(2) != "":
+            factor = float(m.group(2))
+        unit_sym_dict = get_sym_dict(m.group(1), factor)
+        expanded_sym = "".join(["{}{}".format(el, amt)
+                                for el, amt in unit_sym_dict.items()])
+        expanded_formula = formula.replace(m.group(), expanded_sym)
+        return _parse_formula(expanded_formula)
+    return get_sym_dict(formula, 1)
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _get_el_sp_from_string(symbol):
+    """
+    Cached get_el_sp for the species strings used as Composition keys.
+    """
+    return get_el_sp(symbol)
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _reduce_int_formula(sym_amt):
+    """
+    Cached reduce_formula for integer amounts given as sorted
+    ((symbol, amount), ...) tuples.
+    """
+    return reduce_formula(dict(sym_amt))
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _get_interned(formula):
+    return Composition(formula)
+
+
 def reduce_formula(sym_amt):
     """
     Helper method to reduce a sym_amt dict to a reduced formula and factor.
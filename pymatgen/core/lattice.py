@@ -15,7 +15,8 @@ from numpy import pi, dot, transpose, radians
 
 from monty.json import MSONable
 from monty.dev import deprecated
-from pymatgen.util.coord import pbc_shortest_vectors
+from pymatgen.util.coord import pbc_shortest_vectors, pbc_shortest_d2, \
+    find_points_in_spheres, get_pair_order
 from pymatgen.util.num import abs_cap
 
 """
@@ -536,28 +537,55 @@ class Lattice(MSONable):
             angles = np.arccos(x) * 180. / pi
             return angles
 
-        alphab = np.abs(get_angles(c_b, c_c, l_b, l_c) - alpha) < atol
-        betab = np.abs(get_angles(c_a, c_c, l_a, l_c) - beta) < atol
+        # Candidate vectors without a partner for each of the two angles
+        # they are involved in are discarded before the next angle table is
+        # computed.
         gammab = np.abs(get_angles(c_a, c_b, l_a, l_b) - gamma) < atol
-
-        for i, all_j in enumerate(gammab):
-            inds = np.logical_and(all_j[:, None],
-                                  np.logical_and(alphab,
-                                                 betab[i][None, :]))
-            for j, k in np.argwhere(inds):
-                scale_m = np.array((f_a[i], f_b[j], f_c[k]), dtype=np.int)
-                if abs(np.linalg.det(scale_m)) < 1e-8:
-                    continue
-
-                aligned_m = np.array((c_a[i], c_b[j], c_c[k]))
-
-                if skip_rotation_matrix:
-                    rotation_m = None
-                else:
-                    rotation_m = np.linalg.solve(aligned_m,
-                                                 other_lattice.matrix)
-
-                yield Lattice(aligned_m), rotation_m, scale_m
+        ia = np.nonzero(np.any(gammab, axis=1))[0]
+        ib = np.nonzero(np.any(gammab, axis=0))[0]
+        betab = np.abs(get_angles(c_a[ia], c_c, l_a[ia], l_c) - beta) < atol
+        ic = np.nonzero(np.any(betab, axis=0))[0]
+        keep_a = np.any(betab, axis=1)
+        alphab = np.abs(get_angles(c_b[ib], c_c[ic], l_b[ib], l_c[ic]) -
+                        alpha) < atol
+        keep_b, keep_c = np.any(alphab, axis=1), np.any(alphab, axis=0)
+        ia, ib, ic = ia[keep_a], ib[keep_b], ic[keep_c]
+        if len(ia) == 0 or len(ib) == 0 or len(ic) == 0:
+            return
+        gammab = gammab[np.ix_(ia, ib)]
+        betab = betab[keep_a][:, ic]
+        alphab = alphab[np.ix_(keep_b, keep_c)]
+
+        # Triplets are tested as dense boolean arrays, in chunks of
+        # consecutive a vectors so that mappings are produced lazily in the
+        # order of (a, b, c). The chunks start small, so that the first
+        # mapping is found quickly, and grow up to a bounded size.
+        max_chunk = max(1, 100000 // (len(ib) * len(ic)))
+        start, chunk = 0, 1
+        while start < len(ia):
+            valid = np.logical_and(
+                gammab[start:start + chunk, :, None],
+                np.logical_and(alphab[None, :, :],
+                               betab[start:start + chunk, None, :]))
+            i, j, k = np.nonzero(valid)
+            i, j, k = ia[i + start], ib[j], ic[k]
+            start, chunk = start + chunk, min(2 * chunk, max_chunk)
+            if len(i) == 0:
+                continue
+            scale_m = np.stack([f_a[i], f_b[j], f_c[k]], axis=1).astype(int)
+            dets = np.linalg.det(scale_m)
+            nonsingular = np.abs(dets) >= 1e-8
+            scale_m = scale_m[nonsingular]
+            aligned_m = np.stack([c_a[i], c_b[j], c_c[k]],
+                                 axis=1)[nonsingular]
+            if skip_rotation_matrix:
+                rotation_m = [None] * len(aligned_m)
+            else:
+                rotation_m = np.linalg.solve(
+                    aligned_m, np.broadcast_to(other_lattice.matrix,
+                                               aligned_m.shape))
+            for a, r, sm in zip(aligned_m, rotation_m, scale_m):
+                yield Lattice(a), r, sm
 
     def find_mapping(self, other_lattice, ltol=1e-5, atol=1,
                      skip_rotation_matrix=False):
@@ -936,19 +964,8 @@ class Lattice(MSONable):
         """
         Find all points within a sphere from the point taking into account
         periodic boundary conditions. This includes sites in other periodic
-        images.
-
-        Algorithm:
-
-        1. place sphere of radius r in crystal and determine minimum supercell
-           (parallelpiped) which would contain a sphere of radius r. for this
-           we need the projection of a_1 on a unit vector perpendicular
-           to a_2 & a_3 (i.e. the unit vector in the direction b_1) to
-           determine how many a_1"s it will take to contain the sphere.
-
-           Nxmax = r * length_of_b_1 / (2 Pi)
-
-        2. keep points falling within r.
+        images. See get_points_in_spheres for the algorithm, which should be
+        used directly when there are several centers.
 
         Args:
             frac_points: All points in the lattice in fractional coordinates.
@@ -964,48 +981,62 @@ class Lattice(MSONable):
             else:
                 fcoords, dists, inds
         """
-        # TODO: refactor to use lll matrix (nmax will be smaller)
-        recp_len = np.array(self.reciprocal_lattice.abc) / (2 * pi)
-        nmax = float(r) * recp_len + 0.01
-
-        pcoords = self.get_fractional_coords(center)
-        center = np.array(center)
-
-        n = len(frac_points)
-        fcoords = np.array(frac_points) % 1
-        indices = np.arange(n)
-
-        mins = np.floor(pcoords - nmax)
-        maxes = np.ceil(pcoords + nmax)
-        arange = np.arange(start=mins[0], stop=maxes[0])
-        brange = np.arange(start=mins[1], stop=maxes[1])
-        crange = np.arange(start=mins[2], stop=maxes[2])
-        arange = arange[:, None] * np.array([1, 0, 0])[None, :]
-        brange = brange[:, None] * np.array([0, 1, 0])[None, :]
-        crange = crange[:, None] * np.array([0, 0, 1])[None, :]
-        images = arange[:, None, None] + brange[None, :, None] +\
-            crange[None, None, :]
-
-        shifted_coords = fcoords[:, None, None, None, :] + \
-            images[None, :, :, :, :]
-
-        cart_coords = self.get_cartesian_coords(fcoords)
-        cart_images = self.get_cartesian_coords(images)
-        coords = cart_coords[:, None, None, None, :] + \
-            cart_images[None, :, :, :, :]
-        coords -= center[None, None, None, None, :]
-        coords **= 2
-        d_2 = np.sum(coords, axis=4)
-
-        within_r = np.where(d_2 <= r ** 2)
+        fcoords, dists, inds, _ = self.get_points_in_spheres(
+            frac_points, [center], r)
         if zip_results:
-            return list(zip(shifted_coords[within_r], np.sqrt(d_2[within_r]),
-                            indices[within_r[0]]))
+            return list(zip(fcoords, dists, inds))
         else:
-            return shifted_coords[within_r], np.sqrt(d_2[within_r]), \
-                indices[within_r[0]]
+            return fcoords, dists, inds
+
+    def get_points_in_spheres(self, frac_points, centers, r):
+        """
+        Find all points within a sphere of radius r around each of a set of
+        centers, taking into account periodic boundary conditions.
+
+        Algorithm:
+
+        1. Express the points in the LLL-reduced basis. Its nearly orthogonal
+           vectors minimize the number of periodic images that have to be
+           enumerated to cover a sphere, i.e., r * length_of_b_i / (2 Pi)
+           images along each reduced vector.
+        2. Enumerate these images once for all centers, keeping only those in
+           the bounding box of all the spheres, and bin them in a cell list
+           so that each center is only compared with nearby images (see
+           :func:`pymatgen.util.coord.find_points_in_spheres`).
+        3. Keep points falling within r.
 
-    def get_all_distances(self, fcoords1, fcoords2):
+        Memory use therefore scales with the number of neighbors found,
+        instead of with the number of points times the number of images for
+        every center.
+
+        Args:
+            frac_points: All points in the lattice in fractional coordinates.
+            centers: Cartesian coordinates of the centers of the spheres.
+            r: radius of the spheres.
+
+        Returns:
+            (fcoords, dists, inds, indptr) in compressed sparse row form. The
+            results for centers[m] are found in the slice
+            indptr[m]:indptr[m + 1] of the other arrays, sorted by point
+            index and then by periodic image. fcoords are the fractional
+            coordinates (in this lattice) of the periodic images of the
+            points, dists their distances from the center and inds their
+            indices in frac_points.
+        """
+        frac_points = np.array(frac_points, dtype=float).reshape((-1, 3))
+        centers = np.array(centers, dtype=float).reshape((-1, 3))
+        c_inds, inds, lll_images, dists = find_points_in_spheres(
+            Lattice(self.lll_matrix), self.get_lll_frac_coords(frac_points),
+            centers, r, exclude_self=False)
+        images = np.round(np.dot(lll_images, self.lll_mapping)).astype(int)
+        order = get_pair_order(c_inds, inds, images)
+        c_inds = c_inds[order]
+        inds = inds[order]
+        fcoords = frac_points[inds] + images[order]
+        indptr = np.searchsorted(c_inds, np.arange(len(centers) + 1))
+        return fcoords, dists[order], inds, indptr
+
+    def get_all_distances(self, fcoords1, fcoords2, num_threads=1):
         """
         Returns the distances between two lists of coordinates taking into
         account periodic boundary conditions and the lattice. Note that this
@@ -1018,13 +1049,16 @@ class Lattice(MSONable):
                 0.7] or [[1.1, 1.2, 4.3], [0.5, 0.6, 0.7]]. It can be a single
                 coord or any array of coords.
             fcoords2: Second set of fractional coordinates.
+            num_threads (int): Number of threads used to compute the
+                distances. Only has an effect if pymatgen was built with
+                OpenMP.
 
         Returns:
             2d array of cartesian distances. E.g the distance between
             fcoords1[i] and fcoords2[j] is distances[i,j]
         """
-        v, d2 = pbc_shortest_vectors(self, fcoords1, fcoords2, return_d2=True)
-        return np.sqrt(d2)
+        return np.sqrt(pbc_shortest_d2(self, fcoords1, fcoords2,
+                                       num_threads=num_threads))
 
     def is_hexagonal(self, hex_angle_tol=5, hex_length_tol=0.01):
         lengths, angles = self.lengths_and_angles
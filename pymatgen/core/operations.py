@@ -129,6 +129,28 @@ class SymmOp(MSONable):
             [points, np.ones(points.shape[:-1] + (1,))], axis=-1)
         return np.inner(affine_points, self.affine_matrix)[..., :-1]
 
+    @staticmethod
+    def operate_all(symmops, points):
+        """
+        Apply a sequence of operations on a list of points at once. This is
+        much faster than calling operate for every operation and point, e.g.,
+        to generate all symmetry equivalent positions.
+
+        Args:
+            symmops ([SymmOp]): Sequence of K operations.
+            points: List of N coordinates.
+
+        Returns:
+            (K, N, 3) numpy array, where element [k, n] is
+            symmops[k].operate(points[n]).
+        """
+        affine = np.array([op.affine_matrix for op in symmops],
+                          dtype=float).reshape((-1, 4, 4))
+        points = np.array(points, dtype=float).reshape((-1, 3))
+        affine_points = np.concatenate([points, np.ones((len(points), 1))],
+                                       axis=-1)
+        return np.inner(affine_points, affine)[..., :-1].transpose((1, 0, 2))
+
     def apply_rotation_only(self, vector):
         """
         Vectors should only be operated by the rotation matrix and not the
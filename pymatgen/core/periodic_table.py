@@ -6,17 +6,18 @@ from __future__ import division, unicode_literals, print_function
 
 import os
 import re
-import json
 <<<<<<< HEAD
 =======
 import warnings
 >>>>>>> a41cc069c865a5d0f35d0731f92c547467395b1b
-from io import open
 from enum import Enum
 
+import numpy as np
+
 from pymatgen.core.units import Mass, Length, unitized, FloatWithUnit, Unit, \
     SUPPORTED_UNIT_NAMES
 from pymatgen.util.string import formula_double_format
+from pymatgen.util.io_utils import load_data_file
 from monty.json import MSONable
 <<<<<<< HEAD
 from monty.dev import deprecated
@@ -39,12 +40,15 @@ __date__ = "Sep 23, 2011"
 
 
 # Loads element data from json file
-with open(os.path.join(os.path.dirname(__file__),
-                       "periodic_table.json"), "rt") as f:
-    _pt_data = json.load(f)
+_pt_data = load_data_file(os.path.join(os.path.dirname(__file__),
+                                       "periodic_table.json"))
 
 _pt_row_sizes = (2, 8, 8, 18, 18, 32, 32)
 
+# Z-indexed arrays of numeric element properties, built on first use by
+# Element.get_property_array.
+_pt_property_arrays = {}
+
 
 class Element(Enum):
     """
@@ -402,6 +406,7 @@ class Element(Enum):
             self.atomic_radius = Length(at_r, "ang")
         self.atomic_mass = Mass(d["Atomic mass"], "amu")
         self._data = d
+        self._parsed_data = {}
 
     @property
     def X(self):
@@ -427,6 +432,11 @@ class Element(Enum):
                     "density_of_solid", "atomic_radius_calculated",
                     "van_der_waals_radius", "atomic_orbitals",
                     "coefficient_of_linear_thermal_expansion"]:
+            # Parsing the data strings is slow, so each element only does it
+            # once per property.
+            parsed = self.__dict__.get("_parsed_data", {})
+            if item in parsed:
+                return parsed[item]
             kstr = item.capitalize().replace("_", " ")
             val = self._data.get(kstr, None)
             if str(val).startswith("no data"):
@@ -468,6 +478,7 @@ class Element(Enum):
                         except ValueError as ex:
                             # Ignore error. val will just remain a string.
                             pass
+            parsed[item] = val
             return val
         raise AttributeError
 
@@ -604,6 +615,47 @@ class Element(Enum):
                 return Element(sym)
         raise ValueError("No element with this atomic number %s" % z)
 
+    @staticmethod
+    def get_property_array(name):
+        """
+        Returns the values of a numeric property for all elements as a
+        read-only array indexed by atomic number, e.g.,
+        Element.get_property_array("X")[[8, 26]] gives the electronegativity
+        of O and Fe. This makes it possible to look up a property for many
+        atoms with a single numpy indexing operation. Each array is built once,
+        on first use.
+
+        Args:
+            name (str): Name of an Element attribute, e.g., "X",
+                "atomic_mass", "atomic_radius", "row" or "melting_point".
+                Values with units are given in the units of the attribute.
+
+        Returns:
+            Float array of length max(Z) + 1. Index 0 and elements with
+            missing or non-numeric data are NaN.
+        """
+        arr = _pt_property_arrays.get(name)
+        if arr is None:
+            arr = np.full(max(d["Atomic no"] for d in _pt_data.values()) + 1,
+                          np.nan)
+            for sym, d in _pt_data.items():
+                if name == "X":
+                    # Element.X warns and falls back to infinity.
+                    val = d.get("X")
+                else:
+                    try:
+                        val = getattr(Element(sym), name)
+                    except AttributeError:
+                        raise ValueError("{} is not an Element "
+                                         "property".format(name))
+                try:
+                    arr[d["Atomic no"]] = float(val)
+                except (TypeError, ValueError):
+                    pass
+            arr.flags.writeable = False
+            _pt_property_arrays[name] = arr
+        return arr
+
     @staticmethod
     def from_row_and_group(row, group):
         """
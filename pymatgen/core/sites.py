@@ -28,6 +28,33 @@ __email__ = "shyuep@gmail.com"
 __date__ = "Jul 17, 2012"
 
 
+def _get_species_and_order(atoms_n_occu):
+    """
+    Converts any of the species inputs supported by Site into a Composition.
+
+    Returns:
+        (Composition, bool) The species on the site and whether the site is
+        ordered, i.e., has a single species with occupancy 1.
+    """
+    if isinstance(atoms_n_occu, Composition):
+        # Compositions are immutable, so don't need to copy (much faster)
+        # Kludgy lookup of private attribute, but its faster
+        totaloccu = atoms_n_occu._natoms
+        if totaloccu > 1 + Composition.amount_tolerance:
+            raise ValueError("Species occupancies sum to more than 1!")
+        # Another kludgy lookup of private attribute, but its faster
+        return atoms_n_occu, (totaloccu == 1 and
+                              len(atoms_n_occu._data) == 1)
+    try:
+        return Composition({get_el_sp(atoms_n_occu): 1}), True
+    except TypeError:
+        species = Composition(atoms_n_occu)
+        totaloccu = species.num_atoms
+        if totaloccu > 1 + Composition.amount_tolerance:
+            raise ValueError("Species occupancies sum to more than 1!")
+        return species, totaloccu == 1 and len(species) == 1
+
+
 class Site(collections.Hashable, MSONable):
     """
     A generalized *non-periodic* site. This is essentially a composition
@@ -56,26 +83,7 @@ class Site(collections.Hashable, MSONable):
             properties: Properties associated with the site as a dict, e.g.
                 {"magmom": 5}. Defaults to None.
         """
-        if isinstance(atoms_n_occu, Composition):
-            # Compositions are immutable, so don't need to copy (much faster)
-            self._species = atoms_n_occu
-            # Kludgy lookup of private attribute, but its faster
-            totaloccu = atoms_n_occu._natoms
-            if totaloccu > 1 + Composition.amount_tolerance:
-                raise ValueError("Species occupancies sum to more than 1!")
-            # Another kludgy lookup of private attribute, but its faster
-            self._is_ordered = totaloccu == 1 and len(self._species._data) == 1
-        else:
-            try:
-                self._species = Composition({get_el_sp(atoms_n_occu): 1})
-                self._is_ordered = True
-            except TypeError:
-                self._species = Composition(atoms_n_occu)
-                totaloccu = self._species.num_atoms
-                if totaloccu > 1 + Composition.amount_tolerance:
-                    raise ValueError("Species occupancies sum to more than 1!")
-                self._is_ordered = totaloccu == 1 and len(self._species) == 1
-
+        self._species, self._is_ordered = _get_species_and_order(atoms_n_occu)
         self._coords = coords
         self._properties = properties if properties else {}
 
@@ -535,3 +543,708 @@ class PeriodicSite(Site, MSONable):
         props = d.get("properties", None)
         lattice = lattice if lattice else Lattice.from_dict(d["lattice"])
         return cls(atoms_n_occu, d["abc"], lattice, properties=props)
+
+
+class _MissingProperty(object):
+    """
+    Marker for a site that does not have a given property. Pickles by
+    reference so that identity checks survive copying.
+    """
+
+    def __reduce__(self):
+        return "_MISSING"
+
+    def __repr__(self):
+        return "_MISSING"
+
+
+_MISSING = _MissingProperty()
+
+
+class SiteStore(collections.MutableSequence):
+    """
+    Struct-of-arrays storage for the sites of a Structure or Molecule.
+
+    Instead of holding one Site object per site, the species are stored as
+    an index array into a table of unique Compositions, the coordinates as a
+    (N, 3) float array and each site property as one column of values.
+    Periodic stores keep both the fractional and the cartesian coordinates
+    of the sites. Site and PeriodicSite objects are only created when a site
+    is accessed, and are independent copies of the stored data, i.e.,
+    changes to the store need to be made through the store itself.
+
+    The store behaves like a list (or tuple, if it is not mutable) of sites,
+    so that existing code iterating over or indexing sites keeps working.
+
+    Every modification increments the generation counter and clears the
+    cache, a dict that owners can use to store quantities derived from the
+    sites, which therefore only need to be computed once per state.
+    """
+
+    def __init__(self, lattice=None, mutable=True):
+        """
+        Creates an empty store.
+
+        Args:
+            lattice (Lattice): Lattice of a periodic store. Use None (the
+                default) for non-periodic sites.
+            mutable (bool): Whether the sites can be modified through the
+                sequence interface. Defaults to True.
+        """
+        self.lattice = lattice
+        self.mutable = mutable
+        self._n = 0
+        self._coords = np.zeros((0, 3))
+        self._cart = np.zeros((0, 3)) if lattice is not None else None
+        self._sp_index = np.zeros(0, dtype=np.int32)
+        self._species = []
+        self._ordered = []
+        self._sp_lookup = {}
+        self._props = {}
+        self.generation = 0
+        self.cache = {}
+
+    @classmethod
+    def from_species_and_coords(cls, species, coords, lattice=None,
+                                coords_are_cartesian=False,
+                                to_unit_cell=False, site_properties=None,
+                                mutable=True):
+        """
+        Creates a store directly from arrays of species and coordinates,
+        without creating intermediate Site objects.
+
+        Args:
+            species ([Specie]): Sequence of species on each site, in any of
+                the formats supported by Site.
+            coords (Nx3 array): Coordinates of each site. These are
+                fractional coordinates for periodic stores unless
+                coords_are_cartesian is True, and cartesian coordinates
+                otherwise.
+            lattice (Lattice): Lattice for periodic stores. Defaults to None.
+            coords_are_cartesian (bool): Whether coords are cartesian for a
+                periodic store. Defaults to False.
+            to_unit_cell (bool): Whether to map fractional coordinates into
+                the unit cell. Defaults to False.
+            site_properties (dict): Properties as a dict of sequences.
+            mutable (bool): Whether the store can be modified.
+
+        Returns:
+            SiteStore
+        """
+        store = cls(lattice=lattice, mutable=mutable)
+        n = len(species)
+        coords = np.array(coords, dtype=float).reshape((n, 3))
+        if lattice is not None:
+            if coords_are_cartesian:
+                fcoords = lattice.get_fractional_coords(coords)
+                cart = coords
+            else:
+                fcoords = coords
+                cart = lattice.get_cartesian_coords(coords)
+            if to_unit_cell:
+                fcoords = np.mod(fcoords, 1)
+                cart = lattice.get_cartesian_coords(fcoords)
+            store._coords = np.array(fcoords, dtype=float).reshape((n, 3))
+            store._cart = np.array(cart, dtype=float).reshape((n, 3))
+        else:
+            store._coords = coords
+
+        # Species inputs are usually a handful of repeated strings or
+        # elements, so the conversion is cached on the input where possible.
+        cache = {}
+        sp_index = np.empty(n, dtype=np.int32)
+        for i, sp in enumerate(species):
+            try:
+                ind = cache[sp]
+            except (KeyError, TypeError):
+                ind = store._species_id(sp)
+                try:
+                    cache[sp] = ind
+                except TypeError:
+                    pass
+            sp_index[i] = ind
+        store._sp_index = sp_index
+        store._n = n
+        if site_properties:
+            for k, v in site_properties.items():
+                store._props[k] = [v[i] for i in range(n)]
+        return store
+
+    @classmethod
+    def from_arrays(cls, species_table, species_indices, coords, lattice=None,
+                    site_properties=None, mutable=True):
+        """
+        Creates a store from a table of species and the index of each site
+        into it, which avoids converting the species of every site. This is
+        the layout of SiteStore itself and of the compact serialization in
+        pymatgen.io.compact.
+
+        Args:
+            species_table ([Composition]): Table of species and occupancies.
+            species_indices (array): Index of the species of each site in
+                species_table.
+            coords (Nx3 array): Fractional coordinates for periodic stores,
+                cartesian coordinates otherwise.
+            lattice (Lattice): Lattice for periodic stores. Defaults to None.
+            site_properties (dict): Properties as a dict of sequences.
+            mutable (bool): Whether the store can be modified.
+
+        Returns:
+            SiteStore
+        """
+        store = cls(lattice=lattice, mutable=mutable)
+        species_indices = np.asarray(species_indices)
+        n = len(species_indices)
+        # Only the species that are used are added to the table of the store.
+        lookup = np.zeros(len(species_table), dtype=np.int32)
+        for i in sorted(set(species_indices.tolist())):
+            lookup[i] = store._species_id(species_table[i])
+        coords = np.array(coords, dtype=float).reshape((n, 3))
+        store._coords = coords
+        if lattice is not None:
+            store._cart = lattice.get_cartesian_coords(coords)
+        store._sp_index = lookup[species_indices]
+        store._n = n
+        if site_properties:
+            for k, v in site_properties.items():
+                store._props[k] = [v[i] for i in range(n)]
+        return store
+
+    @classmethod
+    def from_sites(cls, sites, periodic, lattice=None, mutable=True):
+        """
+        Creates a store from a sequence of sites.
+
+        Args:
+            sites ([Site]): Sequence of sites. If a SiteStore of the same
+                periodicity is provided, it is copied.
+            periodic (bool): Whether to create a periodic store.
+            lattice (Lattice): Lattice of a periodic store. Defaults to the
+                lattice of the first site, and only needs to be provided
+                if sites is empty.
+            mutable (bool): Whether the store can be modified.
+
+        Returns:
+            SiteStore
+        """
+        if isinstance(sites, SiteStore) and \
+                (sites.lattice is not None) == periodic:
+            return sites.copy(mutable=mutable)
+        sites = list(sites)
+        if periodic and sites:
+            lattice = sites[0].lattice
+        store = cls(lattice=lattice if periodic else None, mutable=mutable)
+        n = len(sites)
+        store._reserve(n)
+        store._n = n
+        for i, site in enumerate(sites):
+            store._set_row(i, site)
+        return store
+
+    def copy(self, mutable=None):
+        """
+        Returns a copy of the store.
+
+        Args:
+            mutable (bool): Whether the copy can be modified. Defaults to
+                the same mutability as the original.
+        """
+        n = self._n
+        new = SiteStore(lattice=self.lattice,
+                        mutable=self.mutable if mutable is None else mutable)
+        new._n = n
+        new._coords = self._coords[:n].copy()
+        if self._cart is not None:
+            new._cart = self._cart[:n].copy()
+        new._sp_index = self._sp_index[:n].copy()
+        new._species = list(self._species)
+        new._ordered = list(self._ordered)
+        new._sp_lookup = dict(self._sp_lookup)
+        new._props = {k: list(v) for k, v in self._props.items()}
+        # Cached values are never modified in place, so they can be shared.
+        new.cache = dict(self.cache)
+        return new
+
+    @property
+    def is_periodic(self):
+        """
+        True if the store holds PeriodicSites.
+        """
+        return self.lattice is not None
+
+    @property
+    def frac_coords(self):
+        """
+        Copy of the fractional coordinates as a Nx3 array. Only available
+        for periodic stores.
+        """
+        if self.lattice is None:
+            raise AttributeError("Non-periodic sites do not have fractional "
+                                 "coordinates!")
+        return self._coords[:self._n].copy()
+
+    @property
+    def cart_coords(self):
+        """
+        Copy of the cartesian coordinates as a Nx3 array.
+        """
+        if self._cart is not None:
+            return self._cart[:self._n].copy()
+        return self._coords[:self._n].copy()
+
+    @property
+    def species_and_occu(self):
+        """
+        List of the species and occupancies (Compositions) of each site.
+        """
+        table = self._species
+        return [table[i] for i in self._sp_index[:self._n]]
+
+    @property
+    def species(self):
+        """
+        List of the Specie/Element on each site. Only works for ordered
+        sites, otherwise an AttributeError is raised as for Site.specie.
+        """
+        table = [list(comp.keys())[0] if ordered else None
+                 for comp, ordered in zip(self._species, self._ordered)]
+        species = [table[i] for i in self._sp_index[:self._n]]
+        if any(sp is None for sp in species):
+            raise AttributeError("specie property only works for ordered "
+                                 "sites!")
+        return species
+
+    @property
+    def species_indices(self):
+        """
+        Copy of the index of each site into unique_species.
+        """
+        return self._sp_index[:self._n].copy()
+
+    @property
+    def unique_species(self):
+        """
+        Table of the Compositions referenced by species_indices.
+        """
+        return list(self._species)
+
+    @property
+    def is_ordered(self):
+        """
+        True if all sites have a single species with occupancy 1.
+        """
+        ordered = self._ordered
+        return all(ordered[i] for i in np.unique(self._sp_index[:self._n]))
+
+    @property
+    def site_properties(self):
+        """
+        Site properties as a dict of lists. Sites without a property
+        have None as value.
+        """
+        props = {}
+        for k, col in self._props.items():
+            if any(v is not _MISSING for v in col):
+                props[k] = [None if v is _MISSING else v for v in col]
+        return props
+
+    def set_lattice(self, lattice):
+        """
+        Changes the lattice of a periodic store, keeping the fractional
+        coordinates of all sites fixed.
+
+        Args:
+            lattice (Lattice): New lattice.
+        """
+        if self.lattice is None:
+            raise ValueError("Cannot set a lattice on non-periodic sites!")
+        self.lattice = lattice
+        n = self._n
+        self._cart[:n] = lattice.get_cartesian_coords(self._coords[:n])
+        self._touch()
+
+    def update_coords(self, coords, indices=None,
+                      coords_are_cartesian=False):
+        """
+        Updates the coordinates of sites.
+
+        Args:
+            coords (Nx3 array): New coordinates.
+            indices ([int]): Indices of the sites to update. Defaults to all
+                sites.
+            coords_are_cartesian (bool): Whether the new coordinates are
+                cartesian for a periodic store. Non-periodic stores always
+                take cartesian coordinates.
+        """
+        n = self._n
+        if indices is None:
+            indices = slice(0, n)
+        coords = np.array(coords, dtype=float)
+        if self.lattice is None:
+            self._coords[indices] = coords
+        elif coords_are_cartesian:
+            self._coords[indices] = self.lattice.get_fractional_coords(coords)
+            self._cart[indices] = coords
+        else:
+            self._coords[indices] = coords
+            self._cart[indices] = self.lattice.get_cartesian_coords(coords)
+        self._touch()
+
+    def update_species(self, species, indices=None):
+        """
+        Updates the species of sites.
+
+        Args:
+            species ([Composition]): New species of each site, in any of the
+                formats supported by Site.
+            indices ([int]): Indices of the sites to update. Defaults to all
+                sites.
+        """
+        if indices is None:
+            indices = range(self._n)
+        for i, sp in zip(indices, species):
+            self._sp_index[i] = self._species_id(sp)
+        self._touch()
+
+    def map_species(self, func):
+        """
+        Replaces the species of all sites by applying a function to each
+        distinct species in the store. Since only unique species are
+        processed, this is much faster than a site by site replacement.
+
+        Args:
+            func: Function taking a Composition and returning the new
+                species in any format supported by Site.
+        """
+        used = np.unique(self._sp_index[:self._n])
+        # Apply func to everything first so that the store is left
+        # untouched if it raises.
+        new_species = [func(self._species[i]) for i in used]
+        new_index = np.zeros(len(self._species), dtype=np.int32)
+        self._species = []
+        self._ordered = []
+        self._sp_lookup = {}
+        for i, sp in zip(used, new_species):
+            new_index[i] = self._species_id(sp)
+        self._sp_index[:self._n] = new_index[self._sp_index[:self._n]]
+        self._touch()
+
+    def set_property(self, name, values):
+        """
+        Sets a property on all sites.
+
+        Args:
+            name (str): Name of the property.
+            values: Sequence of values, one per site.
+        """
+        if len(values) != self._n:
+            raise ValueError("Values must be same length as sites.")
+        self._props[name] = [values[i] for i in range(self._n)]
+        self._touch()
+
+    def remove_property(self, name):
+        """
+        Removes a property from all sites.
+
+        Args:
+            name (str): Name of the property.
+        """
+        self._props.pop(name, None)
+        self._touch()
+
+    def take(self, indices):
+        """
+        Keeps only the sites at the given indices, in the given order.
+        Used for in place reordering and deletion of sites.
+
+        Args:
+            indices ([int]): Indices of sites to keep.
+        """
+        self._check_mutable()
+        indices = np.array(indices, dtype=np.int_).reshape(-1)
+        if len(indices) and (indices.min() < -self._n or
+                             indices.max() >= self._n):
+            raise IndexError("Site index out of range")
+        n = len(indices)
+        self._coords = self._coords[:self._n][indices]
+        if self._cart is not None:
+            self._cart = self._cart[:self._n][indices]
+        self._sp_index = self._sp_index[:self._n][indices]
+        self._props = {k: [col[i] for i in indices]
+                       for k, col in self._props.items()}
+        self._n = n
+        self._touch()
+
+    def sort(self, key=None, reverse=False):
+        """
+        Sorts the sites in place, with the same arguments as list.sort.
+        """
+        sites = list(self)
+        if key is None:
+            order = sorted(range(self._n), key=lambda i: sites[i],
+                           reverse=reverse)
+        else:
+            order = sorted(range(self._n), key=lambda i: key(sites[i]),
+                           reverse=reverse)
+        self.take(order)
+
+    def tile(self, translations, lattice, to_unit_cell=False, by_site=True,
+             mutable=None):
+        """
+        Returns a new periodic store in which every site is repeated once
+        for each of a set of translations, e.g., to build a supercell. This
+        is done on the arrays directly, without creating any sites.
+
+        Args:
+            translations (Mx3 array): Cartesian translation vectors.
+            lattice (Lattice): Lattice of the new store.
+            to_unit_cell (bool): Whether to map the new fractional
+                coordinates into the unit cell. Defaults to False.
+            by_site (bool): If True (the default), the copies of each site
+                are consecutive, like numpy.repeat. Otherwise, all sites are
+                repeated as a block for each translation, like numpy.tile.
+            mutable (bool): Whether the new store can be modified. Defaults
+                to the same mutability as this store.
+
+        Returns:
+            SiteStore
+        """
+        n = self._n
+        translations = np.array(translations, dtype=float).reshape((-1, 3))
+        m = len(translations)
+        coords = self._coords[:n] if self._cart is None else self._cart[:n]
+        if by_site:
+            cart = coords[:, None, :] + translations[None, :, :]
+            sp_index = np.repeat(self._sp_index[:n], m)
+            props = {k: [v for v in col for _ in range(m)]
+                     for k, col in self._props.items()}
+        else:
+            cart = coords[None, :, :] + translations[:, None, :]
+            sp_index = np.tile(self._sp_index[:n], m)
+            props = {k: col[:n] * m for k, col in self._props.items()}
+        cart = cart.reshape((-1, 3))
+        fcoords = lattice.get_fractional_coords(cart)
+        if to_unit_cell:
+            fcoords = np.mod(fcoords, 1)
+            cart = lattice.get_cartesian_coords(fcoords)
+        new = SiteStore(lattice=lattice,
+                        mutable=self.mutable if mutable is None else mutable)
+        new._n = n * m
+        new._coords = fcoords
+        new._cart = cart
+        new._sp_index = sp_index
+        new._species = list(self._species)
+        new._ordered = list(self._ordered)
+        new._sp_lookup = dict(self._sp_lookup)
+        new._props = props
+        return new
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._n)
+            return list(self._iter_sites(start, stop, step))
+        return self._make_site(self._normalize_index(i))
+
+    def __setitem__(self, i, site):
+        self._check_mutable()
+        if isinstance(i, slice):
+            inds = range(*i.indices(self._n))
+            site = list(site)
+            if len(site) != len(inds):
+                raise ValueError("Slice assignment cannot change the number "
+                                 "of sites")
+            for j, s in zip(inds, site):
+                self._set_row(j, s)
+        else:
+            self._set_row(self._normalize_index(i), site)
+        self._touch()
+
+    def __delitem__(self, i):
+        self._check_mutable()
+        keep = np.ones(self._n, dtype=bool)
+        if isinstance(i, slice):
+            keep[i] = False
+        else:
+            keep[self._normalize_index(i)] = False
+        self.take(np.where(keep)[0])
+
+    def insert(self, i, site):
+        """
+        Inserts a site before index i, as in list.insert.
+        """
+        self._check_mutable()
+        n = self._n
+        i = max(0, min(n, i + n if i < 0 else i))
+        self._reserve(n + 1)
+        self._coords[i + 1:n + 1] = self._coords[i:n]
+        if self._cart is not None:
+            self._cart[i + 1:n + 1] = self._cart[i:n]
+        self._sp_index[i + 1:n + 1] = self._sp_index[i:n]
+        for col in self._props.values():
+            col.insert(i, _MISSING)
+        self._n = n + 1
+        try:
+            self._set_row(i, site)
+        except Exception:
+            self.take([j for j in range(n + 1) if j != i])
+            raise
+        self._touch()
+
+    def __iter__(self):
+        return self._iter_sites(0, self._n, 1)
+
+    def __eq__(self, other):
+        if isinstance(other, (SiteStore, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getstate__(self):
+        d = dict(self.__dict__)
+        n = self._n
+        d["_coords"] = self._coords[:n].copy()
+        if self._cart is not None:
+            d["_cart"] = self._cart[:n].copy()
+        d["_sp_index"] = self._sp_index[:n].copy()
+        d["cache"] = {}
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+
+    def _touch(self):
+        """
+        Records a modification of the sites.
+        """
+        self.generation += 1
+        self.cache = {}
+
+    def _check_mutable(self):
+        if not self.mutable:
+            raise TypeError("Sites of an immutable structure cannot be "
+                            "modified")
+
+    def _normalize_index(self, i):
+        i = int(i) if isinstance(i, np.integer) else i
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("Site index out of range")
+        return i
+
+    def _reserve(self, n):
+        """
+        Grows the arrays to hold at least n sites. Capacity is doubled so
+        that repeated appends are amortized O(1), as for lists.
+        """
+        cap = len(self._coords)
+        if n <= cap:
+            return
+        cap = max(n, 2 * cap, 8)
+
+        def grow(a):
+            new = np.zeros((cap,) + a.shape[1:], dtype=a.dtype)
+            new[:self._n] = a[:self._n]
+            return new
+
+        self._coords = grow(self._coords)
+        if self._cart is not None:
+            self._cart = grow(self._cart)
+        self._sp_index = grow(self._sp_index)
+
+    def _species_id(self, sp):
+        comp, ordered = _get_species_and_order(sp)
+        try:
+            return self._sp_lookup[comp]
+        except KeyError:
+            ind = len(self._species)
+            self._species.append(comp)
+            self._ordered.append(ordered)
+            self._sp_lookup[comp] = ind
+            return ind
+
+    def _set_row(self, i, site):
+        """
+        Stores a site at row i < len(self). Property columns that the site
+        does not have are marked as missing for that row.
+        """
+        self._sp_index[i] = self._species_id(site._species)
+        if self.lattice is None:
+            self._coords[i] = site._coords
+        else:
+            latt = getattr(site, "_lattice", None)
+            if latt is self.lattice or (latt is not None and
+                                        latt == self.lattice):
+                self._coords[i] = site._fcoords
+            else:
+                self._coords[i] = self.lattice.get_fractional_coords(
+                    site._coords)
+            self._cart[i] = site._coords
+        props = site._properties
+        for k, col in self._props.items():
+            col[i] = props.get(k, _MISSING)
+        for k, v in props.items():
+            if k not in self._props:
+                col = [_MISSING] * self._n
+                col[i] = v
+                self._props[k] = col
+
+    def _iter_sites(self, start, stop, step):
+        """
+        Generates sites for a range of indices. The arrays are copied once
+        up front, which is much faster than copying for each site.
+        """
+        inds = range(start, stop, step)
+        if not inds:
+            return
+        # Compact copies of the selected rows. Each site gets a row view,
+        # so sites never share memory with the store.
+        coords = self._coords[start:stop:step].copy()
+        cart = self._cart[start:stop:step].copy() \
+            if self._cart is not None else None
+        sp_index = self._sp_index[start:stop:step].tolist()
+        table, ordered = self._species, self._ordered
+        props = list(self._props.items())
+        periodic = self.lattice is not None
+        cls = PeriodicSite if periodic else Site
+        for j, i in enumerate(inds):
+            site = cls.__new__(cls)
+            ind = sp_index[j]
+            site._species = table[ind]
+            site._is_ordered = ordered[ind]
+            site._properties = {k: col[i] for k, col in props
+                                if col[i] is not _MISSING}
+            if periodic:
+                site._lattice = self.lattice
+                site._fcoords = coords[j]
+                site._coords = cart[j]
+            else:
+                site._coords = coords[j]
+            yield site
+
+    def _make_site(self, i):
+        ind = self._sp_index[i]
+        cls = Site if self.lattice is None else PeriodicSite
+        site = cls.__new__(cls)
+        site._species = self._species[ind]
+        site._is_ordered = self._ordered[ind]
+        site._properties = {k: col[i] for k, col in self._props.items()
+                            if col[i] is not _MISSING}
+        if self.lattice is None:
+            site._coords = self._coords[i].copy()
+        else:
+            site._lattice = self.lattice
+            site._fcoords = self._coords[i].copy()
+            site._coords = self._cart[i].copy()
+        return site
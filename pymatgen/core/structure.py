@@ -14,6 +14,7 @@ import random
 import warnings
 from fnmatch import fnmatch
 import re
+import functools
 
 try:
     # New Py>=3.5 import
@@ -30,11 +31,13 @@ from pymatgen.core.operations import SymmOp
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.periodic_table import Element, Specie, get_el_sp, DummySpecie
 from monty.json import MSONable
-from pymatgen.core.sites import Site, PeriodicSite
-from pymatgen.core.bonds import CovalentBond, get_bond_length
+from pymatgen.core.sites import Site, PeriodicSite, SiteStore
+from pymatgen.core.bonds import CovalentBond, get_bond_length, bond_lengths
 from pymatgen.core.composition import Composition
 from pymatgen.util.coord import get_angle, all_distances, \
-    lattice_points_in_supercell
+    lattice_points_in_supercell, find_points_in_spheres, \
+    iter_points_in_spheres, coords_in_list_pbc
+from pymatgen.util.io_utils import LazyMapping
 from pymatgen.core.units import Mass, Length
 
 from monty.io import zopen
@@ -53,12 +56,59 @@ __status__ = "Production"
 __date__ = "Sep 23, 2011"
 
 
+def _cached_on_sites(func):
+    """
+    Decorator for properties derived from the sites of a SiteCollection.
+    The value is cached on the SiteStore holding the sites and is
+    therefore computed at most once until the sites are next modified.
+    Cached numpy arrays and lists are copied on return, so that callers can
+    modify the results freely.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        cache = self._sites.cache
+        try:
+            val = cache[name]
+        except KeyError:
+            val = cache[name] = func(self)
+        if isinstance(val, np.ndarray):
+            return val.copy()
+        if isinstance(val, list):
+            return list(val)
+        return val
+
+    return property(wrapper)
+
+
+def _get_single_npz_object(objects, filename, cls):
+    """
+    Returns the structure or molecule of a npz file holding a single
+    object, which may be an entry. Raises a ValueError if it is not an
+    instance of cls, e.g., a Molecule read with Structure.from_file.
+    """
+    if len(objects) != 1:
+        raise ValueError("%s contains %d objects. Use "
+                         "pymatgen.io.compact.load_npz to read batches."
+                         % (filename, len(objects)))
+    obj = getattr(objects[0], "structure", objects[0])
+    if not isinstance(obj, cls):
+        raise ValueError("%s contains a %s, which cannot be read as a %s."
+                         % (filename, obj.__class__.__name__, cls.__name__))
+    return obj
+
+
 class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
     """
     Basic SiteCollection. Essentially a sequence of Sites or PeriodicSites.
     This serves as a base class for Molecule (a collection of Site, i.e., no
     periodicity) and Structure (a collection of PeriodicSites, i.e.,
     periodicity). Not meant to be instantiated directly.
+
+    Subclasses hold their sites in a :class:`pymatgen.core.sites.SiteStore`
+    as the _sites attribute, which keeps species, coordinates and site
+    properties as arrays and only creates Site objects on access.
     """
 
     # Tolerance in Angstrom for determining if sites are too close.
@@ -86,7 +136,7 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         """
         return
 
-    @property
+    @_cached_on_sites
     def distance_matrix(self):
         """
         Returns the distance matrix between all sites in the structure. For
@@ -104,21 +154,21 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         Returns:
             ([Specie]) List of species at each site of the structure.
         """
-        return [site.specie for site in self]
+        return self._sites.species
 
     @property
     def species_and_occu(self):
         """
         List of species and occupancies at each site of the structure.
         """
-        return [site.species_and_occu for site in self]
+        return self._sites.species_and_occu
 
     @property
     def ntypesp(self):
         """Number of types of atoms."""
         return len(self.types_of_specie)
 
-    @property
+    @_cached_on_sites
     def types_of_specie(self):
         """
         List of types of specie. Only works for ordered structures.
@@ -126,9 +176,9 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         """
         # Cannot use set since we want a deterministic algorithm.
         types = []
-        for site in self:
-            if site.specie not in types:
-                types.append(site.specie)
+        for specie in self.species:
+            if specie not in types:
+                types.append(specie)
         return types
 
     def group_by_types(self):
@@ -157,7 +207,55 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
     @property
     def atomic_numbers(self):
         """List of atomic numbers."""
-        return [site.specie.number for site in self]
+        return [specie.number for specie in self.species]
+
+    def get_property_array(self, name):
+        """
+        Returns a numeric property of the species on every site, e.g.,
+        structure.get_property_array("X") for the electronegativities. The
+        property is only looked up once per distinct species, so this is
+        much faster than iterating over the sites for large structures.
+
+        Args:
+            name (str): Name of a numeric Element or Specie attribute, e.g.,
+                "X", "atomic_mass", "row" or "ionic_radius". Element
+                properties are taken from Element.get_property_array.
+
+        Returns:
+            Float array with the value for each site. Disordered sites get
+            the occupancy-weighted average of their species. Missing data
+            is NaN.
+        """
+        store = self._sites
+        key = ("property_array", name)
+        arr = store.cache.get(key)
+        if arr is None:
+            table = None
+            values = []
+            for comp in store.unique_species:
+                total, occu = 0, 0
+                for sp, amt in comp.items():
+                    if isinstance(sp, Element):
+                        if table is None:
+                            table = Element.get_property_array(name)
+                        val = table[sp.Z]
+                    else:
+                        try:
+                            val = getattr(sp, name)
+                        except AttributeError:
+                            raise ValueError("{} is not a property of "
+                                             "{}".format(name, sp))
+                        try:
+                            val = float(val)
+                        except (TypeError, ValueError):
+                            val = np.nan
+                    total += amt * val
+                    occu += amt
+                values.append(total / occu)
+            arr = np.array(values, dtype=float)[store.species_indices] \
+                if values else np.zeros(0)
+            store.cache[key] = arr
+        return arr.copy()
 
     @property
     def site_properties(self):
@@ -165,14 +263,7 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         Returns the site properties as a dict of sequences. E.g.,
         {"magmom": (5,-5), "charge": (-4,4)}.
         """
-        props = {}
-        prop_keys = set()
-        for site in self:
-            prop_keys.update(site.properties.keys())
-
-        for k in prop_keys:
-            props[k] = [site.properties.get(k, None) for site in self]
-        return props
+        return self._sites.site_properties
 
     def __contains__(self, site):
         return site in self.sites
@@ -203,7 +294,7 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         Returns a np.array of the cartesian coordinates of sites in the
         structure.
         """
-        return np.array([site.coords for site in self])
+        return self._sites.cart_coords
 
     @property
     def formula(self):
@@ -212,14 +303,14 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         """
         return self.composition.formula
 
-    @property
+    @_cached_on_sites
     def composition(self):
         """
         (Composition) Returns the composition
         """
         elmap = collections.defaultdict(float)
-        for site in self:
-            for species, occu in site.species_and_occu.items():
+        for sp_and_occu in self.species_and_occu:
+            for species, occu in sp_and_occu.items():
                 elmap[species] += occu
         return Composition(elmap)
 
@@ -230,8 +321,8 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         Elements are found, a charge of 0 is assumed.
         """
         charge = 0
-        for site in self:
-            for specie, amt in site.species_and_occu.items():
+        for sp_and_occu in self.species_and_occu:
+            for specie, amt in sp_and_occu.items():
                 charge += getattr(specie, "oxi_state", 0) * amt
         return charge
 
@@ -241,7 +332,7 @@ class SiteCollection(six.with_metaclass(ABCMeta, collections.Sequence)):
         Checks if structure is ordered, meaning no partial occupancies in any
         of the sites.
         """
-        return all((site.is_ordered for site in self))
+        return self._sites.is_ordered
 
     def get_angle(self, i, j, k):
         """
@@ -378,19 +469,11 @@ class IStructure(SiteCollection, MSONable):
         else:
             self._lattice = Lattice(lattice)
 
-        sites = []
-        for i in range(len(species)):
-            prop = None
-            if site_properties:
-                prop = {k: v[i]
-                        for k, v in site_properties.items()}
-
-            sites.append(
-                PeriodicSite(species[i], coords[i], self._lattice,
-                             to_unit_cell,
-                             coords_are_cartesian=coords_are_cartesian,
-                             properties=prop))
-        self._sites = tuple(sites)
+        self._site_store = SiteStore.from_species_and_coords(
+            species, coords, lattice=self._lattice,
+            coords_are_cartesian=coords_are_cartesian,
+            to_unit_cell=to_unit_cell, site_properties=site_properties,
+            mutable=isinstance(self, collections.MutableSequence))
         if validate_proximity and not self.is_valid():
             raise StructureError(("Structure contains sites that are ",
                                   "less than 0.01 Angstrom apart!"))
@@ -419,12 +502,16 @@ class IStructure(SiteCollection, MSONable):
             # This is not really a good solution, but if we are not changing
             # the sites, initializing an empty structure and setting _sites
             # to be sites is much faster than doing the full initialization.
-            lattice = sites[0].lattice
-            for s in sites[1:]:
-                if s.lattice != lattice:
-                    raise ValueError("Sites must belong to the same lattice")
+            if isinstance(sites, (IStructure, SiteStore)):
+                lattice = sites.lattice
+            else:
+                lattice = sites[0].lattice
+                for s in sites[1:]:
+                    if s.lattice != lattice:
+                        raise ValueError("Sites must belong to the same "
+                                         "lattice")
             s_copy = cls(lattice=lattice, species=[], coords=[])
-            s_copy._sites = list(sites)
+            s_copy._sites = sites
             return s_copy
         prop_keys = []
         props = {}
@@ -639,11 +726,12 @@ class IStructure(SiteCollection, MSONable):
          return cls(latt, all_sp, all_coords,
                     site_properties=all_site_properties)
 
-    @property
+    @_cached_on_sites
     def distance_matrix(self):
         """
         Returns the distance matrix between all sites in the structure. For
         periodic structures, this should return the nearest image distance.
+        For large structures, consider get_sparse_distance_matrix instead.
         """
         return self.lattice.get_all_distances(self.frac_coords,
                                               self.frac_coords)
@@ -655,6 +743,18 @@ class IStructure(SiteCollection, MSONable):
         """
         return self._sites
 
+    @property
+    def _sites(self):
+        return self._site_store
+
+    @_sites.setter
+    def _sites(self, sites):
+        if isinstance(sites, SiteCollection):
+            sites = sites._sites
+        self._site_store = SiteStore.from_sites(
+            sites, periodic=True, lattice=getattr(self, "_lattice", None),
+            mutable=isinstance(self, collections.MutableSequence))
+
     @property
     def lattice(self):
         """
@@ -707,6 +807,47 @@ class IStructure(SiteCollection, MSONable):
         m = StructureMatcher(**kwargs)
         return m.fit(Structure.from_sites(self), Structure.from_sites(other))
 
+    def fingerprint(self, primitive_cell=True, symprec=None):
+        """
+        Returns a deterministic fingerprint of the structure, which can be
+        used as a key to bucket structures for duplicate detection.
+
+        The fingerprint is made of the reduced formula and the number of
+        sites in the Niggli reduced primitive cell, computed in the same way
+        as in StructureMatcher. StructureMatcher.fit never matches
+        structures that differ in either (unless attempt_supercell or
+        allow_subset is used), so structures that fit always have the same
+        fingerprint. Continuous descriptors such as the volume per atom or
+        interatomic distances are deliberately left out, since structures
+        within the matching tolerances can fall on either side of any bin
+        boundary.
+
+        Args:
+            primitive_cell (bool): Whether to count the sites in the
+                primitive cell, as for StructureMatcher(primitive_cell=True).
+                Defaults to True.
+            symprec (float): If not None, the space group number determined
+                with this tolerance is added to the fingerprint. This gives
+                much finer buckets, but is only approximately invariant:
+                structures distorted within the matching tolerances can have
+                different space groups. Defaults to None.
+
+        Returns:
+            (str) The fingerprint, e.g., "Li2O|3" or "Li2O|3|225".
+        """
+        key = ("fingerprint", primitive_cell, symprec)
+        cache = self._sites.cache
+        if key not in cache:
+            s = self
+            if primitive_cell:
+                s = Structure.from_sites(self).get_reduced_structure(
+                    reduction_algo="niggli").get_primitive_structure()
+            parts = [self.composition.reduced_formula, str(len(s))]
+            if symprec is not None:
+                parts.append(str(self.get_space_group_info(symprec)[1]))
+            cache[key] = "|".join(parts)
+        return cache[key]
+
     def __eq__(self, other):
         if other is None:
             return False
@@ -752,6 +893,15 @@ class IStructure(SiteCollection, MSONable):
             you prefer a subclass to return its own type, you need to override
             this method in the subclass.
         """
+        return Structure.from_sites(self._get_supercell_sites(scaling_matrix))
+
+    def _get_supercell_sites(self, scaling_matrix, to_unit_cell=False):
+        """
+        Returns the SiteStore holding the sites of a supercell, built by
+        tiling the site arrays over all lattice points of the supercell.
+        The lattice of the supercell is the lattice of the returned store.
+        See __mul__ for the format of scaling_matrix.
+        """
         scale_matrix = np.array(scaling_matrix, np.int16)
         if scale_matrix.shape != (3, 3):
             scale_matrix = np.array(scale_matrix * np.eye(3), np.int16)
@@ -760,15 +910,7 @@ class IStructure(SiteCollection, MSONable):
         f_lat = lattice_points_in_supercell(scale_matrix)
         c_lat = new_lattice.get_cartesian_coords(f_lat)
 
-        new_sites = []
-        for site in self:
-            for v in c_lat:
-                s = PeriodicSite(site.species_and_occu, site.coords + v,
-                                 new_lattice, properties=site.properties,
-                                 coords_are_cartesian=True, to_unit_cell=False)
-                new_sites.append(s)
-
-        return Structure.from_sites(new_sites)
+        return self._sites.tile(c_lat, new_lattice, to_unit_cell=to_unit_cell)
 
     def __rmul__(self, scaling_matrix):
         """
@@ -781,7 +923,7 @@ class IStructure(SiteCollection, MSONable):
         """
         Fractional coordinates as a Nx3 numpy array.
         """
-        return np.array([site.frac_coords for site in self._sites])
+        return self._sites.frac_coords
 
     @property
     def volume(self):
@@ -813,19 +955,8 @@ class IStructure(SiteCollection, MSONable):
     def get_sites_in_sphere(self, pt, r, include_index=False):
         """
         Find all sites within a sphere from the point. This includes sites
-        in other periodic images.
-
-        Algorithm:
-
-        1. place sphere of radius r in crystal and determine minimum supercell
-           (parallelpiped) which would contain a sphere of radius r. for this
-           we need the projection of a_1 on a unit vector perpendicular
-           to a_2 & a_3 (i.e. the unit vector in the direction b_1) to
-           determine how many a_1"s it will take to contain the sphere.
-
-           Nxmax = r * length_of_b_1 / (2 Pi)
-
-        2. keep points falling within r.
+        in other periodic images. The search is done with the linked-cell
+        algorithm in :func:`pymatgen.util.coord.find_points_in_spheres`.
 
         Args:
             pt (3x1 array): cartesian coordinates of center of sphere.
@@ -837,16 +968,9 @@ class IStructure(SiteCollection, MSONable):
             [(site, dist) ...] since most of the time, subsequent processing
             requires the distance.
         """
-        site_fcoords = np.mod(self.frac_coords, 1)
-        neighbors = []
-        for fcoord, dist, i in self._lattice.get_points_in_sphere(
-                site_fcoords, pt, r):
-            nnsite = PeriodicSite(self[i].species_and_occu,
-                                  fcoord, self._lattice,
-                                  properties=self[i].properties)
-            neighbors.append((nnsite, dist) if not include_index
-                             else (nnsite, dist, i))
-        return neighbors
+        _, points, images, dists = find_points_in_spheres(
+            self._lattice, self.frac_coords, [pt], r, exclude_self=False)
+        return self._get_neighbor_sites(points, images, dists, include_index)
 
     def get_neighbors(self, site, r, include_index=False):
         """
@@ -870,16 +994,117 @@ class IStructure(SiteCollection, MSONable):
                                       include_index=include_index)
         return [d for d in nn if site != d[0]]
 
+    def get_neighbor_list(self, r, sites=None, numerical_tol=1e-8):
+        """
+        Get neighbor lists as flat arrays for a set of sites, out to a
+        distance r. This uses a linked-cell algorithm that scales linearly
+        with the number of sites, and does not create any Site objects, so it
+        is the method of choice for large structures and large cutoffs.
+
+        Args:
+            r (float): Radius of sphere.
+            sites ([Site]): Sites at the centers of the spheres. Defaults to
+                None, i.e., all sites in the structure.
+            numerical_tol (float): Pairs that are closer than this distance
+                are not considered to be neighbors, i.e., a site is not its
+                own neighbor. Defaults to 1e-8.
+
+        Returns:
+            (center_indices, points_indices, images, distances) as numpy
+            arrays. The n-th neighbor pair is the site at points_indices[n],
+            translated by the lattice vector images[n] (i.e., at fractional
+            coordinates frac_coords[points_indices[n]] + images[n]), which
+            lies at distance distances[n] from the center
+            sites[center_indices[n]].
+        """
+        if sites is None:
+            centers = self.cart_coords
+        else:
+            centers = [site.coords for site in sites]
+        return find_points_in_spheres(self._lattice, self.frac_coords,
+                                      centers, r, numerical_tol=numerical_tol)
+
+    def iter_neighbor_list(self, r, sites=None, numerical_tol=1e-8):
+        """
+        Iterates over the neighbor lists of a set of sites in chunks. This is
+        the streaming version of get_neighbor_list: the pairs are produced
+        in blocks of consecutive centers, so that only one block is held in
+        memory at any time. Use this to process all pairs within a cutoff in
+        structures that are too large for the full neighbor list.
+
+        Args:
+            r (float): Radius of sphere.
+            sites ([Site]): Sites at the centers of the spheres. Defaults to
+                None, i.e., all sites in the structure.
+            numerical_tol (float): Pairs that are closer than this distance
+                are not considered to be neighbors. Defaults to 1e-8.
+
+        Yields:
+            (center_indices, points_indices, images, distances) as numpy
+            arrays, in the same format as get_neighbor_list. Each block is
+            sorted, and all neighbors of a center are in the same block.
+        """
+        if sites is None:
+            centers = self.cart_coords
+        else:
+            centers = [site.coords for site in sites]
+        return iter_points_in_spheres(self._lattice, self.frac_coords,
+                                      centers, r, numerical_tol=numerical_tol)
+
+    def get_sparse_distance_matrix(self, cutoff):
+        """
+        Returns the distance matrix between all sites in the structure,
+        restricted to the pairs of sites that are within cutoff of each
+        other. Unlike distance_matrix, the memory required scales linearly
+        with the number of sites, so this works for very large structures.
+
+        Args:
+            cutoff (float): Maximum distance between two sites.
+
+        Returns:
+            (distances, images). distances is a scipy.sparse.csr_matrix
+            holding the nearest image distance between each pair of
+            distinct sites (i, j) within cutoff of each other. Coinciding
+            sites are stored as explicit zeros, so that distances.nnz is the
+            number of pairs. images is an int array of shape (nnz, 3), where
+            images[n] is the lattice translation for the n-th stored entry
+            (i.e., distances.data[n]): site j translated by images[n] is the
+            nearest image of j to site i.
+        """
+        from scipy.sparse import csr_matrix
+        rows = [np.zeros(0, dtype=int)]
+        cols = [np.zeros(0, dtype=int)]
+        images = [np.zeros((0, 3), dtype=int)]
+        dists = [np.zeros(0)]
+        for c, p, im, d in iter_points_in_spheres(
+                self._lattice, self.frac_coords, self.cart_coords, cutoff,
+                exclude_self=False):
+            keep = c != p
+            c, p, im, d = c[keep], p[keep], im[keep], d[keep]
+            # Only keep the nearest image of each pair.
+            order = np.lexsort((d, p, c))
+            c, p, im, d = c[order], p[order], im[order], d[order]
+            first = np.ones(len(c), dtype=bool)
+            first[1:] = (c[1:] != c[:-1]) | (p[1:] != p[:-1])
+            rows.append(c[first])
+            cols.append(p[first])
+            images.append(im[first])
+            dists.append(d[first])
+        rows = np.concatenate(rows)
+        indptr = np.searchsorted(rows, np.arange(len(self) + 1))
+        matrix = csr_matrix((np.concatenate(dists), np.concatenate(cols),
+                             indptr), shape=(len(self), len(self)))
+        return matrix, np.concatenate(images)
+
     def get_all_neighbors(self, r, include_index=False):
         """
         Get neighbors for each atom in the unit cell, out to a distance r
         Returns a list of list of neighbors for each site in structure.
         Use this method if you are planning on looping over all sites in the
         crystal. If you only want neighbors for a particular site, use the
-        method get_neighbors as it may not have to build such a large supercell
-        However if you are looping over all sites in the crystal, this method
-        is more efficient since it only performs one pass over a large enough
-        supercell to contain all possible atoms out to a distance r.
+        method get_neighbors. If you do not need Site objects for the
+        neighbors, get_neighbor_list is considerably faster since it returns
+        plain arrays.
         The return type is a [(site, dist) ...] since most of the time,
         subsequent processing requires the distance.
 
@@ -896,35 +1121,25 @@ class IStructure(SiteCollection, MSONable):
             structure. This is needed for ewaldmatrix by keeping track of which
             sites contribute to the ewald sum.
         """
-        # Use same algorithm as get_sites_in_sphere to determine supercell but
-        # loop over all atoms in crystal
-        recp_len = np.array(self.lattice.reciprocal_lattice.abc)
-        maxr = np.ceil((r + 0.15) * recp_len / (2 * math.pi))
-        nmin = np.floor(np.min(self.frac_coords, axis=0)) - maxr
-        nmax = np.ceil(np.max(self.frac_coords, axis=0)) + maxr
-
-        all_ranges = [np.arange(x, y) for x, y in zip(nmin, nmax)]
-
-        latt = self._lattice
-        neighbors = [list() for i in range(len(self._sites))]
-        all_fcoords = np.mod(self.frac_coords, 1)
-        coords_in_cell = latt.get_cartesian_coords(all_fcoords)
-        site_coords = self.cart_coords
-
-        indices = np.arange(len(self))
-        for image in itertools.product(*all_ranges):
-            coords = latt.get_cartesian_coords(image) + coords_in_cell
-            all_dists = all_distances(coords, site_coords)
-            all_within_r = np.bitwise_and(all_dists <= r, all_dists > 1e-8)
-
-            for (j, d, within_r) in zip(indices, all_dists, all_within_r):
-                nnsite = PeriodicSite(self[j].species_and_occu, coords[j],
-                                      latt, properties=self[j].properties,
-                                      coords_are_cartesian=True)
-                for i in indices[within_r]:
-                    item = (nnsite, d[i], j) if include_index else (
-                        nnsite, d[i])
-                    neighbors[i].append(item)
+        centers, points, images, dists = self.get_neighbor_list(r)
+        # centers are sorted, so each site's neighbors form a contiguous block
+        bounds = np.searchsorted(centers, np.arange(len(self) + 1))
+        nn_sites = self._get_neighbor_sites(points, images, dists,
+                                            include_index)
+        return [nn_sites[bounds[i]:bounds[i + 1]] for i in range(len(self))]
+
+    def _get_neighbor_sites(self, points, images, dists, include_index):
+        """
+        Materializes the PeriodicSites for the neighbors found by
+        find_points_in_spheres.
+        """
+        fcoords = self.frac_coords
+        neighbors = []
+        for j, image, d in zip(points, images, dists):
+            site = self._sites[j]
+            nnsite = PeriodicSite(site.species_and_occu, fcoords[j] + image,
+                                  self._lattice, properties=site.properties)
+            neighbors.append((nnsite, d, j) if include_index else (nnsite, d))
         return neighbors
 
     def get_neighbors_in_shell(self, origin, r, dr, include_index=False):
@@ -1021,7 +1236,7 @@ class IStructure(SiteCollection, MSONable):
             # than doing the full initialization.
             s_copy = self.__class__(lattice=self._lattice, species=[],
                                     coords=[])
-            s_copy._sites = list(self._sites)
+            s_copy._sites = self._sites
             return s_copy
         props = self.site_properties
         if site_properties:
@@ -1179,13 +1394,14 @@ class IStructure(SiteCollection, MSONable):
                 return ", ".join(d)
 
         # group sites by species string
-        sites = sorted(self._sites, key=site_label)
-
-        grouped_sites = [
-            list(a[1])
-            for a in itertools.groupby(sites, key=site_label)]
-        grouped_fcoords = [np.array([s.frac_coords for s in g])
-                           for g in grouped_sites]
+        sites = list(self._sites)
+        labels = [site_label(site) for site in sites]
+        order = sorted(range(len(sites)), key=labels.__getitem__)
+        grouped_inds = [list(a[1]) for a in
+                        itertools.groupby(order, key=labels.__getitem__)]
+        grouped_sites = [[sites[i] for i in inds] for inds in grouped_inds]
+        fcoords = self.frac_coords
+        grouped_fcoords = [fcoords[inds] for inds in grouped_inds]
 
         # min_vecs are approximate periodicities of the cell. The exact
         # periodicities from the supercell matrices are checked against these
@@ -1197,25 +1413,20 @@ class IStructure(SiteCollection, MSONable):
         super_ftol = np.divide(tolerance, self.lattice.abc)
         super_ftol_2 = super_ftol * 2
 
-        def pbc_coord_intersection(fc1, fc2, tol):
-            """
-            Returns the fractional coords in fc1 that have coordinates
-            within tolerance to some coordinate in fc2
-            """
-            d = fc1[:, None, :] - fc2[None, :, :]
-            d -= np.round(d)
-            np.abs(d, d)
-            return fc1[np.any(np.all(d < tol, axis=-1), axis=-1)]
-
         # here we reduce the number of min_vecs by enforcing that every
         # vector in min_vecs approximately maps each site onto a similar site.
         # The subsequent processing is O(fu^3 * min_vecs) = O(n^4) if we do no
         # reduction.
-        # This reduction is O(n^3) so usually is an improvement. Using double
-        # the tolerance because both vectors are approximate
+        # All translated sites of a group are looked up at once in a spatial
+        # hash of the group, so this is roughly linear in the number of
+        # translated sites. Using double the tolerance because both vectors
+        # are approximate
         for g in sorted(grouped_fcoords, key=lambda x: len(x)):
-            for f in g:
-                min_vecs = pbc_coord_intersection(min_vecs, g - f, super_ftol_2)
+            translated = g[None, :, :] + min_vecs[:, None, :]
+            found = coords_in_list_pbc(translated.reshape((-1, 3)), g,
+                                       super_ftol_2)
+            min_vecs = min_vecs[np.all(found.reshape((len(min_vecs), -1)),
+                                       axis=1)]
 
         def get_hnf(fu):
             """
@@ -1292,29 +1503,24 @@ class IStructure(SiteCollection, MSONable):
                         valid = False
                         break
 
-                    # check that groups are all cliques
-                    for g in groups:
-                        if not np.all(groups[g][:, g]):
-                            valid = False
-                            break
-                    if not valid:
+                    # check that groups are all cliques, i.e., that each
+                    # site is grouped with exactly the sites that share its
+                    # first group member
+                    first = np.argmax(groups, axis=1)
+                    if not np.array_equal(groups, first[:, None] == first):
+                        valid = False
                         break
 
                     # add the new sites, averaging positions
-                    added = np.zeros(len(gsites))
                     new_fcoords = all_frac % 1
-                    for i, group in enumerate(groups):
-                        if not added[i]:
-                            added[group] = True
-                            inds = np.where(group)[0]
-                            coords = new_fcoords[inds[0]]
-                            for n, j in enumerate(inds[1:]):
-                                offset = new_fcoords[j] - coords
-                                coords += (offset - np.round(offset)) / (n + 2)
-                            new_sp.append(gsites[inds[0]].species_and_occu)
-                            for k in gsites[inds[0]].properties:
-                                new_props[k].append(gsites[inds[0]].properties[k])
-                            new_coords.append(coords)
+                    offsets = new_fcoords - new_fcoords[first]
+                    offsets -= np.round(offsets)
+                    for i in np.unique(first):
+                        new_sp.append(gsites[i].species_and_occu)
+                        for k in gsites[i].properties:
+                            new_props[k].append(gsites[i].properties[k])
+                        new_coords.append(new_fcoords[i] + np.mean(
+                            offsets[first == i], axis=0))
 
                 if valid:
                     inv_m = np.linalg.inv(m)
@@ -1460,6 +1666,13 @@ class IStructure(SiteCollection, MSONable):
                 return
             else:
                 return s
+        elif fmt == "npz" or fnmatch(fname.lower(), "*.npz"):
+            from pymatgen.io.compact import save_npz, dumps_npz
+            if filename:
+                save_npz(filename, self)
+                return
+            else:
+                return dumps_npz(self)
         elif fmt == "xsf" or fnmatch(fname.lower(), "*.xsf*"):
             if filename:
                 with zopen(fname, "wt", encoding='utf8') as f:
@@ -1574,6 +1787,16 @@ class IStructure(SiteCollection, MSONable):
                 s = s.get_sorted_structure()
             return s
 
+        if fnmatch(os.path.basename(filename).lower(), "*.npz"):
+            from pymatgen.io.compact import load_npz
+            s = cls.from_sites(_get_single_npz_object(
+                load_npz(filename), filename, IStructure))
+            if sort:
+                s = s.get_sorted_structure()
+            if merge_tol:
+                s.merge_sites(merge_tol)
+            return s
+
         from pymatgen.io.vasp import Vasprun, Chgcar
         from pymatgen.io.exciting import ExcitingInput
         from monty.io import zopen
@@ -1669,22 +1892,17 @@ class IMolecule(SiteCollection, MSONable):
                                   " same length as the list of fractional ",
                                   "coordinates."))
 
-        sites = []
-        for i in range(len(species)):
-            prop = None
-            if site_properties:
-                prop = {k: v[i] for k, v in site_properties.items()}
-            sites.append(Site(species[i], coords[i], properties=prop))
-
-        self._sites = tuple(sites)
+        self._site_store = SiteStore.from_species_and_coords(
+            species, coords, site_properties=site_properties,
+            mutable=isinstance(self, collections.MutableSequence))
         if validate_proximity and not self.is_valid():
             raise StructureError(("Molecule contains sites that are ",
                                   "less than 0.01 Angstrom apart!"))
 
         self._charge = charge
         nelectrons = 0
-        for site in sites:
-            for sp, amt in site.species_and_occu.items():
+        for sp_and_occu in self.species_and_occu:
+            for sp, amt in sp_and_occu.items():
                 nelectrons += sp.Z * amt
         nelectrons -= charge
         self._nelectrons = nelectrons
@@ -1739,6 +1957,18 @@ class IMolecule(SiteCollection, MSONable):
         """
         return self._sites
 
+    @property
+    def _sites(self):
+        return self._site_store
+
+    @_sites.setter
+    def _sites(self, sites):
+        if isinstance(sites, SiteCollection):
+            sites = sites._sites
+        self._site_store = SiteStore.from_sites(
+            sites, periodic=False,
+            mutable=isinstance(self, collections.MutableSequence))
+
     @classmethod
     def from_sites(cls, sites, charge=0, spin_multiplicity=None,
                    validate_proximity=False):
@@ -1780,34 +2010,94 @@ class IMolecule(SiteCollection, MSONable):
             Two Molecule objects representing the two clusters formed from
             breaking the bond.
         """
-        sites = self._sites
-        clusters = [[sites[ind1]], [sites[ind2]]]
-
-        sites = [site for i, site in enumerate(sites) if i not in (ind1, ind2)]
-
-        def belongs_to_cluster(site, cluster):
-            for test_site in cluster:
-                if CovalentBond.is_bonded(site, test_site, tol=tol):
-                    return True
-            return False
-
-        while len(sites) > 0:
+        bonded = [[] for i in range(len(self))]
+        for i, j in self.get_covalent_bond_indices(tol):
+            bonded[i].append(j)
+            bonded[j].append(i)
+
+        # Grow both clusters in passes over the remaining sites. A site
+        # bonded to both clusters joins the first one.
+        label = [None] * len(self)
+        label[ind1] = 0
+        label[ind2] = 1
+        clusters = [[ind1], [ind2]]
+        remaining = [i for i in range(len(self)) if i not in (ind1, ind2)]
+        while len(remaining) > 0:
             unmatched = []
-            for site in sites:
-                for cluster in clusters:
-                    if belongs_to_cluster(site, cluster):
-                        cluster.append(site)
+            for i in remaining:
+                labels = set(label[j] for j in bonded[i])
+                for c, cluster in enumerate(clusters):
+                    if c in labels:
+                        cluster.append(i)
+                        label[i] = c
                         break
                 else:
-                    unmatched.append(site)
+                    unmatched.append(i)
 
-            if len(unmatched) == len(sites):
+            if len(unmatched) == len(remaining):
                 raise ValueError("Not all sites are matched!")
-            sites = unmatched
+            remaining = unmatched
 
-        return (self.__class__.from_sites(cluster)
+        sites = self._sites
+        return (self.__class__.from_sites([sites[i] for i in cluster])
                 for cluster in clusters)
 
+    @_cached_on_sites
+    def _kdtree(self):
+        """
+        scipy cKDTree of the cartesian coordinates, used for neighbor
+        queries.
+        """
+        from scipy.spatial import cKDTree
+        return cKDTree(self._sites.cart_coords)
+
+    def get_covalent_bond_indices(self, tol=0.2):
+        """
+        Determines the covalent bonds in a molecule as an array of site
+        index pairs. Two sites are bonded if their distance is less than
+        (1 + tol) times any of the bond lengths tabulated for their
+        elements, as in CovalentBond.is_bonded. Candidate pairs are found
+        with a KD-tree, so this scales to very large molecules.
+
+        Args:
+            tol (float): The tol to determine bonds in a structure. See
+                CovalentBond.is_bonded.
+
+        Returns:
+            (n, 2) int array of the indices (i, j) of bonded sites, with
+            i < j and the pairs sorted.
+        """
+        store = self._sites
+        symbols = [list(comp.keys())[0].symbol
+                   for comp in store.unique_species]
+        sp_index = store.species_indices
+        counts = np.bincount(sp_index, minlength=len(symbols))
+
+        cutoffs = np.zeros((len(symbols), len(symbols)))
+        for a, b in itertools.combinations_with_replacement(
+                range(len(symbols)), 2):
+            if counts[a] == 0 or counts[b] == 0 or \
+                    (a == b and counts[a] < 2):
+                continue
+            syms = tuple(sorted([symbols[a], symbols[b]]))
+            if syms not in bond_lengths:
+                raise ValueError("No bond data for elements {} - {}".format(
+                    *syms))
+            cutoffs[a, b] = cutoffs[b, a] = \
+                (1 + tol) * max(bond_lengths[syms].values())
+
+        if len(self) < 2 or cutoffs.max() <= 0:
+            return np.zeros((0, 2), dtype=int)
+        tree = self._kdtree
+        pairs = tree.query_pairs(cutoffs.max(), output_type="ndarray")
+        if len(pairs) == 0:
+            return np.zeros((0, 2), dtype=int)
+        dists = np.linalg.norm(
+            tree.data[pairs[:, 1]] - tree.data[pairs[:, 0]], axis=1)
+        pairs = pairs[dists < cutoffs[sp_index[pairs[:, 0]],
+                                      sp_index[pairs[:, 1]]]]
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
     def get_covalent_bonds(self, tol=0.2):
         """
         Determines the covalent bonds in a molecule.
@@ -1819,11 +2109,9 @@ class IMolecule(SiteCollection, MSONable):
         Returns:
             List of bonds
         """
-        bonds = []
-        for site1, site2 in itertools.combinations(self._sites, 2):
-            if CovalentBond.is_bonded(site1, site2, tol):
-                bonds.append(CovalentBond(site1, site2))
-        return bonds
+        sites = self._sites
+        return [CovalentBond(sites[i], sites[j])
+                for i, j in self.get_covalent_bond_indices(tol)]
 
     def __eq__(self, other):
         if other is None:
@@ -1923,26 +2211,41 @@ class IMolecule(SiteCollection, MSONable):
         """
         return self[i].distance(self[j])
 
-    def get_sites_in_sphere(self, pt, r):
+    def get_sites_in_sphere(self, pt, r, include_index=False):
         """
-        Find all sites within a sphere from a point.
+        Find all sites within a sphere from a point. Sites are looked up in
+        a KD-tree of the coordinates, which is built once and reused until
+        the molecule is modified.
 
         Args:
             pt (3x1 array): Cartesian coordinates of center of sphere.
             r (float): Radius of sphere.
+            include_index (bool): Whether to include the site index in the
+                returned tuples.
 
         Returns:
             [(site, dist) ...] since most of the time, subsequent processing
-            requires the distance.
-        """
-        neighbors = []
-        for site in self._sites:
-            dist = site.distance_from_point(pt)
-            if dist <= r:
-                neighbors.append((site, dist))
-        return neighbors
+            requires the distance. The sites are in the order of the
+            molecule. If include_index is True, the tuples are
+            (site, dist, index).
+        """
+        pt = np.array(pt, dtype=float)
+        tree = self._kdtree
+        # Pad the search radius slightly and apply the exact cutoff to the
+        # distances computed below.
+        inds = np.array(sorted(tree.query_ball_point(pt, r + 1e-8)),
+                        dtype=int)
+        if len(inds) == 0:
+            return []
+        dists = np.linalg.norm(tree.data[inds] - pt, axis=1)
+        sites = self._sites
+        nn = [(sites[i], d, i) for i, d in zip(inds.tolist(), dists)
+              if d <= r]
+        if include_index:
+            return nn
+        return [(site, d) for site, d, i in nn]
 
-    def get_neighbors(self, site, r):
+    def get_neighbors(self, site, r, include_index=False):
         """
         Get all neighbors to a site within a sphere of radius r.  Excludes the
         site itself.
@@ -1950,13 +2253,17 @@ class IMolecule(SiteCollection, MSONable):
         Args:
             site (Site): Site at the center of the sphere.
             r (float): Radius of sphere.
+            include_index (bool): Whether to include the site index in the
+                returned tuples.
 
         Returns:
             [(site, dist) ...] since most of the time, subsequent processing
-            requires the distance.
+            requires the distance. If include_index is True, the tuples are
+            (site, dist, index).
         """
-        nn = self.get_sites_in_sphere(site.coords, r)
-        return [(s, dist) for (s, dist) in nn if site != s]
+        nn = self.get_sites_in_sphere(site.coords, r,
+                                      include_index=include_index)
+        return [t for t in nn if site != t[0]]
 
     def get_neighbors_in_shell(self, origin, r, dr):
         """
@@ -2115,6 +2422,13 @@ class IMolecule(SiteCollection, MSONable):
                     return json.dump(self.as_dict(), f)
             else:
                 return json.dumps(self.as_dict())
+        elif fmt == "npz" or fnmatch(fname.lower(), "*.npz"):
+            from pymatgen.io.compact import save_npz, dumps_npz
+            if filename:
+                save_npz(filename, self)
+                return
+            else:
+                return dumps_npz(self)
         elif fmt == "yaml" or fnmatch(fname, "*.yaml*"):
             import ruamel.yaml as yaml
 
@@ -2188,9 +2502,15 @@ class IMolecule(SiteCollection, MSONable):
             Molecule
         """
         from pymatgen.io.gaussian import GaussianOutput
+        fname = filename.lower()
+        if fnmatch(fname, "*.npz"):
+            from pymatgen.io.compact import load_npz
+            m = _get_single_npz_object(load_npz(filename), filename,
+                                       IMolecule)
+            return m if type(m) == cls else cls.from_sites(
+                m, charge=m.charge, spin_multiplicity=m.spin_multiplicity)
         with zopen(filename) as f:
             contents = f.read()
-        fname = filename.lower()
         if fnmatch(fname, "*.xyz*"):
             return cls.from_str(contents, fmt="xyz")
         elif any([fnmatch(fname.lower(), "*.{}*".format(r))
@@ -2259,8 +2579,6 @@ class Structure(IStructure, collections.MutableSequence):
                                         coords_are_cartesian=coords_are_cartesian,
                                         site_properties=site_properties)
 
-        self._sites = list(self._sites)
-
     def __setitem__(self, i, site):
         """
         Modify a site in the structure.
@@ -2407,17 +2725,7 @@ class Structure(IStructure, collections.MutableSequence):
             values: A sequence of values. Must be same length as number of
                 sites.
         """
-        if len(values) != len(self._sites):
-            raise ValueError("Values must be same length as sites.")
-        for i in range(len(self._sites)):
-            site = self._sites[i]
-            props = site.properties
-            if not props:
-                props = {}
-            props[property_name] = values[i]
-            self._sites[i] = PeriodicSite(site.species_and_occu,
-                                          site.frac_coords, self._lattice,
-                                          properties=props)
+        self._sites.set_property(property_name, values)
 
     def remove_site_property(self, property_name):
         """
@@ -2428,14 +2736,7 @@ class Structure(IStructure, collections.MutableSequence):
             values (list): A sequence of values. Must be same length as
                 number of sites.
         """
-        for i in range(len(self._sites)):
-            site = self._sites[i]
-            props = {k: v
-                     for k, v in site.properties.items()
-                     if k != property_name}
-            self._sites[i] = PeriodicSite(site.species_and_occu,
-                                          site.frac_coords, self._lattice,
-                                          properties=props)
+        self._sites.remove_property(property_name)
 
     def replace_species(self, species_mapping):
         """
@@ -2453,7 +2754,6 @@ class Structure(IStructure, collections.MutableSequence):
                 {"C": "C0.5Si0.5"} will replace all C with 0.5 C and 0.5 Si,
                 i.e., a disordered site.
         """
-        latt = self._lattice
         species_mapping = {get_el_sp(k): v
                            for k, v in species_mapping.items()}
         sp_to_replace = set(species_mapping.keys())
@@ -2464,20 +2764,19 @@ class Structure(IStructure, collections.MutableSequence):
                           "substituted = %s; Species in structure = %s"
                           % (sp_to_replace, sp_in_structure))
 
-        def mod_site(site):
-            if sp_to_replace.intersection(site.species_and_occu):
+        def mod_species(sp_and_occu):
+            if sp_to_replace.intersection(sp_and_occu):
                 c = Composition()
-                for sp, amt in site.species_and_occu.items():
+                for sp, amt in sp_and_occu.items():
                     new_sp = species_mapping.get(sp, sp)
                     try:
                         c += Composition(new_sp) * amt
                     except Exception:
                         c += {new_sp: amt}
-                return PeriodicSite(c, site.frac_coords, latt,
-                                    properties=site.properties)
-            return site
+                return c
+            return sp_and_occu
 
-        self._sites = [mod_site(site) for site in self._sites]
+        self._sites.map_species(mod_species)
 
     def replace(self, i, species, coords=None, coords_are_cartesian=False,
                 properties=None):
@@ -2512,17 +2811,13 @@ class Structure(IStructure, collections.MutableSequence):
         Args:
             species: Sequence of species to remove, e.g., ["Li", "Na"].
         """
-        new_sites = []
         species = [get_el_sp(s) for s in species]
-
-        for site in self._sites:
-            new_sp_occu = {sp: amt for sp, amt in site.species_and_occu.items()
-                           if sp not in species}
-            if len(new_sp_occu) > 0:
-                new_sites.append(PeriodicSite(
-                    new_sp_occu, site.frac_coords, self._lattice,
-                    properties=site.properties))
-        self._sites = new_sites
+        self._sites.map_species(
+            lambda sp_and_occu: {sp: amt for sp, amt in sp_and_occu.items()
+                                 if sp not in species})
+        self._sites.take([i for i, sp_and_occu in
+                          enumerate(self._sites.species_and_occu)
+                          if len(sp_and_occu) > 0])
 
     def remove_sites(self, indices):
         """
@@ -2531,8 +2826,8 @@ class Structure(IStructure, collections.MutableSequence):
         Args:
             indices: Sequence of indices of sites to delete.
         """
-        self._sites = [s for i, s in enumerate(self._sites)
-                       if i not in indices]
+        indices = set(indices)
+        self._sites.take([i for i in range(len(self)) if i not in indices])
 
     def apply_operation(self, symmop, fractional=False):
         """
@@ -2549,25 +2844,15 @@ class Structure(IStructure, collections.MutableSequence):
         if not fractional:
             self._lattice = Lattice([symmop.apply_rotation_only(row)
                                      for row in self._lattice.matrix])
-
-            def operate_site(site):
-                new_cart = symmop.operate(site.coords)
-                new_frac = self._lattice.get_fractional_coords(new_cart)
-                return PeriodicSite(site.species_and_occu, new_frac,
-                                    self._lattice,
-                                    properties=site.properties)
-
+            new_frac = self._lattice.get_fractional_coords(
+                symmop.operate_multi(self.cart_coords))
         else:
             new_latt = np.dot(symmop.rotation_matrix, self._lattice.matrix)
             self._lattice = Lattice(new_latt)
+            new_frac = symmop.operate_multi(self.frac_coords)
 
-            def operate_site(site):
-                return PeriodicSite(site.species_and_occu,
-                                    symmop.operate(site.frac_coords),
-                                    self._lattice,
-                                    properties=site.properties)
-
-        self._sites = [operate_site(s) for s in self._sites]
+        self._sites.set_lattice(self._lattice)
+        self._sites.update_coords(new_frac)
 
     def modify_lattice(self, new_lattice):
         """
@@ -2578,13 +2863,7 @@ class Structure(IStructure, collections.MutableSequence):
             new_lattice (Lattice): New lattice
         """
         self._lattice = new_lattice
-        new_sites = []
-        for site in self._sites:
-            new_sites.append(PeriodicSite(site.species_and_occu,
-                                          site.frac_coords,
-                                          self._lattice,
-                                          properties=site.properties))
-        self._sites = new_sites
+        self._sites.set_lattice(new_lattice)
 
     def apply_strain(self, strain):
         """
@@ -2616,7 +2895,7 @@ class Structure(IStructure, collections.MutableSequence):
             reverse (bool): If set to True, then the list elements are sorted
                 as if each comparison were reversed.
         """
-        self._sites = sorted(self._sites, key=key, reverse=reverse)
+        self._sites.sort(key=key, reverse=reverse)
 
     def translate_sites(self, indices, vector, frac_coords=True,
                         to_unit_cell=True):
@@ -2635,19 +2914,20 @@ class Structure(IStructure, collections.MutableSequence):
         """
         if not isinstance(indices, collections.Iterable):
             indices = [indices]
+        indices = list(indices)
 
-        for i in indices:
-            site = self._sites[i]
-            if frac_coords:
-                fcoords = site.frac_coords + vector
-            else:
-                fcoords = self._lattice.get_fractional_coords(
-                    site.coords + vector)
-            new_site = PeriodicSite(site.species_and_occu, fcoords,
-                                    self._lattice, to_unit_cell=to_unit_cell,
-                                    coords_are_cartesian=False,
-                                    properties=site.properties)
-            self._sites[i] = new_site
+        if not indices:
+            return
+
+        # np.add.at so that repeated indices are translated repeatedly.
+        fcoords = self.frac_coords if frac_coords else self.cart_coords
+        np.add.at(fcoords, indices, vector)
+        fcoords = fcoords[indices]
+        if not frac_coords:
+            fcoords = self._lattice.get_fractional_coords(fcoords)
+        if to_unit_cell:
+            fcoords = np.mod(fcoords, 1)
+        self._sites.update_coords(fcoords, indices)
 
     def perturb(self, distance):
         """
@@ -2676,18 +2956,15 @@ class Structure(IStructure, collections.MutableSequence):
             oxidation_states (dict): Dict of oxidation states.
                 E.g., {"Li":1, "Fe":2, "P":5, "O":-2}
         """
-        try:
-            for i, site in enumerate(self._sites):
-                new_sp = {}
-                for el, occu in site.species_and_occu.items():
-                    sym = el.symbol
-                    new_sp[Specie(sym, oxidation_states[sym])] = occu
-                new_site = PeriodicSite(new_sp, site.frac_coords,
-                                        self._lattice,
-                                        coords_are_cartesian=False,
-                                        properties=site.properties)
-                self._sites[i] = new_site
+        def add_oxi(sp_and_occu):
+            new_sp = {}
+            for el, occu in sp_and_occu.items():
+                sym = el.symbol
+                new_sp[Specie(sym, oxidation_states[sym])] = occu
+            return new_sp
 
+        try:
+            self._sites.map_species(add_oxi)
         except KeyError:
             raise ValueError("Oxidation state of all elements must be "
                              "specified in the dictionary.")
@@ -2701,16 +2978,14 @@ class Structure(IStructure, collections.MutableSequence):
                 E.g., [1, 1, 1, 1, 2, 2, 2, 2, 5, 5, 5, 5, -2, -2, -2, -2]
         """
         try:
-            for i, site in enumerate(self._sites):
+            new_species = []
+            for i, sp_and_occu in enumerate(self.species_and_occu):
                 new_sp = {}
-                for el, occu in site.species_and_occu.items():
+                for el, occu in sp_and_occu.items():
                     sym = el.symbol
                     new_sp[Specie(sym, oxidation_states[i])] = occu
-                new_site = PeriodicSite(new_sp, site.frac_coords,
-                                        self._lattice,
-                                        coords_are_cartesian=False,
-                                        properties=site.properties)
-                self._sites[i] = new_site
+                new_species.append(new_sp)
+            self._sites.update_species(new_species)
 
         except IndexError:
             raise ValueError("Oxidation state of all sites must be "
@@ -2720,16 +2995,14 @@ class Structure(IStructure, collections.MutableSequence):
         """
         Removes oxidation states from a structure.
         """
-        for i, site in enumerate(self._sites):
+        def remove_oxi(sp_and_occu):
             new_sp = collections.defaultdict(float)
-            for el, occu in site.species_and_occu.items():
+            for el, occu in sp_and_occu.items():
                 sym = el.symbol
                 new_sp[Element(sym)] += occu
-            new_site = PeriodicSite(new_sp, site.frac_coords,
-                                    self._lattice,
-                                    coords_are_cartesian=False,
-                                    properties=site.properties)
-            self._sites[i] = new_site
+            return new_sp
+
+        self._sites.map_species(remove_oxi)
 
     def add_oxidation_state_by_guess(self, *kwargs):
         """
@@ -2752,18 +3025,16 @@ class Structure(IStructure, collections.MutableSequence):
             spisn (dict): Dict of spins associated with
             elements or species, e.g. {"Ni":+5} or {"Ni2+":5}
         """
-        for i, site in enumerate(self._sites):
+        def add_spin(sp_and_occu):
             new_sp = {}
-            for sp, occu in site.species_and_occu.items():
+            for sp, occu in sp_and_occu.items():
                 sym = sp.symbol
                 oxi_state = getattr(sp, "oxi_state", None)
                 new_sp[Specie(sym, oxidation_state=oxi_state,
                               properties={'spin': spins.get(str(sp), spins.get(sym, None))})] = occu
-            new_site = PeriodicSite(new_sp, site.frac_coords,
-                                    self._lattice,
-                                    coords_are_cartesian=False,
-                                    properties=site.properties)
-            self._sites[i] = new_site
+            return new_sp
+
+        self._sites.map_species(add_spin)
 
     def add_spin_by_site(self, spins):
         """
@@ -2774,18 +3045,16 @@ class Structure(IStructure, collections.MutableSequence):
                 E.g., [+5, -5, 0, 0]
         """
         try:
-            for i, site in enumerate(self._sites):
+            new_species = []
+            for i, sp_and_occu in enumerate(self.species_and_occu):
                 new_sp = {}
-                for sp, occu in site.species_and_occu.items():
+                for sp, occu in sp_and_occu.items():
                     sym = sp.symbol
                     oxi_state = getattr(sp, "oxi_state", None)
                     new_sp[Specie(sym, oxidation_state=oxi_state,
                                   properties={'spin': spins[i]})] = occu
-                new_site = PeriodicSite(new_sp, site.frac_coords,
-                                        self._lattice,
-                                        coords_are_cartesian=False,
-                                        properties=site.properties)
-                self._sites[i] = new_site
+                new_species.append(new_sp)
+            self._sites.update_species(new_species)
 
         except IndexError:
             raise ValueError("Spin of all sites must be "
@@ -2795,15 +3064,13 @@ class Structure(IStructure, collections.MutableSequence):
         """
         Removes spin states from a structure.
         """
-        for i, site in enumerate(self._sites):
+        def remove_spin(sp_and_occu):
             new_sp = collections.defaultdict(float)
-            for sp, occu in site.species_and_occu.items():
+            for sp, occu in sp_and_occu.items():
                 new_sp[Specie(sp.symbol, oxidation_state=sp.oxi_state)] += occu
-            new_site = PeriodicSite(new_sp, site.frac_coords,
-                                    self._lattice,
-                                    coords_are_cartesian=False,
-                                    properties=site.properties)
-            self._sites[i] = new_site
+            return new_sp
+
+        self._sites.map_species(remove_spin)
 
     def make_supercell(self, scaling_matrix, to_unit_cell=True):
         """
@@ -2825,12 +3092,9 @@ class Structure(IStructure, collections.MutableSequence):
                    same factor.
             to_unit_cell: Whether or not to fall back sites into the unit cell
         """
-        s = self*scaling_matrix
-        if to_unit_cell:
-            for isite, site in enumerate(s):
-                s[isite] = site.to_unit_cell
-        self._sites = s.sites
-        self._lattice = s.lattice
+        sites = self._get_supercell_sites(scaling_matrix, to_unit_cell)
+        self._lattice = sites.lattice
+        self._sites = sites
 
     def scale_lattice(self, volume):
         """
@@ -2855,28 +3119,45 @@ class Structure(IStructure, collections.MutableSequence):
 
         """
         mode = mode.lower()[0]
-        from scipy.spatial.distance import squareform
-        from scipy.cluster.hierarchy import fcluster, linkage
-
-        d = self.distance_matrix
-        np.fill_diagonal(d, 0)
-        clusters = fcluster(linkage(squareform((d + d.T) / 2)),
-                            tol, 'distance')
-        sites = []
-        for c in np.unique(clusters):
-            inds = np.where(clusters == c)[0]
-            species = self[inds[0]].species_and_occu
-            coords = self[inds[0]].frac_coords
+        from scipy.sparse.csgraph import connected_components
+
+        # Single linkage clustering at a distance tol is equivalent to the
+        # connected components of the graph of sites within tol.
+        d, _ = self.get_sparse_distance_matrix(tol)
+        nclusters, clusters = connected_components(d, directed=False)
+
+        # Group the site indices by cluster, in increasing order within
+        # each cluster. Every cluster is represented by its first site.
+        order = np.argsort(clusters, kind="mergesort")
+        bounds = np.searchsorted(clusters[order], np.arange(nclusters + 1))
+        first = order[bounds[:-1]]
+
+        store = self._sites
+        fcoords = store.frac_coords
+        table = store.unique_species
+        sp_index = store.species_indices
+        coords = fcoords[first]
+        merged = np.where(np.diff(bounds) > 1)[0]
+        merged_species = []
+        for c in merged:
+            inds = order[bounds[c]:bounds[c + 1]]
+            species = table[sp_index[inds[0]]]
             for n, i in enumerate(inds[1:]):
-                sp = self[i].species_and_occu
                 if mode == "s":
-                    species += sp
-                offset = self[i].frac_coords - coords
-                coords += ((offset - np.round(offset)) / (n + 2)).astype(
-                    coords.dtype)
-            sites.append(PeriodicSite(species, coords, self.lattice))
-
-        self._sites = sites
+                    species += table[sp_index[i]]
+                offset = fcoords[i] - coords[c]
+                coords[c] += (offset - np.round(offset)) / (n + 2)
+            merged_species.append(species)
+
+        # Work on a copy, so that the structure is left untouched if the
+        # merged occupancies are invalid.
+        store = store.copy()
+        for k in list(store.site_properties.keys()):
+            store.remove_property(k)
+        store.take(first)
+        store.update_coords(coords)
+        store.update_species(merged_species, merged)
+        self._site_store = store
 
 
 class Molecule(IMolecule, collections.MutableSequence):
@@ -2914,7 +3195,6 @@ class Molecule(IMolecule, collections.MutableSequence):
                                        spin_multiplicity=spin_multiplicity,
                                        validate_proximity=validate_proximity,
                                        site_properties=site_properties)
-        self._sites = list(self._sites)
 
     def __setitem__(self, i, site):
         """
@@ -2998,8 +3278,8 @@ class Molecule(IMolecule, collections.MutableSequence):
         """
         self._charge = charge
         nelectrons = 0
-        for site in self._sites:
-            for sp, amt in site.species_and_occu.items():
+        for sp_and_occu in self.species_and_occu:
+            for sp, amt in sp_and_occu.items():
                 if not isinstance(sp, DummySpecie):
                     nelectrons += sp.Z * amt
         nelectrons -= charge
@@ -3047,16 +3327,7 @@ class Molecule(IMolecule, collections.MutableSequence):
             values (list): A sequence of values. Must be same length as
                 number of sites.
         """
-        if len(values) != len(self._sites):
-            raise ValueError("Values must be same length as sites.")
-        for i in range(len(self._sites)):
-            site = self._sites[i]
-            props = site.properties
-            if not props:
-                props = {}
-            props[property_name] = values[i]
-            self._sites[i] = Site(site.species_and_occu, site.coords,
-                                  properties=props)
+        self._sites.set_property(property_name, values)
 
     def remove_site_property(self, property_name):
         """
@@ -3067,13 +3338,7 @@ class Molecule(IMolecule, collections.MutableSequence):
             values (list): A sequence of values. Must be same length as
                 number of sites.
         """
-        for i in range(len(self._sites)):
-            site = self._sites[i]
-            props = {k: v
-                     for k, v in site.properties.items()
-                     if k != property_name}
-            self._sites[i] = Site(site.species_and_occu, site.coords,
-                                  properties=props)
+        self._sites.remove_property(property_name)
 
     def replace_species(self, species_mapping):
         """
@@ -3090,17 +3355,17 @@ class Molecule(IMolecule, collections.MutableSequence):
         species_mapping = {get_el_sp(k): v
                            for k, v in species_mapping.items()}
 
-        def mod_site(site):
+        def mod_species(sp_and_occu):
             c = Composition()
-            for sp, amt in site.species_and_occu.items():
+            for sp, amt in sp_and_occu.items():
                 new_sp = species_mapping.get(sp, sp)
                 try:
                     c += Composition(new_sp) * amt
                 except TypeError:
                     c += {new_sp: amt}
-            return Site(c, site.coords, properties=site.properties)
+            return c
 
-        self._sites = [mod_site(site) for site in self._sites]
+        self._sites.map_species(mod_species)
 
     def remove_species(self, species):
         """
@@ -3109,15 +3374,13 @@ class Molecule(IMolecule, collections.MutableSequence):
         Args:
             species: Species to remove.
         """
-        new_sites = []
         species = [get_el_sp(sp) for sp in species]
-        for site in self._sites:
-            new_sp_occu = {sp: amt for sp, amt in site.species_and_occu.items()
-                           if sp not in species}
-            if len(new_sp_occu) > 0:
-                new_sites.append(Site(new_sp_occu, site.coords,
-                                      properties=site.properties))
-        self._sites = new_sites
+        self._sites.map_species(
+            lambda sp_and_occu: {sp: amt for sp, amt in sp_and_occu.items()
+                                 if sp not in species})
+        self._sites.take([i for i, sp_and_occu in
+                          enumerate(self._sites.species_and_occu)
+                          if len(sp_and_occu) > 0])
 
     def remove_sites(self, indices):
         """
@@ -3126,8 +3389,8 @@ class Molecule(IMolecule, collections.MutableSequence):
         Args:
             indices: Sequence of indices of sites to delete.
         """
-        self._sites = [self._sites[i] for i in range(len(self._sites))
-                       if i not in indices]
+        indices = set(indices)
+        self._sites.take([i for i in range(len(self)) if i not in indices])
 
     def translate_sites(self, indices=None, vector=None):
         """
@@ -3142,12 +3405,13 @@ class Molecule(IMolecule, collections.MutableSequence):
         if indices is None:
             indices = range(len(self))
         if vector is None:
-            vector == [0, 0, 0]
-        for i in indices:
-            site = self._sites[i]
-            new_site = Site(site.species_and_occu, site.coords + vector,
-                            properties=site.properties)
-            self._sites[i] = new_site
+            vector = [0, 0, 0]
+        indices = list(indices)
+        if not indices:
+            return
+        coords = self.cart_coords
+        np.add.at(coords, indices, vector)
+        self._sites.update_coords(coords[indices], indices)
 
     def rotate_sites(self, indices=None, theta=0, axis=None, anchor=None):
         """
@@ -3181,12 +3445,12 @@ class Molecule(IMolecule, collections.MutableSequence):
 
         rm = expm(cross(eye(3), axis / norm(axis)) * theta)
 
-        for i in indices:
-            site = self._sites[i]
-            s = ((rm * np.matrix(site.coords - anchor).T).T + anchor).A1
-            new_site = Site(site.species_and_occu, s,
-                            properties=site.properties)
-            self._sites[i] = new_site
+        indices = list(indices)
+        if not indices:
+            return
+        coords = self.cart_coords[indices]
+        self._sites.update_coords(np.dot(coords - anchor, rm.T) + anchor,
+                                  indices)
 
     def perturb(self, distance):
         """
@@ -3215,12 +3479,7 @@ class Molecule(IMolecule, collections.MutableSequence):
             symmop (SymmOp): Symmetry operation to apply.
         """
 
-        def operate_site(site):
-            new_cart = symmop.operate(site.coords)
-            return Site(site.species_and_occu, new_cart,
-                        properties=site.properties)
-
-        self._sites = [operate_site(s) for s in self._sites]
+        self._sites.update_coords(symmop.operate_multi(self.cart_coords))
 
     def copy(self):
         """
@@ -3335,7 +3594,11 @@ class StructureError(Exception):
     """
     pass
 
-with open(os.path.join(os.path.dirname(__file__),
-                       "func_groups.json"), "rt") as f:
-    FunctionalGroups = {k: Molecule(v["species"], v["coords"])
-                        for k, v in json.load(f).items()}
+def _load_functional_groups():
+    with open(os.path.join(os.path.dirname(__file__),
+                           "func_groups.json"), "rt") as f:
+        return {k: Molecule(v["species"], v["coords"])
+                for k, v in json.load(f).items()}
+
+
+FunctionalGroups = LazyMapping(_load_functional_groups)
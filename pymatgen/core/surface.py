@@ -27,7 +27,7 @@ from pymatgen.core.lattice import Lattice
 from pymatgen.core.sites import PeriodicSite
 
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
-from pymatgen.util.coord import in_coord_list
+from pymatgen.core.operations import SymmOp
 from pymatgen.analysis.structure_matcher import StructureMatcher
 
 """
@@ -863,26 +863,36 @@ class SlabGenerator(object):
         c_ranges = set()
         bonds = {(get_el_sp(s1), get_el_sp(s2)): dist for (s1, s2), dist in
                  bonds.items()}
+        if not bonds:
+            return c_ranges
+        ouc = self.oriented_unit_cell
+        # A single neighbor list out to the longest bond covers all pairs.
+        centers, points, images, dists = ouc.get_neighbor_list(
+            max(bonds.values()))
+        c_coords = ouc.frac_coords[:, 2]
+        c_centers = c_coords[centers]
+        c_points = c_coords[points] + images[:, 2]
+        species = ouc._sites.unique_species
+        species_indices = ouc._sites.species_indices
         for (sp1, sp2), bond_dist in bonds.items():
-            for site in self.oriented_unit_cell:
-                if sp1 in site.species_and_occu:
-                    for nn, d in self.oriented_unit_cell.get_neighbors(
-                            site, bond_dist):
-                        if sp2 in nn.species_and_occu:
-                            c_range = tuple(sorted([site.frac_coords[2],
-                                                    nn.frac_coords[2]]))
-                            if c_range[1] > 1:
-                                # Takes care of PBC when c coordinate of site
-                                # goes beyond the upper boundary of the cell
-                                c_ranges.add((c_range[0], 1))
-                                c_ranges.add((0, c_range[1] - 1))
-                            elif c_range[0] < 0:
-                                # Takes care of PBC when c coordinate of site
-                                # is below the lower boundary of the unit cell
-                                c_ranges.add((0, c_range[1]))
-                                c_ranges.add((c_range[0] + 1, 1))
-                            elif c_range[0] != c_range[1]:
-                                c_ranges.add(c_range)
+            has_sp1 = np.array([sp1 in comp for comp in species])
+            has_sp2 = np.array([sp2 in comp for comp in species])
+            bonded = has_sp1[species_indices[centers]] & \
+                has_sp2[species_indices[points]] & (dists <= bond_dist)
+            for c_range in zip(np.minimum(c_centers, c_points)[bonded],
+                               np.maximum(c_centers, c_points)[bonded]):
+                if c_range[1] > 1:
+                    # Takes care of PBC when c coordinate of site
+                    # goes beyond the upper boundary of the cell
+                    c_ranges.add((c_range[0], 1))
+                    c_ranges.add((0, c_range[1] - 1))
+                elif c_range[0] < 0:
+                    # Takes care of PBC when c coordinate of site
+                    # is below the lower boundary of the unit cell
+                    c_ranges.add((0, c_range[1]))
+                    c_ranges.add((c_range[0] + 1, 1))
+                elif c_range[0] != c_range[1]:
+                    c_ranges.add(c_range)
         return c_ranges
 
     def get_slabs(self, bonds=None, tol=0.1, max_broken_bonds=0,
@@ -1153,10 +1163,11 @@ def get_symmetrically_distinct_miller_indices(structure, max_index):
     unique_millers = []
 
     def is_already_analyzed(miller_index):
-        for op in symm_ops:
-            if in_coord_list(unique_millers, op.operate(miller_index)):
-                return True
-        return False
+        if not unique_millers:
+            return False
+        equiv = SymmOp.operate_all(symm_ops, [miller_index])[:, 0]
+        diff = equiv[:, None, :] - np.array(unique_millers)[None, :, :]
+        return bool(np.any(np.all(np.abs(diff) < 1e-8, axis=-1)))
 
     r = list(range(-max_index, max_index + 1))
     r.reverse()
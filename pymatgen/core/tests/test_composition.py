@@ -408,6 +408,34 @@ class CompositionTest(PymatgenTest):
         for k, v in special_formulas.items():
             self.assertEqual(Composition(k).reduced_formula, v)
 
+    def test_cached_formulas(self):
+        c = Composition("Li3Fe2(PO4)3")
+        self.assertIs(c.reduced_formula, c.reduced_formula)
+        self.assertIs(c.reduced_composition, c.reduced_composition)
+        self.assertEqual(c.anonymized_formula, "A2B3C3D12")
+        # Copies share the derived values of the original.
+        c2 = Composition(c)
+        self.assertIs(c2.formula, c.formula)
+        self.assertEqual(Composition("Li3Fe2(PO4)3").reduced_formula,
+                         "Li3Fe2(PO4)3")
+        self.assertRaises(CompositionError, Composition, "Li3Fe2(PO4)3!")
+
+        c = Composition("Li-1Cl", allow_negative=True)
+        self.assertRaises(CompositionError, Composition, c)
+        self.assertEqual(Composition(c, allow_negative=True), c)
+        self.assertEqual(Composition(Composition("LiCl"),
+                                     allow_negative=True).allow_negative, True)
+        # The cached values of a copy follow its own allow_negative.
+        c = Composition("Li2Cl2")
+        c.reduced_composition
+        c2 = Composition(c, allow_negative=True)
+        self.assertTrue(c2.reduced_composition.allow_negative)
+        self.assertFalse(c.reduced_composition.allow_negative)
+
+        c = Composition.interned("LiFePO4")
+        self.assertIs(c, Composition.interned("LiFePO4"))
+        self.assertEqual(c, Composition("LiFePO4"))
+
     def test_oxi_state_guesses(self):
         self.assertEqual(Composition("LiFeO2").oxi_state_guesses(),
                          [{"Li": 1, "Fe": 3, "O": -2}])
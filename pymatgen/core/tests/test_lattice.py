@@ -268,6 +268,29 @@ class LatticeTestCase(PymatgenTest):
         for l, _, _ in latt.find_all_mappings(latt, ltol=0.05, atol=11):
             self.assertTrue(isinstance(l, Lattice))
 
+        # Compare with all the triplets of candidate vectors, in order.
+        latt = Lattice.from_parameters(3, 3.1, 3.2, 89, 91, 90)
+        latt2 = Lattice.from_parameters(3.1, 3.2, 3.3, 90, 90, 90)
+        frac, dist, _ = latt.get_points_in_sphere([[0, 0, 0]], [0, 0, 0],
+                                                  3.3 * 1.2, zip_results=False)
+        cart = latt.get_cartesian_coords(frac)
+        expected = []
+        cands = [np.nonzero(np.abs(dist / l - 1) < 0.2)[0]
+                 for l in latt2.abc]
+        for i, j, k in itertools.product(*cands):
+            aligned = Lattice([cart[i], cart[j], cart[k]])
+            if np.all(np.abs(np.array(aligned.abc) / latt2.abc - 1) < 0.2) \
+                    and np.all(np.abs(np.array(aligned.angles) -
+                                      latt2.angles) < 5) \
+                    and abs(np.linalg.det(aligned.matrix)) > 1e-8:
+                expected.append(aligned.matrix)
+        mappings = list(latt.find_all_mappings(latt2, ltol=0.2, atol=5))
+        self.assertTrue(len(expected) > 10)
+        self.assertArrayAlmostEqual([m[0].matrix for m in mappings], expected)
+        first = next(latt.find_all_mappings(latt2, ltol=0.2, atol=5))
+        self.assertArrayAlmostEqual(first[0].matrix, expected[0])
+        self.assertEqual(list(latt.find_all_mappings(Lattice.cubic(20))), [])
+
 <<<<<<< HEAD
 =======
     def test_mapping_symmetry(self):
@@ -345,6 +368,27 @@ class LatticeTestCase(PymatgenTest):
         self.assertEqual(len(latt.get_points_in_sphere(
             pts, [0.5, 0.5, 0.5], 1.0001)), 552)
 
+    def test_get_points_in_spheres(self):
+        latt = Lattice([[1, 5, 0], [0, 1, 0], [5, 0, 1]])
+        pts = np.array(list(itertools.product(range(5), repeat=3))) / 5
+        pts = latt.get_fractional_coords(pts)
+        centers = [[0, 0, 0], [0.5, 0.5, 0.5], [3, -2, 7]]
+        fcoords, dists, inds, indptr = latt.get_points_in_spheres(
+            pts, centers, 1.0001)
+        self.assertEqual(len(indptr), 4)
+        self.assertEqual(indptr[-1], len(dists))
+        for i, center in enumerate(centers):
+            f, d, ind = latt.get_points_in_sphere(pts, center, 1.0001,
+                                                  zip_results=False)
+            sl = slice(indptr[i], indptr[i + 1])
+            self.assertArrayAlmostEqual(fcoords[sl], f)
+            self.assertArrayAlmostEqual(dists[sl], d)
+            self.assertArrayEqual(inds[sl], ind)
+            cart = latt.get_cartesian_coords(f)
+            self.assertArrayAlmostEqual(
+                np.linalg.norm(cart - center, axis=1), d)
+        self.assertEqual(indptr[2] - indptr[1], 552)
+
     def test_get_all_distances(self):
         fcoords = np.array([[0.3, 0.3, 0.5],
                             [0.1, 0.1, 0.3],
@@ -360,6 +404,8 @@ class LatticeTestCase(PymatgenTest):
                              [3.245, 4.453, 1.788, 3.852, 0.000]])
         output = lattice.get_all_distances(fcoords, fcoords)
         self.assertArrayAlmostEqual(output, expected, 3)
+        self.assertArrayEqual(
+            lattice.get_all_distances(fcoords, fcoords, num_threads=2), output)
         #test just one input point
         output2 = lattice.get_all_distances(fcoords[0], fcoords)
         self.assertArrayAlmostEqual(output2, [expected[0]], 2)
@@ -38,6 +38,15 @@ class SymmOpTestCase(PymatgenTest):
         self.assertArrayAlmostEqual(
             newcoords, [[[-0.1339746, 2.23205081, 4.]] * 2] * 2, 2)
 
+    def test_operate_all(self):
+        ops = [self.op, self.op.inverse, SymmOp.inversion([0.5, 0.5, 0.5])]
+        points = np.random.rand(5, 3)
+        newcoords = SymmOp.operate_all(ops, points)
+        self.assertEqual(newcoords.shape, (3, 5, 3))
+        for op, coords in zip(ops, newcoords):
+            self.assertArrayAlmostEqual(coords, op.operate_multi(points))
+        self.assertEqual(SymmOp.operate_all(ops, []).shape, (3, 0, 3))
+
     def test_inverse(self):
         point = np.random.rand(3)
         newcoord = self.op.operate(point)
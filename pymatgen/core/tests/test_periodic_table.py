@@ -140,6 +140,21 @@ class ElementTestCase(PymatgenTest):
         self.assertEqual(val, 2.7e-08)
         self.assertEqual(str(val.unit), "m ohm")
 
+    def test_get_property_array(self):
+        x = Element.get_property_array("X")
+        self.assertEqual(len(x), 104)
+        self.assertEqual(list(x[[8, 26]]), [Element.O.X, Element.Fe.X])
+        self.assertNotEqual(x[0], x[0])
+        self.assertNotEqual(x[2], x[2])
+        self.assertIs(Element.get_property_array("X"), x)
+        self.assertRaises(ValueError, x.__setitem__, 1, 0)
+        radii = Element.get_property_array("atomic_radius_calculated")
+        self.assertEqual(radii[46], 1.69)
+        self.assertEqual(Element.get_property_array("row")[26], 4)
+        self.assertRaises(ValueError, Element.get_property_array, "spam")
+        self.assertIs(Element.Al.thermal_conductivity,
+                      Element.Al.thermal_conductivity)
+
     def test_sort(self):
         els = [Element.Se, Element.C]
         self.assertEqual(sorted(els), [Element.C, Element.Se])
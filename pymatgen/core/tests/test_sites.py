@@ -9,7 +9,7 @@ import pickle
 
 from pymatgen.util.testing import PymatgenTest
 from pymatgen.core.periodic_table import Element, Specie
-from pymatgen.core.sites import Site, PeriodicSite
+from pymatgen.core.sites import Site, PeriodicSite, SiteStore
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.composition import Composition
 
@@ -242,6 +242,95 @@ def get_distance_and_image_old(site1, site2, jimage=None):
     dist = np.linalg.norm(mapped_vec)
     return dist, jimage
 
+class SiteStoreTest(PymatgenTest):
+
+    def setUp(self):
+        self.lattice = Lattice.cubic(10.0)
+        self.store = SiteStore.from_species_and_coords(
+            ["Fe", "O", {"Fe": 0.5, "Mn": 0.5}],
+            [[0, 0, 0], [0.5, 0.5, 0.5], [1.25, 0, 0]],
+            lattice=self.lattice, site_properties={"magmom": [5, 0, 2]})
+
+    def test_sites(self):
+        self.assertEqual(len(self.store), 3)
+        site = self.store[1]
+        self.assertIsInstance(site, PeriodicSite)
+        self.assertIs(site.lattice, self.lattice)
+        self.assertArrayAlmostEqual(site.coords, [5, 5, 5])
+        self.assertEqual(site.properties, {"magmom": 0})
+        self.assertEqual(self.store[-1].species_and_occu,
+                         Composition({"Fe": 0.5, "Mn": 0.5}))
+        self.assertEqual(len(self.store[1:]), 2)
+        self.assertRaises(IndexError, self.store.__getitem__, 3)
+        # Sites are copies of the stored data.
+        site._fcoords[0] = 0.7
+        self.assertEqual(self.store[1].frac_coords[0], 0.5)
+        self.assertEqual(len(self.store.unique_species), 3)
+        self.assertFalse(self.store.is_ordered)
+        self.assertRaises(AttributeError, getattr, self.store, "species")
+
+    def test_coords(self):
+        self.assertArrayAlmostEqual(self.store.frac_coords[2], [1.25, 0, 0])
+        self.assertArrayAlmostEqual(self.store.cart_coords[2], [12.5, 0, 0])
+        self.store.update_coords([[0, 0, 1]], [0], coords_are_cartesian=True)
+        self.assertArrayAlmostEqual(self.store[0].frac_coords, [0, 0, 0.1])
+        self.store.set_lattice(Lattice.cubic(20.0))
+        self.assertArrayAlmostEqual(self.store[0].coords, [0, 0, 2])
+
+    def test_tile(self):
+        lattice = Lattice.tetragonal(10.0, 20.0)
+        store = self.store.tile([[0, 0, 0], [0, 0, 10]], lattice)
+        self.assertEqual(len(store), 6)
+        self.assertEqual(store.site_properties["magmom"], [5, 5, 0, 0, 2, 2])
+        self.assertArrayAlmostEqual(store.frac_coords[:2],
+                                    [[0, 0, 0], [0, 0, 0.5]])
+        self.assertEqual(store[4].species_and_occu,
+                         Composition({"Fe": 0.5, "Mn": 0.5}))
+        store = self.store.tile([[0, 0, 0], [0, 0, 10]], lattice,
+                                to_unit_cell=True, by_site=False)
+        self.assertEqual(store.site_properties["magmom"], [5, 0, 2, 5, 0, 2])
+        self.assertArrayAlmostEqual(store.cart_coords[5], [2.5, 0, 10])
+
+    def test_mutation(self):
+        store = self.store
+        store.insert(1, PeriodicSite("Li", [0.1, 0.1, 0.1], self.lattice,
+                                     properties={"charge": 1}))
+        self.assertEqual([s.species_string for s in store][:3],
+                         ["Fe", "Li", "O"])
+        self.assertEqual(store.site_properties,
+                         {"magmom": [5, None, 0, 2],
+                          "charge": [None, 1, None, None]})
+        self.assertEqual(store[1].properties, {"charge": 1})
+        del store[0]
+        store[0] = PeriodicSite("Na", [1, 2, 3], Lattice.cubic(5.0),
+                                coords_are_cartesian=True)
+        self.assertArrayAlmostEqual(store[0].frac_coords, [0.1, 0.2, 0.3])
+        self.assertEqual(store[0].properties, {})
+        store.sort(key=lambda s: s.species_string)
+        self.assertEqual([s.species_string for s in store],
+                         ["Mn:0.500, Fe:0.500", "Na", "O"])
+        store.map_species(lambda c: {"Cl": 1} if "O" in c else c)
+        self.assertEqual(store[2].species_string, "Cl")
+        for i in range(100):
+            store.append(PeriodicSite("H", [0, 0, i / 100], self.lattice))
+        self.assertEqual(len(store), 103)
+        self.assertArrayAlmostEqual(store[-1].frac_coords, [0, 0, 0.99])
+        frozen = store.copy(mutable=False)
+        self.assertRaises(TypeError, frozen.__delitem__, 0)
+        self.assertEqual(frozen, store)
+        self.assertEqual(pickle.loads(pickle.dumps(store)), store)
+
+    def test_non_periodic(self):
+        store = SiteStore.from_sites([Site("C", [0, 0, 0]),
+                                      Site("H", [0, 0, 1.09])],
+                                     periodic=False)
+        self.assertFalse(store.is_periodic)
+        self.assertIsInstance(store[1], Site)
+        self.assertRaises(AttributeError, getattr, store, "frac_coords")
+        self.assertEqual(store.species, [Element("C"), Element("H")])
+        self.assertArrayAlmostEqual(store.cart_coords[1], [0, 0, 1.09])
+
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     import unittest
@@ -11,10 +11,13 @@ from pymatgen.core.operations import SymmOp
 from pymatgen.core.structure import IStructure, Structure, IMolecule, \
     StructureError, Molecule
 from pymatgen.core.lattice import Lattice
+from pymatgen.core.bonds import CovalentBond
 from pymatgen.electronic_structure.core import Magmom
+import itertools
 import random
 import os
 <<<<<<< HEAD
+import numpy as np
 =======
 import numpy as np
 >>>>>>> a41cc069c865a5d0f35d0731f92c547467395b1b
@@ -181,6 +184,18 @@ class IStructureTest(PymatgenTest):
         self.assertEqual(self.propertied_structure[0].magmom, 5)
         self.assertEqual(self.propertied_structure[1].magmom, -5)
 
+    def test_site_store(self):
+        sites = self.struct.sites
+        self.assertRaises(TypeError, sites.__setitem__, 0, sites[1])
+        self.assertRaises(TypeError, sites.__delitem__, 0)
+        fcoords = self.struct.frac_coords
+        fcoords[0, 0] = 0.5
+        self.assertEqual(self.struct[0].frac_coords[0], 0)
+        s = Structure.from_sites(self.struct)
+        s.sites[0] = s[1]
+        self.assertEqual(s[0], s[1])
+        self.assertEqual(self.struct[0].frac_coords[0], 0)
+
     def test_copy(self):
         new_struct = self.propertied_structure.copy(site_properties={'charge':
                                                                      [2, 3]})
@@ -401,6 +416,54 @@ class IStructureTest(PymatgenTest):
                 self.assertAlmostEqual(d, nn[1])
         self.assertEqual(list(map(len, all_nn)), [2, 2, 2, 0])
 
+    def test_get_neighbor_list(self):
+        s = self.struct
+        r = random.uniform(3, 6)
+        centers, points, images, dists = s.get_neighbor_list(r)
+        all_nn = s.get_all_neighbors(r, True)
+        for i, nns in enumerate(all_nn):
+            self.assertEqual(len(nns), sum(centers == i))
+            self.assertArrayAlmostEqual(sorted(d for _, d, _ in nns),
+                                        sorted(dists[centers == i]))
+        fcoords = s.frac_coords[points] + images
+        d = s.lattice.get_cartesian_coords(fcoords) - s.cart_coords[centers]
+        self.assertArrayAlmostEqual((d ** 2).sum(axis=1) ** 0.5, dists)
+
+        centers, points, images, dists = s.get_neighbor_list(r, [s[1]])
+        self.assertTrue(all(centers == 0))
+        self.assertEqual(len(dists), len(all_nn[1]))
+
+        blocks = list(s.iter_neighbor_list(r))
+        self.assertArrayAlmostEqual(np.concatenate([b[3] for b in blocks]),
+                                    s.get_neighbor_list(r)[3])
+
+    def test_fingerprint(self):
+        s = self.struct
+        self.assertEqual(s.fingerprint(), "Si|2")
+        self.assertEqual((s * [2, 1, 3]).fingerprint(), "Si|2")
+        self.assertEqual((s * [2, 1, 3]).fingerprint(primitive_cell=False),
+                         "Si|12")
+        self.assertEqual(s.fingerprint(symprec=0.1), "Si|2|227")
+
+    def test_get_sparse_distance_matrix(self):
+        s = self.struct * [2, 2, 2]
+        cutoff = 4
+        dist, images = s.get_sparse_distance_matrix(cutoff)
+        dense = s.distance_matrix
+        np.fill_diagonal(dense, cutoff + 1)
+        self.assertEqual(dist.nnz, np.sum(dense <= cutoff))
+        self.assertArrayAlmostEqual(dist.toarray()[dense <= cutoff],
+                                    dense[dense <= cutoff])
+        rows = np.repeat(np.arange(len(s)), np.diff(dist.indptr))
+        for i, j, image, d in zip(rows, dist.indices, images, dist.data):
+            self.assertAlmostEqual(s[i].distance(s[j], image), d)
+        # coinciding sites are kept as explicit zeros
+        s.append("Si", s[0].frac_coords)
+        dist, images = s.get_sparse_distance_matrix(cutoff)
+        self.assertEqual(dist[0, len(s) - 1], 0)
+        self.assertEqual(dist.nnz, np.sum(dense <= cutoff) +
+                         2 * np.sum(dense[0] <= cutoff) + 2)
+
     def test_get_dist_matrix(self):
         ans = [[0., 2.3516318],
                [2.3516318, 0.]]
@@ -444,6 +507,39 @@ class StructureTest(PymatgenTest):
                            [0.00, -2.2171384943, 3.1355090603]])
         self.structure = Structure(lattice, ["Si", "Si"], coords)
 
+    def test_cached_properties(self):
+        s = self.structure
+        dm = s.distance_matrix
+        dm[0, 1] = 100
+        self.assertAlmostEqual(s.distance_matrix[0, 1], s.get_distance(0, 1))
+        gen = s._sites.generation
+        s.translate_sites([0], [0.1, 0, 0])
+        self.assertGreater(s._sites.generation, gen)
+        self.assertAlmostEqual(s.distance_matrix[0, 1], s.get_distance(0, 1))
+        s.modify_lattice(Lattice.cubic(5))
+        self.assertAlmostEqual(s.distance_matrix[0, 1], s.get_distance(0, 1))
+        self.assertEqual(s.composition.reduced_formula, "Si")
+        s.replace_species({"Si": "Ge"})
+        self.assertEqual(s.composition.reduced_formula, "Ge")
+        self.assertEqual(s.types_of_specie, [Element("Ge")])
+        s.append("O", [0.5, 0.5, 0.5])
+        self.assertEqual(s.composition.reduced_formula, "Ge2O")
+        self.assertEqual(s.distance_matrix.shape, (3, 3))
+
+    def test_get_property_array(self):
+        s = self.structure
+        s.append("O", [0.5, 0.5, 0.5])
+        self.assertArrayAlmostEqual(s.get_property_array("X"),
+                                    [1.9, 1.9, 3.44])
+        s.replace_species({"Si": {"Si": 0.5, "Ge": 0.5}})
+        self.assertArrayAlmostEqual(s.get_property_array("row"), [3.5, 3.5, 2])
+        s.add_oxidation_state_by_element({"Si": 4, "Ge": 4, "O": -2})
+        self.assertArrayAlmostEqual(s.get_property_array("ionic_radius"),
+                                    [0.605, 0.605, 1.26])
+        self.assertRaises(ValueError, s.get_property_array, "spam")
+        self.assertEqual(len(Molecule(["H", "H"], [[0, 0, 0], [0, 0, 0.7]])
+                             .get_property_array("atomic_mass")), 2)
+
     def test_mutable_sequence_methods(self):
         s = self.structure
         s[0] = "Fe"
@@ -821,6 +917,18 @@ class StructureTest(PymatgenTest):
                          Composition({'Cl': 0.35, 'F': 0.25}))
         self.assertArrayAlmostEqual(s[1].frac_coords, [.5, .5, .5005])
 
+        # Merging full occupancies fails without touching the structure.
+        s = Structure(Lattice.cubic(5), ["Si"] * 3,
+                      [[0, 0, 0], [0.5, 0.5, 0.5], [0.999, 0, 0]],
+                      site_properties={"magmom": [1, 2, 3]})
+        self.assertRaises(ValueError, s.merge_sites, 0.01)
+        self.assertEqual(len(s), 3)
+        s.merge_sites(0.01, mode="d")
+        self.assertEqual(len(s), 2)
+        self.assertArrayAlmostEqual(s.frac_coords,
+                                    [[-0.0005, 0, 0], [0.5, 0.5, 0.5]])
+        self.assertEqual(s.site_properties, {})
+
 <<<<<<< HEAD
 =======
         # Test for TaS2 with spacegroup 166 in 160 setting.
@@ -947,6 +1055,33 @@ class IMoleculeTest(PymatgenTest):
     def test_get_covalent_bonds(self):
         self.assertEqual(len(self.mol.get_covalent_bonds()), 4)
 
+    def test_get_covalent_bond_indices(self):
+        self.assertArrayEqual(self.mol.get_covalent_bond_indices(),
+                              [[0, 1], [0, 2], [0, 3], [0, 4]])
+        # Grid of methane molecules, checked against the pairwise test.
+        species = []
+        coords = []
+        for shift in itertools.product(range(3), repeat=3):
+            species.extend(["C", "H", "H", "H", "H"])
+            coords.extend(np.array(self.coords) + 2.8 * np.array(shift))
+        mol = Molecule(species, coords)
+        bonds = [[i, j] for i, j in
+                 itertools.combinations(range(len(mol)), 2)
+                 if CovalentBond.is_bonded(mol[i], mol[j])]
+        self.assertArrayEqual(mol.get_covalent_bond_indices(), bonds)
+        self.assertEqual(len(mol.get_covalent_bonds()), len(bonds))
+        self.assertRaises(ValueError, Molecule(
+            ["Fe", "H"], [[0, 0, 0], [0, 0, 1]]).get_covalent_bond_indices)
+
+        for i in [0, 7, 64]:
+            nn = mol.get_neighbors(mol[i], 2.5, include_index=True)
+            ref = [j for j in range(len(mol))
+                   if j != i and mol.get_distance(i, j) <= 2.5]
+            self.assertEqual([n[2] for n in nn], ref)
+            for site, d, j in nn:
+                self.assertEqual(site, mol[j])
+                self.assertAlmostEqual(d, mol.get_distance(i, j))
+
     def test_properties(self):
         self.assertEqual(len(self.mol), 5)
         self.assertTrue(self.mol.is_ordered)
@@ -1137,6 +1272,10 @@ class MoleculeTest(PymatgenTest):
         self.mol.translate_sites([0, 1], [0.5, 0.5, 0.5])
         self.assertArrayEqual(self.mol.cart_coords[0],
                               [0.5, 0.5, 0.5])
+        # Neighbor queries see the new coordinates.
+        nn = self.mol.get_sites_in_sphere([0.5, 0.5, 0.5], 0.1)
+        self.assertEqual(len(nn), 1)
+        self.assertArrayEqual(nn[0][0].coords, [0.5, 0.5, 0.5])
 
 <<<<<<< HEAD
 =======
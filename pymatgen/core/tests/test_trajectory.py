@@ -0,0 +1,141 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import os
+import unittest
+
+import numpy as np
+
+from monty.tempfile import ScratchDir
+
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.structure import Structure
+from pymatgen.core.trajectory import Trajectory
+from pymatgen.io.vasp.outputs import Xdatcar
+from pymatgen.util.testing import PymatgenTest
+
+test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
+                        "test_files")
+
+
+class TrajectoryTest(PymatgenTest):
+
+    def setUp(self):
+        xdatcar = Xdatcar(os.path.join(test_dir, "XDATCAR_4"))
+        self.structures = xdatcar.structures
+        self.traj = Trajectory.from_structures(self.structures, time_step=2)
+
+    def test_from_structures(self):
+        traj = self.traj
+        self.assertEqual(len(traj), 4)
+        self.assertEqual(traj.num_sites, 3)
+        self.assertTrue(traj.constant_lattice)
+        self.assertEqual(traj.frac_coords.shape, (4, 3, 3))
+        self.assertEqual(traj.lattices.shape, (4, 3, 3))
+        for s, t in zip(self.structures, traj):
+            self.assertEqual(s, t)
+            self.assertArrayAlmostEqual(s.frac_coords, t.frac_coords)
+        self.assertArrayAlmostEqual(
+            traj.cart_coords[2], self.structures[2].cart_coords)
+        self.assertEqual(traj[-1], self.structures[-1])
+        self.assertRaises(IndexError, traj.__getitem__, 4)
+
+        s = self.structures[0].copy()
+        s.replace(0, "Na")
+        self.assertRaises(ValueError, Trajectory.from_structures,
+                          [self.structures[0], s])
+
+    def test_frames_are_independent(self):
+        s = self.traj[0]
+        s.translate_sites([0], [0.1, 0, 0])
+        s.replace(1, "Na")
+        self.assertEqual(self.traj[0], self.structures[0])
+
+    def test_slicing(self):
+        traj = self.traj[1:3]
+        self.assertIsInstance(traj, Trajectory)
+        self.assertEqual(len(traj), 2)
+        self.assertEqual(traj[0], self.structures[1])
+        self.assertEqual(traj.time_step, 2)
+        traj = self.traj[[3, 0]]
+        self.assertArrayAlmostEqual(traj[0].frac_coords,
+                                    self.structures[3].frac_coords)
+
+    def test_variable_lattice(self):
+        lattices = [Lattice.cubic(4 + 0.1 * i).matrix for i in range(5)]
+        fcoords = np.random.rand(5, 2, 3)
+        traj = Trajectory(lattices, ["Si", "O"], fcoords,
+                          site_properties={"magmom": [1, 2]})
+        self.assertFalse(traj.constant_lattice)
+        self.assertAlmostEqual(traj[3].lattice.a, 4.3)
+        self.assertAlmostEqual(traj[3:][0].lattice.a, 4.3)
+        self.assertEqual(traj[4].site_properties["magmom"], [1, 2])
+        self.assertArrayAlmostEqual(traj.cart_coords[4],
+                                    traj[4].cart_coords)
+        traj.extend(traj[:2])
+        self.assertEqual(len(traj), 7)
+        self.assertAlmostEqual(traj[6].lattice.a, 4.1)
+        self.assertRaises(ValueError, traj.extend, self.traj)
+        self.assertRaises(ValueError, Trajectory, lattices[:2], ["Si", "O"],
+                          fcoords)
+
+    def test_save_load(self):
+        with ScratchDir("."):
+            self.traj.save("traj.npz")
+            traj = Trajectory.from_file("traj.npz")
+        self.assertEqual(len(traj), 4)
+        self.assertEqual(traj.time_step, 2)
+        self.assertTrue(traj.constant_lattice)
+        self.assertArrayAlmostEqual(traj.frac_coords, self.traj.frac_coords)
+        self.assertEqual(traj[3], self.structures[3])
+
+        traj = Trajectory.from_dict(self.traj.as_dict())
+        self.assertEqual(traj[1], self.structures[1])
+
+    def test_from_iterator(self):
+        # More frames than the initial capacity of the arrays.
+        traj = Trajectory.from_structures(iter(self.structures * 5))
+        self.assertEqual(len(traj), 20)
+        self.assertEqual(traj[13], self.structures[1])
+        self.assertRaises(ValueError, Trajectory.from_structures, iter([]))
+
+        fname = os.path.join(test_dir, "XDATCAR_4")
+        traj = Trajectory.from_xdatcar(fname, time_step=2)
+        self.assertArrayAlmostEqual(traj.frac_coords, self.traj.frac_coords)
+        self.assertEqual(traj.time_step, 2)
+        traj = Trajectory.from_xdatcar(fname, ionicstep_start=2,
+                                       ionicstep_end=4)
+        self.assertEqual(list(traj), self.structures[1:3])
+
+    def test_empty(self):
+        traj = self.traj[3:3]
+        self.assertEqual(len(traj), 0)
+        self.assertEqual(repr(traj), "Empty Trajectory")
+        t = Trajectory.from_dict(traj.as_dict())
+        self.assertEqual(len(t), 0)
+        self.assertEqual(t.species, self.traj.species)
+        with ScratchDir("."):
+            traj.save("traj.npz")
+            t = Trajectory.from_file("traj.npz")
+        self.assertEqual(len(t), 0)
+        t.extend(self.traj)
+        self.assertEqual(t[0], self.structures[0])
+
+    def test_species_and_properties(self):
+        s = Structure(Lattice.cubic(3), ["Fe2+", "O2-"],
+                      [[0, 0, 0], [0.5, 0.5, 0.5]],
+                      site_properties={"magmom": [4, 0]})
+        traj = Trajectory.from_structures([s, s])
+        self.assertEqual(traj[1], s)
+        with ScratchDir("."):
+            traj.save("traj", compressed=False)
+            t = Trajectory.from_file("traj.npz")[0]
+        self.assertEqual(t, s)
+        self.assertEqual(t.site_properties["magmom"], [4, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
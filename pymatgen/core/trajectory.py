@@ -0,0 +1,377 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import itertools
+import json
+
+import numpy as np
+import six
+
+from monty.json import MSONable, MontyEncoder
+
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.sites import SiteStore
+from pymatgen.core.structure import Structure
+
+"""
+This module provides the Trajectory class, an array-backed container for
+the frames of a molecular dynamics or relaxation run.
+"""
+
+
+class Trajectory(MSONable):
+    """
+    A sequence of structures that share the same sites, e.g., the ionic
+    steps of an MD run. Species and site properties are stored once for all
+    frames. The fractional coordinates are stored as a single
+    (n_frames, n_sites, 3) array and the lattices as a (n_frames, 3, 3)
+    array, or a single matrix for a constant lattice. Structure objects are
+    only created when a frame is accessed.
+
+    Indexing with an int returns the Structure of that frame. Indexing with
+    a slice or a sequence of ints returns a new Trajectory with the selected
+    frames. Slices share the coordinate array with the original.
+    """
+
+    def __init__(self, lattice, species, frac_coords, time_step=None,
+                 site_properties=None):
+        """
+        Create a trajectory.
+
+        Args:
+            lattice (Lattice/array): Lattice of the frames. Either a single
+                Lattice or 3x3 matrix if the lattice is constant, or a
+                (n_frames, 3, 3) array with the matrix of every frame.
+            species ([Specie]): Species on each site, in any of the formats
+                supported by Structure.
+            frac_coords (array): Fractional coordinates as a
+                (n_frames, n_sites, 3) array.
+            time_step (float): Time between frames. Optional and only stored
+                for the convenience of analysis code.
+            site_properties (dict): Properties associated with the sites as
+                a dict of sequences, which are the same for all frames.
+        """
+        frac_coords = np.array(frac_coords, dtype=float)
+        if frac_coords.ndim == 2:
+            frac_coords = frac_coords[None]
+        if frac_coords.ndim != 3 or frac_coords.shape[1:] != (len(species), 3):
+            raise ValueError("frac_coords must be a (n_frames, n_sites, 3) "
+                             "array matching the species.")
+        lattices = self._get_lattice_array(lattice, len(frac_coords))
+        template = SiteStore.from_species_and_coords(
+            species, frac_coords[0], Lattice(lattices[0]),
+            site_properties=site_properties, mutable=False)
+        self._init(template, lattices, frac_coords, time_step)
+
+    def _init(self, template, lattices, frac_coords, time_step):
+        self._template = template
+        self._lattices = lattices
+        self._frac_coords = frac_coords
+        self.time_step = time_step
+        self._lattice_objs = {}
+
+    @staticmethod
+    def _get_lattice_array(lattice, nframes):
+        if isinstance(lattice, Lattice):
+            lattice = lattice.matrix
+        lattices = np.array(lattice, dtype=float)
+        if lattices.shape == (3, 3):
+            return lattices[None]
+        if lattices.shape != (nframes, 3, 3):
+            raise ValueError("lattice must be a 3x3 matrix or a "
+                             "(n_frames, 3, 3) array.")
+        if (lattices == lattices[0]).all():
+            return lattices[:1].copy()
+        return lattices
+
+    @classmethod
+    def from_structures(cls, structures, time_step=None):
+        """
+        Creates a trajectory from a sequence of structures, which must have
+        the same species on every site. The structures are read one at a
+        time and only their coordinates and lattices are kept, so an
+        iterator, e.g., Xdatcar.iter_structures, never needs to hold more
+        than one frame as a Structure.
+
+        Args:
+            structures ([Structure]): Frames of the trajectory, as a
+                sequence or an iterator.
+            time_step (float): Time between frames.
+
+        Returns:
+            Trajectory
+        """
+        it = iter(structures)
+        try:
+            first = next(it)
+        except StopIteration:
+            raise ValueError("At least one structure is needed to create a "
+                             "Trajectory.")
+        species = first.species_and_occu
+        nsites = len(first)
+        # Frames are copied into preallocated arrays, which are resized in
+        # place if the number of frames is not known in advance.
+        size = len(structures) if hasattr(structures, "__len__") else 16
+        frac_coords = np.empty((size, nsites, 3))
+        lattices = np.empty((size, 3, 3))
+        n = 0
+        for s in itertools.chain([first], it):
+            if s is not first and s.species_and_occu != species:
+                raise ValueError("All structures in a Trajectory must have "
+                                 "the same species on every site.")
+            if n == len(frac_coords):
+                frac_coords.resize((2 * n, nsites, 3), refcheck=False)
+                lattices.resize((2 * n, 3, 3), refcheck=False)
+            frac_coords[n] = s.frac_coords
+            lattices[n] = s.lattice.matrix
+            n += 1
+        if n < len(frac_coords):
+            frac_coords.resize((n, nsites, 3), refcheck=False)
+        template = SiteStore.from_species_and_coords(
+            species, frac_coords[0], first.lattice,
+            site_properties=first.site_properties, mutable=False)
+        traj = cls.__new__(cls)
+        traj._init(template, cls._get_lattice_array(lattices[:n], n),
+                   frac_coords, time_step)
+        return traj
+
+    @classmethod
+    def from_xdatcar(cls, filename, ionicstep_start=1, ionicstep_end=None,
+                     time_step=None):
+        """
+        Reads a trajectory from a XDATCAR file. Ionic steps are parsed one at
+        a time, so that only the coordinate arrays of the whole run are held
+        in memory, unlike with Xdatcar.structures.
+
+        Args:
+            filename (str): Filename of XDATCAR file.
+            ionicstep_start (int): Starting number of ionic step.
+            ionicstep_end (int): Ending number of ionic step.
+            time_step (float): Time between frames.
+
+        Returns:
+            Trajectory
+        """
+        from pymatgen.io.vasp.outputs import Xdatcar
+        return cls.from_structures(
+            Xdatcar.iter_structures(filename, ionicstep_start=ionicstep_start,
+                                    ionicstep_end=ionicstep_end),
+            time_step=time_step)
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Reads a trajectory written by Trajectory.save.
+
+        Args:
+            filename (str): Name of the npz file.
+
+        Returns:
+            Trajectory
+        """
+        with np.load(filename) as data:
+            structure = Structure.from_dict(
+                json.loads(six.text_type(data["structure"].item())))
+            time_step = float(data["time_step"][0]) \
+                if data["time_step"].size else None
+            traj = cls.__new__(cls)
+            traj._init(structure.sites.copy(mutable=False),
+                       data["lattices"], data["frac_coords"], time_step)
+        return traj
+
+    def save(self, filename, compressed=True):
+        """
+        Writes the trajectory to a numpy npz file. The coordinate and lattice
+        arrays are stored as binary arrays. The species and site properties
+        are stored once, as the json representation of the first frame.
+
+        Args:
+            filename (str): Name of the npz file. numpy appends ".npz" if the
+                name does not already end with it.
+            compressed (bool): Whether to compress the file. Defaults to
+                True.
+        """
+        save = np.savez_compressed if compressed else np.savez
+        time_step = [] if self.time_step is None else [self.time_step]
+        save(filename, frac_coords=self._frac_coords,
+             lattices=self._lattices,
+             time_step=np.array(time_step, dtype=float),
+             structure=np.array(json.dumps(
+                 self._get_template_structure().as_dict(verbosity=0),
+                                           cls=MontyEncoder)))
+
+    @property
+    def frac_coords(self):
+        """
+        Fractional coordinates of all frames as a (n_frames, n_sites, 3)
+        array. This is the stored array, not a copy.
+        """
+        return self._frac_coords
+
+    @property
+    def cart_coords(self):
+        """
+        Cartesian coordinates of all frames as a (n_frames, n_sites, 3)
+        array.
+        """
+        if len(self._lattices) == 1:
+            return np.dot(self._frac_coords, self._lattices[0])
+        return np.einsum("fij,fjk->fik", self._frac_coords, self._lattices)
+
+    @property
+    def lattices(self):
+        """
+        Lattice matrices of all frames as a read-only (n_frames, 3, 3)
+        array.
+        """
+        return np.broadcast_to(self._lattices, (len(self), 3, 3))
+
+    @property
+    def constant_lattice(self):
+        """
+        True if all frames have the same lattice.
+        """
+        return len(self._lattices) == 1
+
+    @property
+    def num_sites(self):
+        """
+        Number of sites in each frame.
+        """
+        return len(self._template)
+
+    @property
+    def species(self):
+        """
+        List of the species (Compositions) on each site.
+        """
+        return self._template.species_and_occu
+
+    @property
+    def site_properties(self):
+        """
+        Site properties as a dict of lists.
+        """
+        return self._template.site_properties
+
+    def get_lattice(self, i):
+        """
+        Returns the Lattice of a frame.
+
+        Args:
+            i (int): Index of the frame.
+        """
+        if len(self._lattices) == 1:
+            i = 0
+        elif i < 0:
+            i += len(self)
+        latt = self._lattice_objs.get(i)
+        if latt is None:
+            latt = Lattice(self._lattices[i])
+            self._lattice_objs[i] = latt
+        return latt
+
+    def get_structure(self, i):
+        """
+        Returns the Structure of a frame. The Structure is independent of
+        the trajectory, i.e., modifying it does not change the trajectory.
+
+        Args:
+            i (int): Index of the frame.
+
+        Returns:
+            Structure
+        """
+        fcoords = self._frac_coords[i]
+        store = self._template.copy(mutable=True)
+        store.lattice = self.get_lattice(i)
+        store.update_coords(fcoords)
+        return Structure.from_sites(store)
+
+    def _get_template_structure(self):
+        """
+        Structure holding the species and site properties of the frames,
+        which is also available for an empty trajectory.
+        """
+        return Structure.from_sites(self._template.copy(mutable=True))
+
+    def extend(self, trajectory):
+        """
+        Appends the frames of another trajectory with the same species,
+        e.g., from a continuation run.
+
+        Args:
+            trajectory (Trajectory): Trajectory to append.
+        """
+        if trajectory.species != self.species:
+            raise ValueError("Cannot extend a Trajectory with frames that "
+                             "have different species.")
+        if self.constant_lattice and trajectory.constant_lattice and \
+                np.array_equal(self._lattices, trajectory._lattices):
+            lattices = self._lattices
+        else:
+            lattices = np.concatenate([self.lattices, trajectory.lattices])
+        self._frac_coords = np.concatenate([self._frac_coords,
+                                            trajectory._frac_coords])
+        self._lattices = lattices
+        self._lattice_objs = {}
+
+    def __len__(self):
+        return len(self._frac_coords)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_structure(i)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            if not -len(self) <= item < len(self):
+                raise IndexError("Frame index out of range.")
+            return self.get_structure(item)
+        frac_coords = self._frac_coords[item]
+        lattices = self._lattices
+        if len(lattices) > 1:
+            lattices = lattices[item]
+        traj = self.__class__.__new__(self.__class__)
+        traj._init(self._template, lattices, frac_coords, self.time_step)
+        return traj
+
+    def __repr__(self):
+        return "Trajectory of %s with %d frames" % (
+            self[0].composition.formula, len(self)) if len(self) \
+            else "Empty Trajectory"
+
+    def as_dict(self):
+        """
+        Json-serializable dict representation of the Trajectory.
+        """
+        return {"@module": self.__class__.__module__,
+                "@class": self.__class__.__name__,
+                "structure": self._get_template_structure().as_dict(
+                    verbosity=0),
+                "lattices": self._lattices.tolist(),
+                "frac_coords": self._frac_coords.tolist(),
+                "time_step": self.time_step}
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Reconstitute a Trajectory object from a dict representation created
+        using as_dict().
+
+        Args:
+            d (dict): Dict representation of Trajectory.
+
+        Returns:
+            Trajectory
+        """
+        structure = Structure.from_dict(d["structure"])
+        traj = cls.__new__(cls)
+        traj._init(structure.sites.copy(mutable=False),
+                   np.array(d["lattices"], dtype=float).reshape((-1, 3, 3)),
+                   np.array(d["frac_coords"], dtype=float).reshape(
+                       (-1, len(structure), 3)), d["time_step"])
+        return traj
@@ -177,13 +177,29 @@ class UnitError(BaseException):
     """
 
 
+# Derived unit matching each combination of base units checked so far, or
+# None. Units are created for every FloatWithUnit, so the search over all
+# derived units is only done once per combination.
+_derived_unit_cache = {}
+
+
 def check_mappings(u):
-    for v in DERIVED_UNITS.values():
-        for k2, v2 in v.items():
-            if all([v2.get(ku, 0) == vu for ku, vu in u.items()]) and \
-                    all([u.get(kv2, 0) == vv2 for kv2, vv2 in v2.items()]):
-                return {k2: 1}
-    return u
+    key = frozenset(u.items())
+    try:
+        derived = _derived_unit_cache[key]
+    except KeyError:
+        derived = None
+        for v in DERIVED_UNITS.values():
+            for k2, v2 in v.items():
+                if all([v2.get(ku, 0) == vu for ku, vu in u.items()]) and \
+                        all([u.get(kv2, 0) == vv2
+                             for kv2, vv2 in v2.items()]):
+                    derived = k2
+                    break
+            if derived is not None:
+                break
+        _derived_unit_cache[key] = derived
+    return u if derived is None else {derived: 1}
 
 
 class Unit(collections.Mapping):
@@ -4,7 +4,6 @@
 
 from __future__ import division, unicode_literals, print_function
 
-import math
 import re
 import os
 import textwrap
@@ -24,8 +23,7 @@ except ImportError:
 from itertools import groupby
 from pymatgen.core.periodic_table import Element, Specie, get_el_sp, DummySpecie
 from monty.io import zopen
-from pymatgen.util.coord import in_coord_list_pbc, pbc_diff, \
-    find_in_coord_list_pbc
+from pymatgen.util.coord import pbc_diff, PeriodicCoordIndex
 from monty.string import remove_non_ascii
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Structure
@@ -534,39 +532,39 @@ class CifParser(object):
         Generate unique coordinates using coord and symmetry positions
         and also their corresponding magnetic moments, if supplied.
         """
+        if magmoms_in and len(magmoms_in) != len(coords_in):
+            raise ValueError
+        ops = self.symmetry_operations
+
+        def get_magmom(op, magmom):
+            if isinstance(op, MagSymmOp):
+                # Up to this point, magmoms have been defined relative
+                # to crystal axis. Now convert to Cartesian and into
+                # a Magmom object.
+                return Magmom.from_moment_relative_to_crystal_axes(
+                    op.operate_magmom(magmom), lattice=lattice)
+            return Magmom(magmom)
+
         coords = []
+        magmoms = []
+        # Index of the coords found so far, for fast duplicate checks.
+        index = PeriodicCoordIndex(atol=self._site_tolerance)
+        # All equivalent positions of each coord, ordered by operation.
+        all_equiv = SymmOp.operate_all(ops, coords_in).transpose((1, 0, 2))
+        all_equiv -= np.floor(all_equiv)
+        for i, equiv in enumerate(all_equiv):
+            # Positions already found are skipped at once, the others are
+            # checked one by one, since they can be duplicates of each other.
+            for j in np.nonzero(~index.contains(equiv))[0]:
+                coord = equiv[j]
+                if len(index.find(coord)) == 0:
+                    index.add(coord)
+                    coords.append(coord)
+                    if magmoms_in:
+                        magmoms.append(get_magmom(ops[j], magmoms_in[i]))
         if magmoms_in:
-            magmoms = []
-            if len(magmoms_in) != len(coords_in):
-                raise ValueError
-            for tmp_coord, tmp_magmom in zip(coords_in, magmoms_in):
-                for op in self.symmetry_operations:
-                    coord = op.operate(tmp_coord)
-                    coord = np.array([i - math.floor(i) for i in coord])
-                    if isinstance(op, MagSymmOp):
-                        # Up to this point, magmoms have been defined relative
-                        # to crystal axis. Now convert to Cartesian and into
-                        # a Magmom object.
-                        magmom = Magmom.from_moment_relative_to_crystal_axes(
-                            op.operate_magmom(tmp_magmom),
-                            lattice=lattice
-                        )
-                    else:
-                        magmom = Magmom(tmp_magmom)
-                    if not in_coord_list_pbc(coords, coord,
-                                             atol=self._site_tolerance):
-                        coords.append(coord)
-                        magmoms.append(magmom)
             return coords, magmoms
-        else:
-            for tmp_coord in coords_in:
-                for op in self.symmetry_operations:
-                    coord = op.operate(tmp_coord)
-                    coord = np.array([i - math.floor(i) for i in coord])
-                    if not in_coord_list_pbc(coords, coord,
-                                             atol=self._site_tolerance):
-                        coords.append(coord)
-            return coords, [Magmom(0)] * len(coords)  # return dummy magmoms
+        return coords, [Magmom(0)] * len(coords)  # return dummy magmoms
 
     def get_lattice(self, data, length_strings=("a", "b", "c"),
                     angle_strings=("alpha", "beta", "gamma"),
@@ -855,15 +853,16 @@ class CifParser(object):
 
         def get_matching_coord(coord):
             keys = list(coord_to_species.keys())
-            coords = np.array(keys)
-            for op in self.symmetry_operations:
-                c = op.operate(coord)
-                inds = find_in_coord_list_pbc(coords, c,
-                                              atol=self._site_tolerance)
-                # cant use if inds, because python is dumb and np.array([0]) evaluates
-                # to False
-                if len(inds):
-                    return keys[inds[0]]
+            if not keys:
+                return False
+            # Compare all symmetry equivalent positions with all keys at
+            # once, and return the first key matched by the first operation.
+            equiv = SymmOp.operate_all(self.symmetry_operations, [coord])[:, 0]
+            fdist = pbc_diff(equiv[:, None, :], np.array(keys)[None, :, :])
+            matches = np.all(np.abs(fdist) < self._site_tolerance, axis=-1)
+            op_inds, inds = np.nonzero(matches)
+            if len(inds):
+                return keys[inds[0]]
             return False
 
         for i in range(len(data["_atom_site_label"])):
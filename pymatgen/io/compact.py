@@ -0,0 +1,399 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import io
+import json
+from importlib import import_module
+
+import numpy as np
+import six
+
+from monty.json import MontyEncoder, MontyDecoder
+
+from pymatgen.core.composition import Composition
+from pymatgen.core.lattice import Lattice
+from pymatgen.core.sites import SiteStore
+from pymatgen.core.structure import IStructure, IMolecule
+from pymatgen.entries.computed_entries import ComputedEntry, \
+    ComputedStructureEntry
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+"""
+This module implements a compact, array based serialization of structures,
+molecules and ComputedStructureEntries. Instead of one dict per site, a batch
+of objects is stored column-wise as a handful of arrays: a table of the unique
+species, the index of the species of every site, the coordinates of all sites
+and one column per site property. The arrays can be written to npz files or
+to msgpack. Loading avoids parsing and converting every site, and is more
+than an order of magnitude faster than JSON.
+
+The arrays of a batch of n objects with a total of N sites are:
+
+- classes (n): Full class name of each object.
+- structure_classes (n): Full class name of each structure or molecule.
+- num_sites (n): Number of sites of each object.
+- lattices (n, 3, 3): Lattice matrices, NaN for molecules.
+- charges, spin_multiplicities (n): Charge and spin multiplicity of
+  molecules, NaN for structures.
+- coords (N, 3): Fractional coordinates of structures and cartesian
+  coordinates of molecules.
+- species (M): JSON encoded table of the unique species and occupancies.
+- species_indices (N): Index of the species of every site.
+- entries (n): JSON encoded entry data, or an empty string for objects that
+  are not entries.
+- property_names (P): Names of the site properties.
+- property_<i>_mask (n): Whether each object has property i.
+- property_<i> (sum of num_sites with property i): The values of property i,
+  either as a numeric array or as one JSON encoded list per object.
+- property_<i>_dtypes (number of objects with property i): For numeric
+  columns, the dtype of the values of each object.
+"""
+
+FORMAT_VERSION = 1
+
+
+def _class_name(obj):
+    return "%s.%s" % (obj.__class__.__module__, obj.__class__.__name__)
+
+
+def _load_class(name):
+    module, cls = name.rsplit(".", 1)
+    return getattr(import_module(module), cls)
+
+
+def _to_str_array(strings):
+    return np.array(strings, dtype=six.text_type) if strings else \
+        np.zeros(0, dtype="U1")
+
+
+def _get_kind(values):
+    """
+    Returns the numpy dtype kind shared by all the numbers in a (nested)
+    sequence of site property values, or None if the values are not all
+    plain numbers of the same kind, e.g., if they are Magmom objects or mix
+    ints and floats.
+    """
+    kinds = set()
+    stack = [values]
+    while stack and len(kinds) < 2:
+        v = stack.pop()
+        if isinstance(v, np.ndarray):
+            kinds.add(v.dtype.kind)
+        elif isinstance(v, (list, tuple)):
+            stack.extend(v)
+        elif isinstance(v, bool):
+            kinds.add("b")
+        elif isinstance(v, six.integer_types):
+            kinds.add("i")
+        elif isinstance(v, float):
+            kinds.add("f")
+        elif isinstance(v, np.generic):
+            kinds.add(v.dtype.kind)
+        else:
+            return None
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        return kind if kind in "biuf" else None
+    # An empty sequence fits any column.
+    return "b" if not kinds else None
+
+
+def _numeric_values(values):
+    """
+    Converts the values of a site property of one object into a numeric
+    array, or returns None if they are not all numbers of the same kind (or
+    equally shaped lists of them). Only such values are restored exactly
+    from a numeric column.
+    """
+    if _get_kind(values) is None:
+        return None
+    try:
+        arr = np.array(values)
+    except ValueError:
+        return None
+    return arr if arr.dtype.kind in "biuf" else None
+
+
+def to_arrays(objects):
+    """
+    Converts structures, molecules and ComputedStructureEntries to the
+    compact array representation.
+
+    Args:
+        objects ([IStructure/IMolecule/ComputedStructureEntry]): Objects
+            to convert. A single object is also accepted.
+
+    Returns:
+        dict of str to numpy array.
+    """
+    if isinstance(objects, (IStructure, IMolecule, ComputedStructureEntry)):
+        objects = [objects]
+    classes, structure_classes, entries = [], [], []
+    lattices, charges, spins, num_sites = [], [], [], []
+    coords, species_indices = [], []
+    species, species_lookup = [], {}
+    properties = {}
+    for n, obj in enumerate(objects):
+        classes.append(_class_name(obj))
+        if isinstance(obj, ComputedStructureEntry):
+            d = ComputedEntry.as_dict(obj)
+            for k in ("@module", "@class", "composition", "attribute"):
+                d.pop(k, None)
+            entries.append(json.dumps(d))
+            obj = obj.structure
+        elif isinstance(obj, (IStructure, IMolecule)):
+            entries.append("")
+        else:
+            raise ValueError("Cannot serialize objects of type %s." %
+                             type(obj).__name__)
+        structure_classes.append(_class_name(obj))
+        store = obj._sites
+        if isinstance(obj, IStructure):
+            lattices.append(obj.lattice.matrix)
+            charges.append(np.nan)
+            spins.append(np.nan)
+            coords.append(store.frac_coords)
+        else:
+            lattices.append(np.full((3, 3), np.nan))
+            charges.append(obj.charge)
+            spins.append(obj.spin_multiplicity)
+            coords.append(store.cart_coords)
+        num_sites.append(len(store))
+
+        # Map the species table of the store onto the table of the batch,
+        # which is keyed on the JSON representation of the species.
+        table = []
+        for comp in store.unique_species:
+            key = json.dumps([[sp.as_dict(), occu]
+                              for sp, occu in comp.items()], cls=MontyEncoder)
+            if key not in species_lookup:
+                species_lookup[key] = len(species)
+                species.append(key)
+            table.append(species_lookup[key])
+        species_indices.append(
+            np.array(table, dtype=np.int32)[store.species_indices]
+            if len(store) else np.zeros(0, dtype=np.int32))
+
+        for k, v in store.site_properties.items():
+            col = properties.setdefault(k, ([], []))
+            col[0].append(n)
+            col[1].append(v)
+
+    nobjs = len(classes)
+    arrays = {
+        "format_version": np.array([FORMAT_VERSION]),
+        "classes": _to_str_array(classes),
+        "structure_classes": _to_str_array(structure_classes),
+        "entries": _to_str_array(entries),
+        "num_sites": np.array(num_sites, dtype=np.int64),
+        "lattices": np.array(lattices, dtype=float).reshape((nobjs, 3, 3)),
+        "charges": np.array(charges, dtype=float),
+        "spin_multiplicities": np.array(spins, dtype=float),
+        "coords": np.concatenate(coords).reshape((-1, 3)) if coords
+        else np.zeros((0, 3)),
+        "species": _to_str_array(species),
+        "species_indices": np.concatenate(species_indices) if species_indices
+        else np.zeros(0, dtype=np.int32),
+        "property_names": _to_str_array(sorted(properties.keys()))
+    }
+    for i, k in enumerate(sorted(properties.keys())):
+        owners, values = properties[k]
+        mask = np.zeros(nobjs, dtype=bool)
+        mask[owners] = True
+        arrays["property_%d_mask" % i] = mask
+        columns = [_numeric_values(v) for v in values]
+        if all(c is not None for c in columns) and \
+                len(set(c.shape[1:] for c in columns)) == 1:
+            # The dtype of each object is stored, so that, e.g., the int
+            # values of one object come back as ints even if another object
+            # has float values.
+            arrays["property_%d" % i] = np.concatenate(columns)
+            arrays["property_%d_dtypes" % i] = _to_str_array(
+                [c.dtype.str for c in columns])
+        else:
+            arrays["property_%d" % i] = _to_str_array(
+                [json.dumps(v, cls=MontyEncoder) for v in values])
+    return arrays
+
+
+def from_arrays(arrays):
+    """
+    Recreates the objects from their compact array representation.
+
+    Args:
+        arrays (dict): Arrays generated by to_arrays.
+
+    Returns:
+        List of IStructure/IMolecule/ComputedStructureEntry objects.
+    """
+    version = int(arrays["format_version"][0])
+    if version > FORMAT_VERSION:
+        raise ValueError("Unsupported compact format version %d." % version)
+    dec = MontyDecoder()
+    species = []
+    for s in arrays["species"]:
+        species.append(Composition(
+            {dec.process_decoded(d): occu for d, occu in json.loads(s)}))
+    num_sites = arrays["num_sites"]
+    nobjs = len(num_sites)
+    offsets = np.concatenate([[0], np.cumsum(num_sites)])
+    coords = np.asarray(arrays["coords"], dtype=float)
+    species_indices = arrays["species_indices"]
+
+    # Per object dicts of site property values.
+    properties = [{} for i in range(nobjs)]
+    for i, k in enumerate(arrays["property_names"]):
+        owners = np.nonzero(arrays["property_%d_mask" % i])[0]
+        column = arrays["property_%d" % i]
+        if column.dtype.kind == "U":
+            for n, v in zip(owners, column):
+                properties[n][k] = dec.process_decoded(json.loads(v))
+        else:
+            dtypes = arrays.get("property_%d_dtypes" % i)
+            start = 0
+            for j, n in enumerate(owners):
+                end = start + num_sites[n]
+                values = column[start:end]
+                if dtypes is not None:
+                    values = values.astype(dtypes[j])
+                properties[n][k] = values.tolist()
+                start = end
+
+    # Plain lists are much faster to index than numpy arrays.
+    structure_classes = arrays["structure_classes"].tolist()
+    entries = arrays["entries"].tolist()
+    entry_classes = arrays["classes"].tolist()
+    lattices = arrays["lattices"]
+    offsets = offsets.tolist()
+    classes = {}
+    objects = []
+    for n in range(nobjs):
+        cname = structure_classes[n]
+        if cname not in classes:
+            classes[cname] = _load_class(cname)
+        cls = classes[cname]
+        start, end = offsets[n], offsets[n + 1]
+        if issubclass(cls, IStructure):
+            store = SiteStore.from_arrays(
+                species, species_indices[start:end], coords[start:end],
+                lattice=Lattice(lattices[n]), site_properties=properties[n])
+            obj = cls.from_sites(store)
+        else:
+            spin = arrays["spin_multiplicities"][n]
+            obj = cls([species[i] for i in species_indices[start:end]],
+                      coords[start:end],
+                      charge=float(arrays["charges"][n]),
+                      spin_multiplicity=None if np.isnan(spin) else int(spin),
+                      site_properties=properties[n])
+        if entries[n]:
+            ename = entry_classes[n]
+            if ename not in classes:
+                classes[ename] = _load_class(ename)
+            d = json.loads(entries[n])
+            obj = classes[ename](
+                obj, d["energy"], d["correction"],
+                dec.process_decoded(d.get("parameters", {})),
+                dec.process_decoded(d.get("data", {})),
+                entry_id=d.get("entry_id"))
+        objects.append(obj)
+    return objects
+
+
+def save_npz(filename, objects, compressed=True):
+    """
+    Writes structures, molecules or ComputedStructureEntries to a npz file.
+
+    Args:
+        filename (str/file): Name of the file, or a file object.
+        objects: Object or list of objects to write.
+        compressed (bool): Whether to compress the arrays. Defaults to True.
+    """
+    save = np.savez_compressed if compressed else np.savez
+    save(filename, **to_arrays(objects))
+
+
+def load_npz(filename):
+    """
+    Reads the objects from a npz file written by save_npz.
+
+    Args:
+        filename (str/file): Name of the file, or a file object.
+
+    Returns:
+        List of IStructure/IMolecule/ComputedStructureEntry objects.
+    """
+    with np.load(filename) as data:
+        return from_arrays({k: data[k] for k in data.files})
+
+
+def dumps_npz(objects, compressed=True):
+    """
+    Same as save_npz, but returns the contents of the npz file as bytes.
+    """
+    f = io.BytesIO()
+    save_npz(f, objects, compressed=compressed)
+    return f.getvalue()
+
+
+def loads_npz(data):
+    """
+    Same as load_npz, but reads the contents of a npz file from bytes.
+    """
+    return load_npz(io.BytesIO(data))
+
+
+def _check_msgpack():
+    if msgpack is None:
+        raise RuntimeError("msgpack serialization requires msgpack, which "
+                           "can be installed with pip install msgpack.")
+
+
+def dumps_msgpack(objects):
+    """
+    Serializes structures, molecules or ComputedStructureEntries to msgpack.
+    Requires msgpack.
+
+    Args:
+        objects: Object or list of objects to serialize.
+
+    Returns:
+        bytes
+    """
+    _check_msgpack()
+    d = {}
+    for k, v in to_arrays(objects).items():
+        if v.dtype.kind == "U":
+            d[k] = v.tolist()
+        else:
+            v = np.ascontiguousarray(v)
+            d[k] = {"dtype": v.dtype.str, "shape": list(v.shape),
+                    "data": v.tobytes()}
+    return msgpack.packb(d, use_bin_type=True)
+
+
+def loads_msgpack(data):
+    """
+    Recreates the objects serialized by dumps_msgpack. Requires msgpack.
+
+    Args:
+        data (bytes): msgpack data.
+
+    Returns:
+        List of IStructure/IMolecule/ComputedStructureEntry objects.
+    """
+    _check_msgpack()
+    arrays = {}
+    for k, v in msgpack.unpackb(data, raw=False).items():
+        if isinstance(v, list):
+            arrays[k] = _to_str_array(v)
+        else:
+            arrays[k] = np.frombuffer(v["data"], dtype=v["dtype"]).reshape(
+                v["shape"])
+    return from_arrays(arrays)
@@ -21,15 +21,18 @@ This module implements classes for processing Lammps output files:
 
 import re
 import os
+import itertools
 from io import open
 
 import numpy as np
 
+from monty.io import zopen
 from monty.json import MSONable
 
 from pymatgen.core.periodic_table import _pt_data
 from pymatgen.core.structure import Structure
 from pymatgen.core.lattice import Lattice
+from pymatgen.core.trajectory import Trajectory
 from pymatgen.analysis.diffusion_analyzer import DiffusionAnalyzer
 from pymatgen.io.lammps.data import LammpsData
 
@@ -182,6 +185,70 @@ class LammpsDump(MSONable):
 
         return cls(timesteps, natoms, box_bounds, atoms_data)
 
+    @staticmethod
+    def iter_structures(dump_file, species):
+        """
+        Iterates over the frames of a dump file as Structures. Only one
+        frame is read at a time, so that long trajectories can be processed
+        in constant memory, e.g., with
+        :class:`pymatgen.analysis.rdf.RadialDistributionFunction`.
+
+        The ATOMS section must contain the id and type of the atoms and
+        their cartesian (x y z or xu yu zu) or scaled (xs ys zs)
+        coordinates. Orthogonal and triclinic boxes are supported. The
+        sites of each structure are sorted by atom id.
+
+        Args:
+            dump_file (str): Name of the dump file, which may be gzip or
+                bzip2 compressed.
+            species (dict/list): Species of each atom type, either as a
+                dict of type to species, or as a list with the species of
+                types 1, 2, ...
+
+        Yields:
+            Structure of each frame.
+        """
+        if not isinstance(species, dict):
+            species = {i + 1: sp for i, sp in enumerate(species)}
+        natoms = 0
+        bounds = None
+        with zopen(dump_file, "rt") as f:
+            for line in f:
+                if line.startswith("ITEM: NUMBER OF ATOMS"):
+                    natoms = int(next(f))
+                elif line.startswith("ITEM: BOX BOUNDS"):
+                    bounds = np.array([[float(x) for x in next(f).split()]
+                                       for i in range(3)])
+                elif line.startswith("ITEM: ATOMS"):
+                    fields = line.split()[2:]
+                    data = np.array([l.split() for l in
+                                     itertools.islice(f, natoms)],
+                                    dtype=float).reshape((natoms, -1))
+                    yield LammpsDump._get_structure(fields, data, bounds,
+                                                    species)
+
+    @staticmethod
+    def _get_structure(fields, data, bounds, species):
+        xy, xz, yz = bounds[:, 2] if bounds.shape[1] == 3 else (0, 0, 0)
+        lo = bounds[:, 0] - [min(0, xy, xz, xy + xz), min(0, yz), 0]
+        hi = bounds[:, 1] - [max(0, xy, xz, xy + xz), max(0, yz), 0]
+        lattice = Lattice([[hi[0] - lo[0], 0, 0], [xy, hi[1] - lo[1], 0],
+                           [xz, yz, hi[2] - lo[2]]])
+        for names, cartesian in [(("x", "y", "z"), True),
+                                 (("xu", "yu", "zu"), True),
+                                 (("xs", "ys", "zs"), False)]:
+            if all(n in fields for n in names):
+                coords = data[:, [fields.index(n) for n in names]]
+                if cartesian:
+                    coords = coords - lo
+                break
+        else:
+            raise ValueError("The dump file does not contain coordinates.")
+        order = np.argsort(data[:, fields.index("id")], kind="mergesort")
+        types = data[order, fields.index("type")].astype(int)
+        return Structure(lattice, [species[t] for t in types], coords[order],
+                         coords_are_cartesian=cartesian)
+
 
 # TODO: @wood-b simplify this, use LammpsDump to parse + use mdanalysis to process.
 # make sure its backward compatible
@@ -368,6 +435,29 @@ class LammpsRun(MSONable):
             structures.append(structure)
         return structures
 
+    def get_trajectory(self):
+        """
+        Convert the coordinates of all time steps to a
+        :class:`pymatgen.core.trajectory.Trajectory`, without creating a
+        Structure for each step.
+
+        Returns:
+            Trajectory
+        """
+        lattice = Lattice([[self.box_lengths[0], 0, 0],
+                           [0, self.box_lengths[1], 0],
+                           [0, 0, self.box_lengths[2]]])
+        mass_to_symbol = dict(
+            (round(y["Atomic mass"], 1), x) for x, y in _pt_data.items())
+        unique_atomic_masses = np.array([d["mass"] for d in self.lammps_data.masses])
+        species = [mass_to_symbol[round(unique_atomic_masses[atype - 1], 1)]
+                   for atype in self.trajectory[:self.natoms]["atom_type"]]
+        coords = np.column_stack([self.trajectory[fld]
+                                  for fld in ("x", "y", "z")])
+        fcoords = lattice.get_fractional_coords(coords)
+        return Trajectory(lattice, species,
+                          fcoords.reshape(self.timesteps.size, self.natoms, 3))
+
     def get_displacements(self):
         """
         Return the initial structure and displacements for each time step.
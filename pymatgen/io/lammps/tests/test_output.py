@@ -5,7 +5,10 @@
 from __future__ import division, print_function, unicode_literals, \
     absolute_import
 
+import gzip
 import os
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
@@ -56,6 +59,33 @@ class TestLammpsDump(unittest.TestCase):
         self.assertEqual(self.dump_nvt.natoms * len(self.dump_nvt.timesteps),
                          len(self.dump_nvt.atoms_data))
 
+    def test_iter_structures(self):
+        structures = list(LammpsDump.iter_structures(
+            os.path.join(test_dir, "nvt.dump"), ["O", "H"]))
+        self.assertEqual(len(structures), len(self.dump_nvt.timesteps))
+        s = structures[0]
+        self.assertEqual(len(s), self.dump_nvt.natoms)
+        self.assertEqual(s.composition.reduced_formula, "H2O")
+        self.assertAlmostEqual(s.lattice.a, 30)
+        # Atoms are sorted by id and shifted to the origin of the box.
+        data = np.array(self.dump_nvt.atoms_data[:len(s)])
+        row = data[np.argmin(data[:, 0])]
+        np.testing.assert_almost_equal(s.cart_coords[0], row[2:5] + 15)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            fname = os.path.join(tmp_dir, "nvt.dump.gz")
+            with open(os.path.join(test_dir, "nvt.dump"), "rb") as f, \
+                    gzip.open(fname, "wb") as g:
+                g.write(f.read())
+            gz_structures = list(LammpsDump.iter_structures(
+                fname, ["O", "H"]))
+            self.assertEqual(len(gz_structures), len(structures))
+            np.testing.assert_almost_equal(gz_structures[-1].cart_coords,
+                                           structures[-1].cart_coords)
+        finally:
+            shutil.rmtree(tmp_dir)
+
 
 class TestLammpsRun(unittest.TestCase):
     @classmethod
@@ -97,6 +127,17 @@ class TestLammpsRun(unittest.TestCase):
                                            trajectory_ans[:, i + 1],
                                            decimal=10)
 
+    def test_get_trajectory(self):
+        traj = self.lammpsrun.get_trajectory()
+        natoms = self.lammpsrun.natoms
+        self.assertEqual(len(traj), self.lammpsrun.timesteps.size)
+        self.assertEqual(traj.num_sites, natoms)
+        self.assertEqual(traj[0].composition.reduced_formula, "H2O")
+        frame = self.lammpsrun.trajectory[41 * natoms:42 * natoms]
+        np.testing.assert_almost_equal(
+            traj[41].cart_coords,
+            np.column_stack([frame["x"], frame["y"], frame["z"]]))
+
     def test_serialization(self):
         d = self.lammpsrun.as_dict()
         lmps_run = LammpsRun.from_dict(d)
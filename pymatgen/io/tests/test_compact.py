@@ -0,0 +1,149 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import json
+import os
+import tempfile
+import shutil
+import timeit
+import unittest
+
+from pymatgen.core.periodic_table import Specie
+from pymatgen.core.structure import Structure, IStructure, Molecule
+from pymatgen.electronic_structure.core import Magmom
+from pymatgen.entries.computed_entries import ComputedStructureEntry
+from pymatgen.io.compact import to_arrays, from_arrays, save_npz, \
+    load_npz, dumps_npz, loads_npz, dumps_msgpack, loads_msgpack, msgpack
+from pymatgen.util.testing import PymatgenTest
+
+
+class CompactTest(PymatgenTest):
+
+    def setUp(self):
+        s = self.get_structure("LiFePO4")
+        s.add_site_property("magmom", list(range(len(s))))
+        s.add_site_property("label", ["a"] * (len(s) - 1) + [None])
+        self.structure = s
+        self.disordered = Structure(
+            [[3, 0, 0], [0, 3, 0], [0, 0, 3]],
+            [{"Fe2+": 0.5, "Mn2+": 0.5}, Specie("O", -2, {"spin": 1})],
+            [[0, 0, 0], [0.5, 0.5, 0.5]])
+        self.molecule = Molecule(
+            ["C", "H", "H", "H", "H"],
+            [[0, 0, 0], [0, 0, 1.089], [1.026719, 0, -0.363],
+             [-0.51336, -0.889165, -0.363], [-0.51336, 0.889165, -0.363]],
+            charge=1, spin_multiplicity=2)
+        self.entry = ComputedStructureEntry(
+            self.disordered, -10, correction=0.5,
+            parameters={"run_type": "GGA"}, data={"volume": 27},
+            entry_id="mp-1")
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def check_objects(self, objs):
+        s, disordered, mol, entry = objs
+        self.assertEqual(type(s), Structure)
+        self.assertEqual(s, self.structure)
+        self.assertEqual(s.site_properties, self.structure.site_properties)
+        self.assertEqual(disordered, self.disordered)
+        self.assertEqual(disordered[1].specie.spin, 1)
+        self.assertEqual(mol, self.molecule)
+        self.assertEqual(mol.charge, 1)
+        self.assertEqual(mol.spin_multiplicity, 2)
+        self.assertIsInstance(entry, ComputedStructureEntry)
+        self.assertEqual(entry.structure, self.disordered)
+        self.assertAlmostEqual(entry.energy, -9.5)
+        self.assertEqual(entry.parameters, {"run_type": "GGA"})
+        self.assertEqual(entry.data, {"volume": 27})
+        self.assertEqual(entry.entry_id, "mp-1")
+
+    def test_round_trip(self):
+        objs = [self.structure, self.disordered, self.molecule, self.entry]
+        arrays = to_arrays(objs)
+        self.assertEqual(arrays["num_sites"].tolist(), [28, 2, 5, 2])
+        self.assertEqual(arrays["coords"].shape, (37, 3))
+        self.assertEqual(len(arrays["species"]), 8)
+        self.check_objects(from_arrays(arrays))
+
+        fname = os.path.join(self.tmp_dir, "objs.npz")
+        save_npz(fname, objs)
+        self.check_objects(load_npz(fname))
+        self.check_objects(loads_npz(dumps_npz(objs, compressed=False)))
+        self.assertEqual(from_arrays(to_arrays([])), [])
+        self.assertRaises(ValueError, to_arrays, [self.structure.composition])
+
+    @unittest.skipIf(msgpack is None, "msgpack not present.")
+    def test_msgpack(self):
+        objs = [self.structure, self.disordered, self.molecule, self.entry]
+        self.check_objects(loads_msgpack(dumps_msgpack(objs)))
+
+    def test_to_from_file(self):
+        fname = os.path.join(self.tmp_dir, "s.npz")
+        self.structure.to(filename=fname)
+        s = IStructure.from_file(fname)
+        self.assertEqual(type(s), IStructure)
+        self.assertEqual(s, self.structure)
+        s = Structure.from_file(fname, sort=True)
+        self.assertEqual(s, self.structure.get_sorted_structure())
+        self.assertEqual(loads_npz(self.structure.to(fmt="npz")),
+                         [self.structure])
+
+        fname = os.path.join(self.tmp_dir, "m.npz")
+        self.molecule.to(filename=fname)
+        m = Molecule.from_file(fname)
+        self.assertEqual(m, self.molecule)
+        self.assertEqual(m.charge, 1)
+
+        fname = os.path.join(self.tmp_dir, "e.npz")
+        save_npz(fname, self.entry)
+        self.assertEqual(Structure.from_file(fname), self.disordered)
+        save_npz(fname, [self.structure, self.disordered])
+        self.assertRaises(ValueError, Structure.from_file, fname)
+        save_npz(fname, self.molecule)
+        self.assertRaises(ValueError, Structure.from_file, fname)
+        save_npz(fname, self.structure)
+        self.assertRaises(ValueError, Molecule.from_file, fname)
+
+    def test_site_property_types(self):
+        s1 = self.disordered.copy()
+        s1.add_site_property("magmom", [5, 0])
+        s1.add_site_property("mixed", [1, 0.5])
+        s2 = self.disordered.copy()
+        s2.add_site_property("magmom", [0.5, 1.5])
+        s2.add_site_property("mixed", [0.5, 1.5])
+        s3 = self.disordered.copy()
+        s3.add_site_property("magmom", [Magmom([0, 0, 1]), Magmom([1, 0, 0])])
+        arrays = to_arrays([s1, s2])
+        # magmom is numeric in both objects, mixed is stored as JSON since
+        # it mixes ints and floats within s1.
+        self.assertEqual(arrays["property_0"].dtype.kind, "f")
+        self.assertEqual(arrays["property_1"].dtype.kind, "U")
+        r1, r2, r3 = from_arrays(to_arrays([s1, s2, s3]))
+        self.assertEqual(r1.site_properties, s1.site_properties)
+        self.assertIsInstance(r1.site_properties["magmom"][0], int)
+        self.assertIsInstance(r1.site_properties["mixed"][0], int)
+        self.assertIsInstance(r2.site_properties["magmom"][0], float)
+        self.assertIsInstance(r3.site_properties["magmom"][0], Magmom)
+        self.assertEqual(list(r3.site_properties["magmom"][1]), [1, 0, 0])
+
+    def test_load_speed(self):
+        structures = [self.structure] * 200
+        docs = [json.dumps(s.as_dict()) for s in structures]
+        arrays = to_arrays(structures)
+        t_json = min(timeit.repeat(
+            lambda: [Structure.from_dict(json.loads(d)) for d in docs],
+            number=1, repeat=3))
+        t_compact = min(timeit.repeat(lambda: from_arrays(arrays),
+                                      number=1, repeat=3))
+        # Typically more than 10 times faster. Only test a loose bound to
+        # be robust against timing noise.
+        self.assertLess(t_compact, t_json / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,6 +28,7 @@ from pymatgen.core.composition import Composition
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.periodic_table import Element
 from pymatgen.core.structure import Structure
+from pymatgen.core.trajectory import Trajectory
 from pymatgen.core.units import unitized
 from pymatgen.electronic_structure.bandstructure import BandStructure, \
     BandStructureSymmLine, get_reconstructed_band_structure
@@ -478,6 +479,18 @@ class Vasprun(MSONable):
     def structures(self):
         return [step["structure"] for step in self.ionic_steps]
 
+    @property
+    def trajectory(self):
+        """
+        The structures of all ionic steps as a
+        :class:`pymatgen.core.trajectory.Trajectory`. For MD runs
+        (IBRION = 0), the time step is set to POTIM in fs.
+        """
+        time_step = self.parameters.get("POTIM") \
+            if self.parameters.get("IBRION") == 0 else None
+        return Trajectory.from_structures(self.structures,
+                                          time_step=time_step)
+
     @property
     def epsilon_static(self):
         """
@@ -3272,9 +3285,29 @@ class Xdatcar(object):
             ionicstep_start (int): Starting number of ionic step.
             ionicstep_end (int): Ending number of ionic step.
         """
+        self.structures = list(self.iter_structures(
+            filename, ionicstep_start=ionicstep_start,
+            ionicstep_end=ionicstep_end))
+        self.comment = comment or self.structures[0].formula
+
+    @staticmethod
+    def iter_structures(filename, ionicstep_start=1, ionicstep_end=None):
+        """
+        Iterates over the structures in a XDATCAR file. Only one ionic step
+        is parsed at a time, so that long MD runs can be processed in
+        constant memory, e.g., with
+        :class:`pymatgen.analysis.rdf.RadialDistributionFunction`.
+
+        Args:
+            filename (str): Filename of XDATCAR file.
+            ionicstep_start (int): Starting number of ionic step.
+            ionicstep_end (int): Ending number of ionic step.
+
+        Yields:
+            Structure of each ionic step.
+        """
         preamble = None
         coords_str = []
-        structures = []
         preamble_done = False
         if (ionicstep_start < 1):
             raise Exception('Start ionic step cannot be less than 1')
@@ -3301,28 +3334,29 @@ class Xdatcar(object):
                     else:
                         preamble.append(l)
                 elif l == "" or "Direct configuration=" in l:
-                    p = Poscar.from_string("\n".join(preamble +
-                                                     ["Direct"] + coords_str))
-                    if ionicstep_end is None:
-                        if (ionicstep_cnt >= ionicstep_start):
-                            structures.append(p.structure)
-                    else:
-                        if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                            structures.append(p.structure)
+                    if ionicstep_end is not None and \
+                            ionicstep_cnt >= ionicstep_end:
+                        return
+                    if ionicstep_cnt >= ionicstep_start:
+                        yield Poscar.from_string("\n".join(
+                            preamble + ["Direct"] + coords_str)).structure
                     ionicstep_cnt += 1
                     coords_str = []
                 else:
                     coords_str.append(l)
-            p = Poscar.from_string("\n".join(preamble +
-                                             ["Direct"] + coords_str))
-            if ionicstep_end is None:
-                if ionicstep_cnt >= ionicstep_start:
-                    structures.append(p.structure)
-            else:
-                if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                    structures.append(p.structure)
-        self.structures = structures
-        self.comment = comment or self.structures[0].formula
+            if ionicstep_start <= ionicstep_cnt and \
+                    (ionicstep_end is None or ionicstep_cnt < ionicstep_end):
+                yield Poscar.from_string("\n".join(
+                    preamble + ["Direct"] + coords_str)).structure
+
+    @property
+    def trajectory(self):
+        """
+        The structures as a :class:`pymatgen.core.trajectory.Trajectory`.
+        For long runs, use Trajectory.from_xdatcar instead, which reads the
+        file without creating a Structure for every ionic step.
+        """
+        return Trajectory.from_structures(self.structures)
 
     @property
     def site_symbols(self):
@@ -3355,55 +3389,9 @@ class Xdatcar(object):
            Requires a check to ensure if the new concatenating file has the
            same lattice structure and atoms as the Xdatcar class.
         """
-        preamble = None
-        coords_str = []
-        structures = self.structures
-        preamble_done = False
-        if ionicstep_start < 1:
-            raise Exception('Start ionic step cannot be less than 1')
-        if (ionicstep_end is not None and
-            ionicstep_start < 1):
-            raise Exception('End ionic step cannot be less than 1')
-        ionicstep_cnt = 1
-        with zopen(filename, "rt") as f:
-            for l in f:
-                l = l.strip()
-                if preamble is None:
-                    preamble = [l]
-                elif not preamble_done:
-                    if l == "" or "Direct configuration=" in l:
-                        preamble_done = True
-                        tmp_preamble = [preamble[0]]
-                        for i in range(1, len(preamble)):
-                            if preamble[0] != preamble[i]:
-                                tmp_preamble.append(preamble[i])
-                            else:
-                                break
-                        preamble = tmp_preamble
-                    else:
-                        preamble.append(l)
-                elif l == "" or "Direct configuration=" in l:
-                    p = Poscar.from_string("\n".join(preamble +
-                                                     ["Direct"] + coords_str))
-                    if ionicstep_end is None:
-                        if (ionicstep_cnt >= ionicstep_start):
-                            structures.append(p.structure)
-                    else:
-                        if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                            structures.append(p.structure)
-                    ionicstep_cnt += 1
-                    coords_str = []
-                else:
-                    coords_str.append(l)
-            p = Poscar.from_string("\n".join(preamble +
-                                             ["Direct"] + coords_str))
-            if ionicstep_end is None:
-                if ionicstep_cnt >= ionicstep_start:
-                    structures.append(p.structure)
-            else:
-                if ionicstep_start <= ionicstep_cnt < ionicstep_end:
-                    structures.append(p.structure)
-        self.structures = structures
+        self.structures.extend(self.iter_structures(
+            filename, ionicstep_start=ionicstep_start,
+            ionicstep_end=ionicstep_end))
 
     def get_string(self, ionicstep_start=1,
                    ionicstep_end=None,
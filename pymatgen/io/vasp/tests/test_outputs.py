@@ -67,6 +67,13 @@ class VasprunTest(unittest.TestCase):
         v = Vasprun(os.path.join(test_dir, "vasprun.xml.vdw"))
         self.assertAlmostEqual(v.final_energy, -9.78310677)
 
+    def test_trajectory(self):
+        v = Vasprun(os.path.join(test_dir, "vasprun.xml.vdw"))
+        traj = v.trajectory
+        self.assertEqual(len(traj), len(v.structures))
+        self.assertEqual(traj[-1], v.final_structure)
+        self.assertIsNone(traj.time_step)
+
     def test_properties(self):
 
         filepath = os.path.join(test_dir, 'vasprun.xml.nonlm')
@@ -877,6 +884,19 @@ class XdatcarTest(unittest.TestCase):
         self.assertEqual(len(x.structures), 8)
         self.assertIsNotNone(x.get_string())
 
+    def test_iter_structures(self):
+        filepath = os.path.join(test_dir, 'XDATCAR_4')
+        structures = Xdatcar(filepath).structures
+        self.assertEqual(list(Xdatcar.iter_structures(filepath)), structures)
+        self.assertEqual(list(Xdatcar.iter_structures(
+            filepath, ionicstep_start=2, ionicstep_end=3)), structures[1:2])
+
+    def test_trajectory(self):
+        x = Xdatcar(os.path.join(test_dir, 'XDATCAR_4'))
+        traj = x.trajectory
+        self.assertEqual(len(traj), 4)
+        self.assertEqual(list(traj), x.structures)
+
 
 class DynmatTest(unittest.TestCase):
 
@@ -81,6 +81,68 @@ class LinearAssignment(object):
 =======
 
 >>>>>>> a41cc069c865a5d0f35d0731f92c547467395b1b
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def linear_assignment_many(costs, epsilon=1e-13, threshold=None):
+    """
+    Solves the Linear Assignment Problem for a stack of cost matrices of the
+    same shape in a single call, e.g., for the many small matrices of the
+    candidate lattices and translations in structure matching. Each problem
+    is solved exactly as by LinearAssignment, but without the per matrix
+    Python overhead.
+
+    Args:
+        costs: (K, n, m) array of K cost matrices, with n <= m.
+        epsilon: Tolerance for determining if solution vector is < 0
+        threshold: If not None, stop after the first matrix whose minimum
+            cost is below threshold.
+
+    Returns:
+        (solutions, min_costs), where solutions is a (k, n) array of the
+        matchings of the rows to columns and min_costs a (k,) array of the
+        minimum costs. k = K, unless the search stopped early at a cost
+        below threshold, in which case the last matrix solved is k - 1.
+    """
+    orig_c = np.array(costs, dtype=np.float_, copy=False, order='C')
+    if orig_c.ndim != 3:
+        raise ValueError("costs must be a stack of cost matrices")
+    cdef Py_ssize_t k, nk = orig_c.shape[0], nsolved = orig_c.shape[0]
+    cdef int n = orig_c.shape[2]
+    nx, ny = orig_c.shape[1:]
+    if nx > ny:
+        raise ValueError("cost matrix must have at least as many columns as rows")
+
+    if nx == ny:
+        c = orig_c
+    else:
+        c = np.zeros((nk, ny, ny), dtype=np.float_)
+        c[:, :nx] = orig_c
+
+    x = np.empty((nk, ny), dtype=np.int_)
+    y = np.empty((nk, ny), dtype=np.int_)
+    min_costs = np.empty(nk, dtype=np.float_)
+
+    cdef np.float_t[:, :, :] cv = c
+    cdef np.int_t[:, :] xv = x
+    cdef np.int_t[:, :] yv = y
+    cdef np.float_t[:] mv = min_costs
+    cdef np.float_t eps = fabs(epsilon)
+    cdef bint check = threshold is not None
+    cdef np.float_t thr = threshold if check else 0
+
+    if n > 0:
+        with nogil:
+            for k in range(nk):
+                mv[k] = compute(n, cv[k], xv[k], yv[k], eps)
+                if check and mv[k] < thr:
+                    nsolved = k + 1
+                    break
+    else:
+        min_costs[:] = 0
+
+    return x[:nsolved, :nx], min_costs[:nsolved]
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 cdef np.float_t compute(int size, np.float_t[:, :] c, np.int_t[:] x, np.int_t[:] y, np.float_t eps) nogil:
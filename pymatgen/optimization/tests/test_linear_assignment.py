@@ -6,7 +6,8 @@ from __future__ import unicode_literals
 
 import unittest
 
-from pymatgen.optimization.linear_assignment import LinearAssignment
+from pymatgen.optimization.linear_assignment import LinearAssignment, \
+    linear_assignment_many
 import numpy as np
 
 class LinearAssignmentTest(unittest.TestCase):
@@ -129,6 +130,27 @@ class LinearAssignmentTest(unittest.TestCase):
         #doesn't work properly
         self.assertEqual(la.orig_c.dtype, np.float64)
 
+    def test_many(self):
+        costs = np.random.RandomState(0).rand(20, 5, 7)
+        solutions, min_costs = linear_assignment_many(costs)
+        self.assertEqual(solutions.shape, (20, 5))
+        for c, s, m in zip(costs, solutions, min_costs):
+            la = LinearAssignment(c)
+            self.assertEqual(s.tolist(), la.solution.tolist())
+            self.assertAlmostEqual(m, la.min_cost)
+
+        # stops at the first matrix with a cost below the threshold
+        ind = np.nonzero(min_costs < 1)[0][0]
+        solutions, min_costs_t = linear_assignment_many(costs, threshold=1)
+        self.assertEqual(len(solutions), ind + 1)
+        self.assertEqual(min_costs_t.tolist(), min_costs[:ind + 1].tolist())
+
+        solutions, min_costs = linear_assignment_many(np.zeros((0, 3, 3)))
+        self.assertEqual(solutions.shape, (0, 3))
+        self.assertRaises(ValueError, linear_assignment_many, costs[0])
+        self.assertRaises(ValueError, linear_assignment_many,
+                          costs.transpose((0, 2, 1)))
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
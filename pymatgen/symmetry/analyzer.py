@@ -24,7 +24,8 @@ from pymatgen.symmetry.structure import SymmetrizedStructure
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import PeriodicSite
 from pymatgen.core.operations import SymmOp
-from pymatgen.util.coord import find_in_coord_list, pbc_diff
+from pymatgen.util.coord import find_in_coord_list, pbc_diff, \
+    PeriodicCoordIndex
 
 """
 An interface to the excellent spglib library by Atsushi Togo
@@ -862,8 +863,12 @@ class PointGroupAnalyzer(object):
             matrix_tol (float): Tolerance used to generate the full set of
                 symmetry operations of the point group.
         """
+        from scipy.spatial import cKDTree
         self.mol = mol
         self.centered_mol = mol.get_centered_molecule()
+        # KD-tree of the centered coordinates, used to find the sites an
+        # operation maps each site onto without an O(N^2) distance matrix.
+        self._tree = cKDTree(self.centered_mol.cart_coords)
         self.tol = tolerance
         self.eig_tol = eigen_tolerance
         self.mat_tol = matrix_tol
@@ -1220,12 +1225,15 @@ class PointGroupAnalyzer(object):
             (bool): Whether SymmOp is valid for Molecule.
         """
         coords = self.centered_mol.cart_coords
-        for site in self.centered_mol:
-            coord = symmop.operate(site.coords)
-            ind = find_in_coord_list(coords, coord, self.tol)
-            if not (len(ind) == 1
-                    and self.centered_mol[ind[0]].species_and_occu
-                    == site.species_and_occu):
+        species = self.centered_mol.species_and_occu
+        new_coords = symmop.operate_multi(coords)
+        # query_ball_point includes sites at exactly tol, so the candidates
+        # are checked against the strict tolerance in every coordinate.
+        for i, ind in enumerate(self._tree.query_ball_point(
+                new_coords, self.tol, p=np.inf)):
+            ind = [j for j in ind
+                   if np.all(np.abs(coords[j] - new_coords[i]) < self.tol)]
+            if not (len(ind) == 1 and species[ind[0]] == species[i]):
                 return False
         return True
 
@@ -1264,9 +1272,10 @@ class PointGroupAnalyzer(object):
 
         for index in get_clustered_indices():
             sites = self.centered_mol.cart_coords[index]
+            # The sites rotated by every operation, computed at once.
+            all_rotated = np.einsum("kij,nj->kni", symm_ops, sites)
             for i, reference in zip(index, sites):
-                for op in symm_ops:
-                    rotated = np.dot(op, sites.T).T
+                for op, rotated in zip(symm_ops, all_rotated):
                     matched_indices = find_in_coord_list(rotated, reference,
                                                          self.tol)
                     matched_indices = {
@@ -1586,22 +1595,31 @@ class SpacegroupOperations(list):
             (bool): Whether the two sets of sites are symmetrically
             equivalent.
         """
-        def in_sites(site):
-            for test_site in sites1:
-                if test_site.is_periodic_image(site, symm_prec, False):
-                    return True
+        # Group the sites by species, so that the transformed sites2 are
+        # only compared with the sites1 of the same species.
+        def group_by_species(sites):
+            groups = defaultdict(list)
+            for site in sites:
+                groups[site.species_and_occu].append(site.frac_coords)
+            return groups
+
+        indices1 = {sp: PeriodicCoordIndex(fcoords, atol=symm_prec)
+                    for sp, fcoords in group_by_species(sites1).items()}
+        groups2 = group_by_species(sites2)
+        if any(sp not in indices1 for sp in groups2):
             return False
 
-        for op in self:
-            newsites2 = [PeriodicSite(site.species_and_occu,
-                                      op.operate(site.frac_coords),
-                                      site.lattice) for site in sites2]
-            for site in newsites2:
-                if not in_sites(site):
-                    break
-            else:
-                return True
-        return False
+        # Apply all operations at once, and look for an operation that maps
+        # all sites2 of every species onto sites1.
+        valid = np.ones(len(self), dtype=bool)
+        for sp, fcoords in groups2.items():
+            equiv = SymmOp.operate_all(self, fcoords)
+            # Like PeriodicSite.is_periodic_image, differences equal to the
+            # tolerance count as matches.
+            found = indices1[sp].contains(equiv.reshape((-1, 3)),
+                                          inclusive=True)
+            valid &= found.reshape(equiv.shape[:2]).all(axis=1)
+        return bool(valid.any())
 
     def __str__(self):
         return "{} ({}) spacegroup".format(self.int_symbol, self.int_number)
@@ -11,9 +11,9 @@ from collections import Sequence
 import numpy as np
 import warnings
 import re
-from monty.serialization import loadfn
 
 from pymatgen.core.operations import SymmOp
+from pymatgen.util.io_utils import load_data_file
 from monty.design_patterns import cached_class
 
 """
@@ -36,8 +36,8 @@ SYMM_DATA = None
 def get_symm_data(name):
     global SYMM_DATA
     if SYMM_DATA is None:
-        SYMM_DATA = loadfn(os.path.join(os.path.dirname(__file__),
-                                        "symm_data.json"))
+        SYMM_DATA = load_data_file(os.path.join(os.path.dirname(__file__),
+                                                "symm_data.json"))
     return SYMM_DATA[name]
 
 
@@ -149,18 +149,13 @@ class PointGroup(SymmetryGroup):
         Args:
             p: Point as a 3x1 array.
             tol: Tolerance for determining if sites are the same. 1e-5 should
-                be sufficient for most purposes. Set to 0 for exact matching
-                (and also needed for symbolic orbits).
+                be sufficient for most purposes. Set to 0 for exact matching.
 
         Returns:
             ([array]) Orbit for point.
         """
-        orbit = []
-        for o in self.symmetry_ops:
-            pp = o.operate(p)
-            if not in_array_list(orbit, pp, tol=tol):
-                orbit.append(pp)
-        return orbit
+        orbit = SymmOp.operate_all(self.symmetry_ops, [p])[:, 0]
+        return list(orbit[get_unique_array_indices(orbit, tol=tol)])
 
 
 @cached_class
@@ -185,8 +180,8 @@ class SpaceGroup(SymmetryGroup):
 
         Order of Space Group
     """
-    SYMM_OPS = loadfn(os.path.join(os.path.dirname(__file__),
-                                   "symm_ops.json"))
+    SYMM_OPS = load_data_file(os.path.join(os.path.dirname(__file__),
+                                           "symm_ops.json"))
     SG_SYMBOLS = set(get_symm_data("space_group_encoding").keys())
     for op in SYMM_OPS:
         op["hermann_mauguin"] = re.sub(r" ", "", op["hermann_mauguin"])
@@ -344,19 +339,14 @@ class SpaceGroup(SymmetryGroup):
         Args:
             p: Point as a 3x1 array.
             tol: Tolerance for determining if sites are the same. 1e-5 should
-                be sufficient for most purposes. Set to 0 for exact matching
-                (and also needed for symbolic orbits).
+                be sufficient for most purposes. Set to 0 for exact matching.
 
         Returns:
             ([array]) Orbit for point.
         """
-        orbit = []
-        for o in self.symmetry_ops:
-            pp = o.operate(p)
-            pp = np.mod(np.round(pp, decimals=10), 1)
-            if not in_array_list(orbit, pp, tol=tol):
-                orbit.append(pp)
-        return orbit
+        orbit = SymmOp.operate_all(self.symmetry_ops, [p])[:, 0]
+        orbit = np.mod(np.round(orbit, decimals=10), 1)
+        return list(orbit[get_unique_array_indices(orbit, tol=tol)])
 
     def is_compatible(self, lattice, tol=1e-5, angle_tol=5):
         """
@@ -532,3 +522,33 @@ def in_array_list(array_list, a, tol=1e-5):
         return np.any(np.all(np.equal(array_list, a[None, :]), axes))
     else:
         return np.any(np.sum(np.abs(array_list - a[None, :]), axes) < tol)
+
+
+def get_unique_array_indices(array_list, tol=1e-5):
+    """
+    Finds the unique arrays in a list, using the same comparison as
+    in_array_list. All pairs of arrays are compared at once, and the first
+    array of each set of equal arrays is kept. The result is therefore the
+    same as adding the arrays one by one to a list, unless in_array_list
+    finds them in it already.
+
+    Args:
+        array_list ([array]): A list of arrays of the same shape.
+        tol (float): The tolerance. Defaults to 1e-5. If 0, an exact match is
+            done.
+
+    Returns:
+        ([int]) Indices of the unique arrays in increasing order.
+    """
+    arrays = np.array(array_list)
+    n = len(arrays)
+    flat = arrays.reshape((n, -1))
+    if not tol:
+        equal = np.all(flat[:, None] == flat[None, :], axis=-1)
+    else:
+        equal = np.sum(np.abs(flat[:, None] - flat[None, :]), axis=-1) < tol
+    unique = []
+    for i in range(n):
+        if not equal[i, unique].any():
+            unique.append(i)
+    return unique
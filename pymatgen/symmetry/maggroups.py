@@ -13,7 +13,8 @@ import textwrap
 
 from pymatgen.core import Lattice
 from pymatgen.electronic_structure.core import Magmom
-from pymatgen.symmetry.groups import SymmetryGroup, in_array_list
+from pymatgen.symmetry.groups import SymmetryGroup, \
+    get_unique_array_indices
 from pymatgen.core.operations import MagSymmOp
 from pymatgen.util.string import transformation_to_string
 
@@ -335,23 +336,17 @@ class MagneticSpaceGroup(SymmetryGroup):
             m: A magnetic moment, compatible with 
             :class:`pymatgen.electronic_structure.core.Magmom`
             tol: Tolerance for determining if sites are the same. 1e-5 should
-                be sufficient for most purposes. Set to 0 for exact matching
-                (and also needed for symbolic orbits).
+                be sufficient for most purposes. Set to 0 for exact matching.
 
         Returns:
             (([array], [array])) Tuple of orbit for point and magnetic moments for orbit.
         """
-        orbit = []
-        orbit_magmoms = []
         m = Magmom(m)
-        for o in self.symmetry_ops:
-            pp = o.operate(p)
-            pp = np.mod(np.round(pp, decimals=10), 1)
-            mm = o.operate_magmom(m)
-            if not in_array_list(orbit, pp, tol=tol):
-                orbit.append(pp)
-                orbit_magmoms.append(mm)
-        return orbit, orbit_magmoms
+        ops = self.symmetry_ops
+        orbit = MagSymmOp.operate_all(ops, [p])[:, 0]
+        orbit = np.mod(np.round(orbit, decimals=10), 1)
+        unique = get_unique_array_indices(orbit, tol=tol)
+        return list(orbit[unique]), [ops[i].operate_magmom(m) for i in unique]
 
     def is_compatible(self, lattice, tol=1e-5, angle_tol=5):
         """
@@ -6,7 +6,8 @@ import numpy as np
 import warnings
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.operations import SymmOp
-from pymatgen.symmetry.groups import PointGroup, SpaceGroup
+from pymatgen.symmetry.groups import PointGroup, SpaceGroup, in_array_list, \
+    get_unique_array_indices
 
 __author__ = "Shyue Ping Ong"
 __copyright__ = "Copyright 2012, The Materials Virtual Lab"
@@ -91,6 +92,22 @@ class SpaceGroupTest(unittest.TestCase):
         sg = SpaceGroup("Fm-3m")
         p = np.random.randint(0, 100 + 1, size=(3,)) / 100
         self.assertLessEqual(len(sg.get_orbit(p)), sg.order)
+        # Same as adding the operated points one by one.
+        for p in [[0.1, 0.2, 0.3], [0, 0, 0.1]]:
+            expected = []
+            for op in sg.symmetry_ops:
+                pp = np.mod(np.round(op.operate(p), decimals=10), 1)
+                if not in_array_list(expected, pp):
+                    expected.append(pp)
+            self.assertTrue(np.allclose(sg.get_orbit(p), expected))
+
+    def test_get_unique_array_indices(self):
+        arrays = [[0, 0, 0], [0.5, 0, 0], [0, 0, 1e-6], [0.5, 0, 0],
+                  [0, 0, 1e-4]]
+        self.assertEqual(get_unique_array_indices(arrays), [0, 1, 4])
+        self.assertEqual(get_unique_array_indices(arrays, tol=0), [0, 1, 2, 4])
+        self.assertEqual(get_unique_array_indices(arrays, tol=1e-3), [0, 1])
+        self.assertEqual(get_unique_array_indices(np.eye(2)[None]), [0])
 
     def test_is_compatible(self):
         cubic = Lattice.cubic(1)
@@ -27,6 +27,12 @@ __date__ = "Nov 27, 2011"
 # array size threshold for looping instead of broadcasting
 LOOP_THRESHOLD = 1e6
 
+# number of pairs up to which coords_in_list_pbc compares all pairs directly
+_MAX_DIRECT_PAIRS = 2 ** 14
+
+# number of pairs computed at once by iter_pbc_shortest_d2
+PBC_BLOCK_SIZE = 2 ** 22
+
 
 def find_in_coord_list(coord_list, coord, atol=1e-8):
     """
@@ -117,6 +123,8 @@ def coord_list_mapping_pbc(subset, superset, atol=1e-8):
     Returns:
         list of indices such that superset[indices] = subset
     """
+    if len(subset) * len(superset) > _MAX_DIRECT_PAIRS:
+        return PeriodicCoordIndex(superset, atol=atol).get_mapping(subset)
     atol = np.array([1., 1. ,1.]) * atol
     return cuc.coord_list_mapping_pbc(subset, superset, atol)
 
@@ -213,6 +221,63 @@ def pbc_shortest_vectors(lattice, fcoords1, fcoords2, mask=None,
                                     return_d2)
 
 
+def pbc_shortest_d2(lattice, fcoords1, fcoords2, mask=None, num_threads=1):
+    """
+    Returns the squared lengths of the shortest vectors between two lists of
+    coordinates taking into account periodic boundary conditions and the
+    lattice. Use this instead of pbc_shortest_vectors if the vectors
+    themselves are not needed, since it avoids allocating them.
+
+    Args:
+        lattice: lattice to use
+        fcoords1: First set of fractional coordinates. e.g., [0.5, 0.6, 0.7]
+            or [[1.1, 1.2, 4.3], [0.5, 0.6, 0.7]]. It can be a single
+            coord or any array of coords.
+        fcoords2: Second set of fractional coordinates.
+        mask (boolean array): Mask of matches that are not allowed.
+            i.e. if mask[1,2] == True, then subset[1] cannot be matched
+            to superset[2]. Masked pairs get a squared distance of 1e20.
+        num_threads (int): Number of threads used for the rows of the
+            result. Only has an effect if pymatgen was built with OpenMP.
+
+    Returns:
+        2d array of squared distances. d2[i, j] is the squared distance
+        between fcoords1[i] and the nearest image of fcoords2[j].
+    """
+    return cuc.pbc_shortest_d2(lattice, fcoords1, fcoords2, mask,
+                               num_threads)
+
+
+def iter_pbc_shortest_d2(lattice, fcoords1, fcoords2, mask=None,
+                         num_threads=1, block_size=PBC_BLOCK_SIZE):
+    """
+    Computes the same squared distances as pbc_shortest_d2 in blocks of
+    rows, so that distances between very large sets of coordinates can be
+    processed without holding the full matrix in memory.
+
+    Args:
+        lattice: lattice to use
+        fcoords1: First set of fractional coordinates.
+        fcoords2: Second set of fractional coordinates.
+        mask (boolean array): Mask of matches that are not allowed. See
+            pbc_shortest_d2.
+        num_threads (int): Number of threads. See pbc_shortest_d2.
+        block_size (int): Approximate number of pairs per block.
+
+    Yields:
+        (start, d2) for consecutive blocks of rows, where d2[i, j] is the
+        squared distance between fcoords1[start + i] and fcoords2[j].
+    """
+    fcoords1 = np.atleast_2d(fcoords1)
+    fcoords2 = np.atleast_2d(fcoords2)
+    nrows = max(1, int(block_size) // max(len(fcoords2), 1))
+    for start in range(0, len(fcoords1), nrows):
+        stop = start + nrows
+        m = None if mask is None else mask[start:stop]
+        yield start, cuc.pbc_shortest_d2(lattice, fcoords1[start:stop],
+                                         fcoords2, m, num_threads)
+
+
 def find_in_coord_list_pbc(fcoord_list, fcoord, atol=1e-8):
     """
     Get the indices of all points in a fractional coord list that are
@@ -250,6 +315,26 @@ def in_coord_list_pbc(fcoord_list, fcoord, atol=1e-8):
     return len(find_in_coord_list_pbc(fcoord_list, fcoord, atol=atol)) > 0
 
 
+def coords_in_list_pbc(fcoords, fcoord_list, atol=1e-8):
+    """
+    Tests which of a set of fractional coords are within a fractional
+    coord list, taking into account periodic boundary conditions. This is
+    the vectorized version of in_coord_list_pbc for many coords at once,
+    and uses a PeriodicCoordIndex of the coord list.
+
+    Args:
+        fcoords (Mx3 array): Fractional coords to test.
+        fcoord_list (Nx3 array): List of fractional coords to test against.
+        atol (float or size 3 array): Absolute tolerance for each
+            component. Defaults to 1e-8.
+
+    Returns:
+        Boolean array of length M, True for the coords that are in the
+        coord list.
+    """
+    return PeriodicCoordIndex(fcoord_list, atol=atol).contains(fcoords)
+
+
 def is_coord_subset_pbc(subset, superset, atol=1e-8, mask=None):
     """
     Tests if all fractional coords in subset are contained in superset.
@@ -266,6 +351,9 @@ def is_coord_subset_pbc(subset, superset, atol=1e-8, mask=None):
     """
     c1 = np.array(subset, dtype=np.float64)
     c2 = np.array(superset, dtype=np.float64)
+    if mask is None and len(c1) * len(c2) > _MAX_DIRECT_PAIRS:
+        index = PeriodicCoordIndex(c2, atol=atol)
+        return bool(np.all(index.contains(c1, inclusive=True)))
     if mask is not None:
         m = np.array(mask, dtype=np.int)
     else:
@@ -274,6 +362,437 @@ def is_coord_subset_pbc(subset, superset, atol=1e-8, mask=None):
     return cuc.is_coord_subset_pbc(c1, c2, atol, m)
 
 
+class PeriodicCoordIndex(object):
+    """
+    Index of a list of fractional coords for finding the coords within a
+    tolerance of other coords, taking into account periodic boundary
+    conditions. The coords are hashed into a periodic grid of cells that
+    are at least 2 * atol wide, so that each lookup only compares against
+    the coords in the (at most 8) cells overlapping its tolerance box. This
+    makes many lookups against the same list close to linear in time,
+    whereas the *_pbc functions above compare against the whole list.
+
+    Coords can be added to the index, which allows a list of unique coords
+    to be built up incrementally, e.g.::
+
+        index = PeriodicCoordIndex(atol=1e-3)
+        for fcoord in fcoords:
+            if len(index.find(fcoord)) == 0:
+                index.add(fcoord)
+
+    Two coords match if the periodic difference of every component is less
+    than atol, as in find_in_coord_list_pbc.
+    """
+
+    # The number of cells along each axis is capped to bound the size of the
+    # lookup tables. Larger cells only cost extra comparisons.
+    max_cells = 100
+
+    def __init__(self, fcoords=None, atol=1e-8):
+        """
+        Args:
+            fcoords (Nx3 array): Initial fractional coords. Defaults to None,
+                i.e., an empty index.
+            atol (float or size 3 array): Absolute tolerance for each
+                component. Defaults to 1e-8.
+        """
+        self.atol = np.zeros(3) + atol
+        # The tolerance is padded slightly to be safe against rounding at
+        # the cell boundaries.
+        self._pad = self.atol * (1 + 1e-6) + 1e-12
+        self._ncells = np.clip(np.floor(0.5 / self._pad), 1,
+                               self.max_cells).astype(np.int64)
+        self._strides = np.array([self._ncells[1] * self._ncells[2],
+                                  self._ncells[2], 1], dtype=np.int64)
+        self._n = 0
+        self._coords = np.zeros((16, 3))
+        self._keys = np.zeros(16, dtype=np.int64)
+        # Lookup tables, built on first use. _cells maps each cell to the
+        # indices of its coords for single lookups, and _sorted holds the
+        # coords sorted by cell for batch lookups.
+        self._cells = None
+        self._sorted = None
+        if fcoords is not None:
+            self.add(fcoords)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def coords(self):
+        """
+        Copy of the indexed fractional coords as a Nx3 array.
+        """
+        return self._coords[:self._n].copy()
+
+    def add(self, fcoords):
+        """
+        Adds coords to the index. They are numbered after the existing
+        coords.
+
+        Args:
+            fcoords: A fractional coord or a list of fractional coords.
+        """
+        fcoords = np.array(fcoords, dtype=np.float64).reshape((-1, 3))
+        n = self._n + len(fcoords)
+        if n > len(self._coords):
+            size = max(n, 2 * len(self._coords))
+            coords = np.zeros((size, 3))
+            coords[:self._n] = self._coords[:self._n]
+            keys = np.zeros(size, dtype=np.int64)
+            keys[:self._n] = self._keys[:self._n]
+            self._coords, self._keys = coords, keys
+        keys = self._get_cell_keys(fcoords)
+        self._coords[self._n:n] = fcoords
+        self._keys[self._n:n] = keys
+        if self._cells is not None:
+            for i, k in enumerate(keys.tolist(), self._n):
+                self._cells.setdefault(k, []).append(i)
+        self._sorted = None
+        self._n = n
+
+    def find(self, fcoord):
+        """
+        Gets the indices of the indexed coords that match a coord.
+
+        Args:
+            fcoord: A specific fractional coord.
+
+        Returns:
+            Sorted array of the indices of the matches. Empty if not found.
+        """
+        fcoord = np.array(fcoord, dtype=np.float64).reshape((1, 3))
+        if self._cells is None:
+            self._cells = {}
+            for i, k in enumerate(self._keys[:self._n].tolist()):
+                self._cells.setdefault(k, []).append(i)
+        keys, distinct = self._get_neighbor_keys(fcoord)
+        candidates = []
+        for k, d in zip(keys[0].tolist(), distinct[0].tolist()):
+            if d:
+                candidates.extend(self._cells.get(k, []))
+        if not candidates:
+            return np.zeros(0, dtype=np.int_)
+        candidates = np.array(sorted(candidates), dtype=np.int_)
+        fdist = self._coords[candidates] - fcoord
+        fdist -= np.round(fdist)
+        return candidates[np.all(np.abs(fdist) < self.atol, axis=1)]
+
+    def find_pairs(self, fcoords, inclusive=False):
+        """
+        Finds all pairs of coords and matching indexed coords.
+
+        Args:
+            fcoords (Mx3 array): Fractional coords to look up.
+            inclusive (bool): Whether components that differ by exactly
+                atol also match, as in coord_list_mapping_pbc and
+                is_coord_subset_pbc. Defaults to False.
+
+        Returns:
+            (indices, matches) int arrays. fcoords[indices[n]] matches the
+            indexed coord matches[n]. The pairs are sorted by indices and
+            then by matches.
+        """
+        query = np.array(fcoords, dtype=np.float64).reshape((-1, 3))
+        ref = self._coords[:self._n]
+        compare = np.less_equal if inclusive else np.less
+        if len(query) == 0 or len(ref) == 0:
+            return np.zeros(0, dtype=np.int_), np.zeros(0, dtype=np.int_)
+        if len(query) * len(ref) <= _MAX_DIRECT_PAIRS:
+            d = query[:, None, :] - ref[None, :, :]
+            d -= np.round(d)
+            return np.nonzero(np.all(compare(np.abs(d), self.atol),
+                                     axis=-1))
+
+        if self._sorted is None:
+            keys = self._keys[:self._n]
+            order = np.argsort(keys, kind="mergesort")
+            counts = np.bincount(keys, minlength=np.prod(self._ncells))
+            self._sorted = (order, ref[order], counts,
+                            np.cumsum(counts) - counts)
+        order, ref, cell_counts, cell_starts = self._sorted
+
+        keys, distinct = self._get_neighbor_keys(query)
+        counts = np.where(distinct, cell_counts[keys], 0).ravel()
+        starts = cell_starts[keys].ravel()
+        q_inds = np.repeat(np.repeat(np.arange(len(query)), 8), counts)
+        block_starts = np.cumsum(counts) - counts
+        r_inds = np.arange(np.sum(counts)) + np.repeat(starts - block_starts,
+                                                       counts)
+        d = query[q_inds] - ref[r_inds]
+        d -= np.round(d)
+        close = np.all(compare(np.abs(d), self.atol), axis=1)
+        q_inds, r_inds = q_inds[close], order[r_inds[close]]
+        # Within the block of each coord, the cells are not in index order.
+        pair_order = np.lexsort((r_inds, q_inds))
+        return q_inds[pair_order], r_inds[pair_order]
+
+    def contains(self, fcoords, inclusive=False):
+        """
+        Tests which of a set of coords match any indexed coord.
+
+        Args:
+            fcoords (Mx3 array): Fractional coords to test.
+            inclusive (bool): Whether components that differ by exactly
+                atol also match. Defaults to False.
+
+        Returns:
+            Boolean array of length M.
+        """
+        fcoords = np.array(fcoords, dtype=np.float64).reshape((-1, 3))
+        q_inds, _ = self.find_pairs(fcoords, inclusive=inclusive)
+        return np.bincount(q_inds, minlength=len(fcoords)) > 0
+
+    def get_mapping(self, fcoords):
+        """
+        Gives the index mapping from a set of coords to the indexed coords,
+        with the same conventions as coord_list_mapping_pbc.
+
+        Args:
+            fcoords (Mx3 array): Fractional coords, each of which must match
+                exactly one indexed coord.
+
+        Returns:
+            Array of indices such that index.coords[indices] = fcoords
+        """
+        fcoords = np.array(fcoords, dtype=np.float64).reshape((-1, 3))
+        q_inds, r_inds = self.find_pairs(fcoords, inclusive=True)
+        counts = np.bincount(q_inds, minlength=len(fcoords))
+        bad = np.nonzero(counts != 1)[0]
+        if len(bad):
+            if counts[bad[0]] > 1:
+                raise ValueError("Something wrong with the inputs, likely "
+                                 "duplicates in superset")
+            raise ValueError("subset is not a subset of superset")
+        inds = np.zeros(len(fcoords), dtype=np.int_)
+        inds[q_inds] = r_inds
+        return inds
+
+    def _get_cell_keys(self, fcoords):
+        cells = np.floor((fcoords - np.floor(fcoords)) * self._ncells)
+        return np.dot(cells.astype(np.int64) % self._ncells, self._strides)
+
+    def _get_neighbor_keys(self, fcoords):
+        """
+        Keys of the cells overlapping the tolerance box of each coord, as a
+        Mx8 array, and a boolean mask of the distinct ones among them.
+        """
+        fcoords = fcoords - np.floor(fcoords)
+        # Each tolerance box overlaps at most two cells along each axis.
+        lo = np.floor((fcoords - self._pad) * self._ncells).astype(
+            np.int64) % self._ncells
+        hi = np.floor((fcoords + self._pad) * self._ncells).astype(
+            np.int64) % self._ncells
+        use_hi = np.array(list(itertools.product([False, True], repeat=3)))
+        cells = np.where(use_hi[None, :, :], hi[:, None, :], lo[:, None, :])
+        distinct = np.all(~use_hi[None, :, :] | (hi != lo)[:, None, :],
+                          axis=-1)
+        return np.dot(cells, self._strides), distinct
+
+
+# Default number of candidate pairs that iter_points_in_spheres examines at
+# once. Bounds the size of the temporary arrays for large outputs.
+_MAX_CANDIDATES = 2 ** 20
+
+
+def find_points_in_spheres(lattice, all_fcoords, center_coords, r,
+                           numerical_tol=1e-8, exclude_self=True):
+    """
+    Finds all points within a sphere of radius r around each of a set of
+    centers, taking into account periodic boundary conditions. See
+    :func:`iter_points_in_spheres` for details of the algorithm.
+
+    Args:
+        lattice (Lattice): Lattice to use.
+        all_fcoords (Nx3 array): Fractional coordinates of all points.
+        center_coords (Mx3 array): Cartesian coordinates of the centers.
+        r (float): Radius of the spheres.
+        numerical_tol (float): Tolerance for determining that a point
+            coincides with a center. Defaults to 1e-8.
+        exclude_self (bool): Whether to exclude points that coincide with
+            the center, i.e., points at distance <= numerical_tol. Defaults
+            to True.
+
+    Returns:
+        (center_indices, point_indices, images, distances) as flat numpy
+        arrays. The n-th pair found is the point all_fcoords[point_indices[n]]
+        translated by the lattice vector images[n], i.e., at fractional
+        coordinates all_fcoords[point_indices[n]] + images[n], lying at a
+        distance distances[n] from center_coords[center_indices[n]]. Pairs
+        are sorted by center index, then by point index and image.
+    """
+    chunks = list(iter_points_in_spheres(lattice, all_fcoords, center_coords,
+                                         r, numerical_tol=numerical_tol,
+                                         exclude_self=exclude_self))
+    if not chunks:
+        return (np.zeros(0, dtype=int), np.zeros(0, dtype=int),
+                np.zeros((0, 3), dtype=int), np.zeros(0))
+    return tuple(np.concatenate(a) for a in zip(*chunks))
+
+
+def iter_points_in_spheres(lattice, all_fcoords, center_coords, r,
+                           numerical_tol=1e-8, exclude_self=True,
+                           max_pairs=_MAX_CANDIDATES):
+    """
+    Iterates over all points within a sphere of radius r around each of a
+    set of centers, taking into account periodic boundary conditions. This
+    is a linked-cell (cell list) algorithm: the periodic images of the
+    points that can fall within r of any center are binned into a cartesian
+    grid of cubic cells of edge r, and each center is only compared against
+    the points in its own and the 26 adjacent cells. The cost therefore
+    scales linearly with the number of points and centers, rather than with
+    their product. Results are produced in chunks of consecutive centers, so
+    that arbitrarily many pairs can be processed in bounded memory.
+
+    Args:
+        lattice (Lattice): Lattice to use.
+        all_fcoords (Nx3 array): Fractional coordinates of all points.
+        center_coords (Mx3 array): Cartesian coordinates of the centers.
+        r (float): Radius of the spheres.
+        numerical_tol (float): Tolerance for determining that a point
+            coincides with a center. Defaults to 1e-8.
+        exclude_self (bool): Whether to exclude points that coincide with
+            the center, i.e., points at distance <= numerical_tol. Defaults
+            to True.
+        max_pairs (int): Approximate number of candidate pairs examined per
+            chunk. Consecutive centers are grouped into chunks so that the
+            memory used stays bounded for any number of points.
+
+    Yields:
+        (center_indices, point_indices, images, distances) as flat numpy
+        arrays for consecutive chunks of centers, with the same meaning as
+        the return value of :func:`find_points_in_spheres`. Each chunk is
+        sorted by center index, then by point index and image, and the
+        chunks come in order of increasing center index. Chunks without any
+        pairs are skipped.
+    """
+    fcoords = np.array(all_fcoords, dtype=np.float64).reshape((-1, 3))
+    centers = np.array(center_coords, dtype=np.float64).reshape((-1, 3))
+    r = float(r)
+    if len(fcoords) == 0 or len(centers) == 0 or r <= 0:
+        return
+
+    # Bring all points into the unit cell, remembering the translation.
+    offsets = np.floor(fcoords)
+    cart_in_cell = lattice.get_cartesian_coords(fcoords - offsets)
+
+    # Images of the unit cell that can contain points within r of a center.
+    recp_len = np.array(lattice.reciprocal_lattice.abc) / (2 * math.pi)
+    nmax = r * recp_len + 0.01
+    center_fcoords = lattice.get_fractional_coords(centers)
+    mins = np.floor(np.min(center_fcoords, axis=0) - nmax)
+    maxes = np.ceil(np.max(center_fcoords, axis=0) + nmax)
+    all_images = np.array(list(itertools.product(
+        *[np.arange(lo, hi) for lo, hi in zip(mins, maxes)])))
+
+    # Only keep images of points inside the bounding box of all spheres.
+    lower = np.min(centers, axis=0) - r
+    upper = np.max(centers, axis=0) + r
+    # Images are processed in blocks to bound the size of the arrays.
+    cart_images = lattice.get_cartesian_coords(all_images)
+    block = max(1, max_pairs // len(fcoords))
+    p_coords, p_indices, p_images = [], [], []
+    for i in range(0, len(all_images), block):
+        coords = cart_images[i:i + block, None, :] + cart_in_cell[None, :, :]
+        inside = np.all((coords >= lower) & (coords <= upper), axis=-1)
+        image_inds, point_inds = np.nonzero(inside)
+        p_coords.append(coords[inside])
+        p_indices.append(point_inds)
+        p_images.append(all_images[i:i + block][image_inds] -
+                        offsets[point_inds])
+    p_coords = np.concatenate(p_coords)
+    if len(p_coords) == 0:
+        return
+    p_indices = np.concatenate(p_indices)
+    p_images = np.concatenate(p_images)
+
+    # Bin the points into cubic cells with an edge of at least r. The edge
+    # is capped from below so that the number of cells stays bounded for
+    # very small r in very large boxes.
+    edge = max(r, np.max(upper - lower) / 1000)
+    ncells = np.floor((upper - lower) / edge).astype(np.int64) + 1
+    strides = np.array([ncells[1] * ncells[2], ncells[2], 1], dtype=np.int64)
+    p_cells = np.minimum(np.floor((p_coords - lower) / edge).astype(np.int64),
+                         ncells - 1)
+    p_ids = np.dot(p_cells, strides)
+    order = np.argsort(p_ids, kind="mergesort")
+    p_ids = p_ids[order]
+    p_coords = p_coords[order]
+    p_indices = p_indices[order]
+    p_images = p_images[order]
+
+    # Look up the 27 cells surrounding each center.
+    c_cells = np.floor((centers - lower) / edge).astype(np.int64)
+    shifts = np.array(list(itertools.product([-1, 0, 1], repeat=3)))
+    n_cells = c_cells[:, None, :] + shifts[None, :, :]
+    valid = np.all((n_cells >= 0) & (n_cells < ncells), axis=-1)
+    n_ids = np.dot(n_cells, strides)
+    starts = np.searchsorted(p_ids, n_ids, side="left")
+    ends = np.searchsorted(p_ids, n_ids, side="right")
+    counts = np.where(valid, ends - starts, 0)
+
+    # Expand the (center, cell) ranges into candidate pairs. Centers are
+    # processed in chunks so that the candidate arrays stay bounded in size.
+    center_ends = np.cumsum(np.sum(counts, axis=1))
+    first = 0
+    while first < len(centers):
+        done = center_ends[first - 1] if first else 0
+        last = max(first + 1, np.searchsorted(center_ends, done + max_pairs,
+                                              side="right"))
+        chunk_counts = counts[first:last].ravel()
+        chunk_starts = starts[first:last].ravel()
+        c_inds = np.repeat(np.repeat(np.arange(first, last), 27),
+                           chunk_counts)
+        block_starts = np.cumsum(chunk_counts) - chunk_counts
+        p_pos = np.arange(np.sum(chunk_counts)) + np.repeat(
+            chunk_starts - block_starts, chunk_counts)
+        dists = np.sqrt(np.sum((p_coords[p_pos] - centers[c_inds]) ** 2,
+                               axis=1))
+        within_r = dists <= r
+        if exclude_self:
+            within_r &= dists > numerical_tol
+        first = last
+        if not np.any(within_r):
+            continue
+        c_inds = c_inds[within_r]
+        p_pos = p_pos[within_r]
+        images = np.round(p_images[p_pos]).astype(int)
+        inds = p_indices[p_pos]
+        sort_inds = get_pair_order(c_inds, inds, images)
+        yield (c_inds[sort_inds], inds[sort_inds], images[sort_inds],
+               dists[within_r][sort_inds])
+
+
+def get_pair_order(center_indices, point_indices, images):
+    """
+    Returns the permutation that sorts (center, point, image) triplets, as
+    returned by find_points_in_spheres, by center index, then by point index
+    and then by image. The keys are packed into a single integer where
+    possible, which is much faster than a lexsort on large outputs.
+
+    Args:
+        center_indices (array): Center index of each triplet.
+        point_indices (array): Point index of each triplet.
+        images (Nx3 int array): Periodic image of each triplet.
+
+    Returns:
+        Array of indices that sorts the triplets.
+    """
+    if len(center_indices) == 0:
+        return np.zeros(0, dtype=int)
+    keys = [center_indices, point_indices] + [images[:, i] for i in range(3)]
+    key = np.zeros(len(center_indices), dtype=np.int64)
+    span = 1
+    for k in keys:
+        lo = np.min(k)
+        size = int(np.max(k)) - int(lo) + 1
+        span *= size
+        if span >= 2 ** 62:
+            return np.lexsort(tuple(reversed(keys)))
+        key = key * size + (k - lo)
+    return np.argsort(key)
+
+
 def lattice_points_in_supercell(supercell_matrix):
     """
     Returns the list of points on the original lattice contained in the
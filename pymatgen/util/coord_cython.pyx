@@ -22,6 +22,7 @@ from libc.stdlib cimport malloc, free
 from libc.math cimport round, fabs, sqrt, acos, M_PI, cos, sin
 cimport numpy as np
 cimport cython
+from cython.parallel import prange
 
 #create images, 2d array of all length 3 combinations of [-1,0,1]
 r = np.arange(-1, 2, dtype=np.float_)
@@ -314,3 +315,95 @@ def det3x3(matrix):
         return o_l
 =======
 >>>>>>> a41cc069c865a5d0f35d0731f92c547467395b1b
+
+
+cdef inline np.float_t _min_image_d2(np.float_t* c1, np.float_t* c2,
+                                     np.float_t* im) nogil:
+    """
+    Squared length of the shortest of the 27 images of the vector between
+    the cartesian points c1 and c2. im holds the 27 image translations.
+    """
+    cdef np.float_t pa = c2[0] - c1[0]
+    cdef np.float_t pb = c2[1] - c1[1]
+    cdef np.float_t pc = c2[2] - c1[2]
+    cdef np.float_t best = 1e100
+    cdef np.float_t da, db, dc, d
+    cdef int k
+    for k in range(27):
+        da = pa + im[3 * k]
+        db = pb + im[3 * k + 1]
+        dc = pc + im[3 * k + 2]
+        d = da * da + db * db + dc * dc
+        if d < best:
+            best = d
+    return best
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.initializedcheck(False)
+def pbc_shortest_d2(lattice, fcoords1, fcoords2, mask=None, int num_threads=1):
+    """
+    Returns the squared lengths of the shortest vectors between two lists of
+    coordinates taking into account periodic boundary conditions and the
+    lattice. This gives the same squared distances as pbc_shortest_vectors,
+    but does not allocate the (n1, n2, 3) array of vectors. The rows are
+    processed in parallel if pymatgen was built with OpenMP.
+
+    Args:
+        lattice: lattice to use
+        fcoords1: First set of fractional coordinates. e.g., [0.5, 0.6, 0.7]
+            or [[1.1, 1.2, 4.3], [0.5, 0.6, 0.7]].
+        fcoords2: Second set of fractional coordinates.
+        mask (int_ array): Mask of matches that are not allowed.
+            i.e. if mask[1,2] == True, then subset[1] cannot be matched
+            to superset[2]. Masked pairs get a squared distance of 1e20.
+        num_threads (int): Number of threads to use.
+
+    Returns:
+        array of squared distances from fcoords1 to fcoords2
+        first index is fcoords1 index, second is fcoords2 index
+    """
+    if num_threads < 1:
+        raise ValueError("num_threads must be at least 1")
+
+    fcoords1, fcoords2 = np.atleast_2d(fcoords1, fcoords2)
+    fcoords1 = lattice.get_lll_frac_coords(fcoords1)
+    fcoords2 = lattice.get_lll_frac_coords(fcoords2)
+
+    cdef np.float_t[:, ::1] lat = np.array(lattice.lll_matrix, dtype=np.float_, order='C')
+    cdef np.float_t[:, ::1] fc1 = np.ascontiguousarray(fcoords1, dtype=np.float_)
+    cdef np.float_t[:, ::1] fc2 = np.ascontiguousarray(fcoords2, dtype=np.float_)
+
+    cdef Py_ssize_t i, j
+    cdef Py_ssize_t I = fc1.shape[0]
+    cdef Py_ssize_t J = fc2.shape[0]
+
+    cdef np.float_t[:, ::1] cart_f1 = np.empty((I, 3))
+    cdef np.float_t[:, ::1] cart_f2 = np.empty((J, 3))
+    cdef np.float_t[:, ::1] cart_im = np.empty((27, 3))
+    dot_2d_mod(fc1, lat, cart_f1)
+    dot_2d_mod(fc2, lat, cart_f2)
+    dot_2d(images_view, lat, cart_im)
+
+    cdef bint has_mask = mask is not None
+    cdef np.int_t[:, ::1] m
+    if has_mask:
+        m = np.array(mask, dtype=np.int_, order='C')
+        if m.shape[0] != I or m.shape[1] != J:
+            raise ValueError("mask must have shape (len(fcoords1), "
+                             "len(fcoords2))")
+
+    d2 = np.empty((I, J))
+    cdef np.float_t[:, ::1] ds = d2
+    if I == 0 or J == 0:
+        return d2
+
+    for i in prange(I, nogil=True, num_threads=num_threads,
+                    schedule='static'):
+        for j in range(J):
+            if has_mask and m[i, j] != 0:
+                ds[i, j] = 1e20
+            else:
+                ds[i, j] = _min_image_d2(&cart_f1[i, 0], &cart_f2[j, 0],
+                                         &cart_im[0, 0])
+    return d2
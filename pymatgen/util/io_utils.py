@@ -3,12 +3,15 @@
 # Distributed under the terms of the MIT License.
 
 from __future__ import unicode_literals
+import collections
 import re
 import six
 import errno
 import os
 import tempfile
 import codecs
+import hashlib
+from six.moves import cPickle as pickle
 from monty.io import zopen
 
 """
@@ -193,3 +196,126 @@ class AtomicFile(object):
         if getattr(self, "_fp", None):  # constructor actually did something
             self.discard()
 >>>>>>> a41cc069c865a5d0f35d0731f92c547467395b1b
+
+
+class LazyMapping(collections.Mapping):
+    """
+    Read-only mapping that is only filled when first accessed, by calling a
+    loader function. Module-level data tables read from data files use it,
+    so that importing a module does not pay for parsing files that may
+    never be used.
+    """
+
+    def __init__(self, loader):
+        """
+        Args:
+            loader: Function without arguments that returns the mapping.
+        """
+        self._loader = loader
+        self._data = None
+
+    @property
+    def loaded(self):
+        """
+        True if the data has been loaded.
+        """
+        return self._data is not None
+
+    def _get_data(self):
+        if self._data is None:
+            self._data = self._loader()
+        return self._data
+
+    def __getitem__(self, key):
+        return self._get_data()[key]
+
+    def __contains__(self, key):
+        return key in self._get_data()
+
+    def __iter__(self):
+        return iter(self._get_data())
+
+    def __len__(self):
+        return len(self._get_data())
+
+    def __repr__(self):
+        return "LazyMapping(%s)" % (repr(self._data) if self.loaded
+                                    else "not loaded")
+
+
+def get_data_cache_dir():
+    """
+    Returns the directory of the compiled data file cache used by
+    load_data_file, which is given by the PMG_DATA_CACHE_DIR environment
+    variable. The cache is disabled, and None is returned, if the variable
+    is not set or empty.
+    """
+    return os.environ.get("PMG_DATA_CACHE_DIR") or None
+
+
+def load_data_file(filename, loader=None):
+    """
+    Loads a data file shipped with pymatgen, e.g., a json or yaml table,
+    optionally through a compiled cache. The cache is only used if the
+    PMG_DATA_CACHE_DIR environment variable is set. The first time a file is
+    loaded, the parsed data is then pickled into that directory. Later
+    loads, e.g., in other processes, unpickle it instead, which is much
+    faster than parsing text. Cache entries are keyed by the pymatgen
+    version, the loader and the size and modification time of the file, so
+    that they are invalidated automatically when any of them changes. If
+    the cache cannot be read or written, the file is simply parsed.
+
+    Since the cache entries are unpickled, PMG_DATA_CACHE_DIR must not be
+    writable by anyone the process does not trust.
+
+    Args:
+        filename (str): Path of the data file.
+        loader: Function taking the filename and returning the parsed data.
+            Defaults to monty.serialization.loadfn.
+
+    Returns:
+        The parsed data.
+    """
+    if loader is None:
+        from monty.serialization import loadfn as loader
+    cache_dir = get_data_cache_dir()
+    if cache_dir is None:
+        return loader(filename)
+
+    from pymatgen import __version__
+    st = os.stat(filename)
+    key = "%s %s %s %s.%s" % (st.st_size, st.st_mtime, __version__,
+                              loader.__module__, loader.__name__)
+    cache_file = os.path.join(cache_dir, "%s-%s.pickle" % (
+        os.path.basename(filename),
+        hashlib.sha1(key.encode("utf-8")).hexdigest()))
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # Missing or unreadable cache entries are simply rebuilt.
+        pass
+
+    data = loader(filename)
+    tempname = None
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        # Write to a temporary file first, so that concurrent processes
+        # never see a partially written entry.
+        fd, tempname = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tempname, cache_file)
+        tempname = None
+    except Exception:
+        # Failing to cache the data, e.g., because it cannot be pickled,
+        # only costs speed.
+        pass
+    finally:
+        if tempname is not None:
+            try:
+                os.remove(tempname)
+            except OSError:
+                pass
+    return data
@@ -116,6 +116,71 @@ class CoordUtilsTest(PymatgenTest):
         test_coord = [0.99, 0.99, 0.99]
         self.assertFalse(in_coord_list_pbc(coords, test_coord, atol=0.01))
 
+    def test_coords_in_list_pbc(self):
+        coords = [[0, 0, 0], [0.5, 0.5, 0.5]]
+        test_coords = [[0.1, 0.1, 0.1], [0.99, 0.99, 0.99], [1.5, 0.5, -0.5]]
+        self.assertArrayEqual(coords_in_list_pbc(test_coords, coords),
+                              [False, False, True])
+        self.assertArrayEqual(
+            coords_in_list_pbc(test_coords, coords, atol=[0.15, 0.15, 0.05]),
+            [False, True, True])
+        # large inputs are hashed, and must agree with the direct comparison
+        coords = np.random.uniform(-1, 2, (300, 3))
+        test_coords = np.concatenate([
+            coords + np.random.uniform(-0.05, 0.05, coords.shape),
+            np.random.uniform(-1, 2, (300, 3))])
+        d = test_coords[:, None, :] - coords[None, :, :]
+        d -= np.round(d)
+        self.assertArrayEqual(
+            coords_in_list_pbc(test_coords, coords, atol=0.03),
+            np.any(np.all(np.abs(d) < 0.03, axis=-1), axis=-1))
+
+    def test_periodic_coord_index(self):
+        coords = np.random.uniform(-1, 2, (300, 3))
+        test_coords = np.concatenate([
+            coords + np.random.uniform(-0.05, 0.05, coords.shape),
+            np.random.uniform(-1, 2, (300, 3))])
+        d = test_coords[:, None, :] - coords[None, :, :]
+        d -= np.round(d)
+        close = np.all(np.abs(d) < 0.03, axis=-1)
+
+        index = PeriodicCoordIndex(coords[:100], atol=0.03)
+        index.add(coords[100:])
+        self.assertEqual(len(index), 300)
+        self.assertArrayEqual(index.coords, coords)
+        i, j = index.find_pairs(test_coords)
+        self.assertArrayEqual(i, np.nonzero(close)[0])
+        self.assertArrayEqual(j, np.nonzero(close)[1])
+        self.assertArrayEqual(index.contains(test_coords), close.any(axis=1))
+        for n in [0, 5, 350, 599]:
+            self.assertArrayEqual(index.find(test_coords[n]),
+                                  np.nonzero(close[n])[0])
+        # Adding coords updates the lookup tables.
+        index.add(test_coords[599])
+        self.assertArrayEqual(index.find(test_coords[599]),
+                              list(np.nonzero(close[599])[0]) + [300])
+        self.assertTrue(index.contains(test_coords[599:])[0])
+
+        # Incremental removal of duplicates.
+        index = PeriodicCoordIndex(atol=1e-3)
+        for c in [[0.1, 0.2, 0.3], [1.1, 0.2, -0.7], [0.1, 0.2, 0.3005],
+                  [0.5, 0.5, 0.5], [0.9999, 0, 0], [0, 1, 0]]:
+            if len(index.find(c)) == 0:
+                index.add(c)
+        self.assertArrayEqual(index.coords, [[0.1, 0.2, 0.3], [0.5, 0.5, 0.5],
+                                             [0.9999, 0, 0]])
+
+        # Mappings of large inputs.
+        perm = np.random.permutation(300)
+        mapped = coords[perm] + np.random.randint(-2, 2, (300, 3))
+        self.assertArrayEqual(coord_list_mapping_pbc(mapped, coords), perm)
+        self.assertTrue(is_coord_subset_pbc(mapped, coords))
+        self.assertFalse(is_coord_subset_pbc(test_coords[300:], coords))
+        self.assertRaises(ValueError, coord_list_mapping_pbc,
+                          test_coords[300:], coords)
+        self.assertRaises(ValueError, coord_list_mapping_pbc, mapped,
+                          np.concatenate([coords, coords[:1]]))
+
     def test_find_in_coord_list_pbc(self):
         coords = [[0, 0, 0], [0.5, 0.5, 0.5]]
         test_coord = [0.1, 0.1, 0.1]
@@ -220,6 +285,62 @@ class CoordUtilsTest(PymatgenTest):
 
         coord.LOOP_THRESHOLD = prev_threshold
 
+    def test_pbc_shortest_d2(self):
+        lattice = Lattice.from_lengths_and_angles([8, 8, 4], [90, 76, 58])
+        fcoords1 = np.random.uniform(-1, 2, size=(30, 3))
+        fcoords2 = np.random.uniform(-1, 2, size=(40, 3))
+        mask = np.random.rand(30, 40) < 0.2
+        for m in [None, mask]:
+            v, d2 = pbc_shortest_vectors(lattice, fcoords1, fcoords2, m,
+                                         return_d2=True)
+            for num_threads in [1, 2]:
+                self.assertArrayEqual(
+                    pbc_shortest_d2(lattice, fcoords1, fcoords2, m,
+                                    num_threads=num_threads), d2)
+            blocks = list(iter_pbc_shortest_d2(lattice, fcoords1, fcoords2,
+                                               m, block_size=100))
+            self.assertEqual([b[0] for b in blocks], [0, 2, 4, 6, 8, 10, 12,
+                                                      14, 16, 18, 20, 22,
+                                                      24, 26, 28])
+            self.assertArrayEqual(np.concatenate([b[1] for b in blocks]), d2)
+        self.assertEqual(pbc_shortest_d2(lattice, [0.1, 0.2, 0.3],
+                                         [0.1, 0.2, 1.3]).shape, (1, 1))
+        self.assertRaises(ValueError, pbc_shortest_d2, lattice, fcoords1,
+                          fcoords2, mask[:5])
+        self.assertRaises(ValueError, pbc_shortest_d2, lattice, fcoords1,
+                          fcoords2, num_threads=0)
+
+    def test_find_points_in_spheres(self):
+        lattice = Lattice.from_lengths_and_angles([4, 5, 6], [80, 95, 110])
+        fcoords = np.random.uniform(-1, 2, size=(20, 3))
+        centers = lattice.get_cartesian_coords(fcoords[:5])
+        c_inds, p_inds, images, dists = find_points_in_spheres(
+            lattice, fcoords, centers, 4.5)
+        self.assertTrue(np.all(dists > 1e-8))
+        self.assertTrue(np.all(dists <= 4.5))
+        # distances must agree with the reported images
+        vecs = lattice.get_cartesian_coords(fcoords[p_inds] + images) - \
+            centers[c_inds]
+        self.assertArrayAlmostEqual(np.sum(vecs ** 2, axis=1) ** 0.5, dists)
+        # compare against brute force over periodic images
+        for i, center in enumerate(centers):
+            fcoord, dist, ind = lattice.get_points_in_sphere(
+                fcoords, center, 4.5, zip_results=False)
+            self.assertEqual(np.sum(c_inds == i), np.sum(dist > 1e-8))
+        # self-interactions are kept if requested
+        c_inds, p_inds, images, dists = find_points_in_spheres(
+            lattice, fcoords, centers, 4.5, exclude_self=False)
+        self.assertEqual(np.sum(dists < 1e-8), 5)
+        self.assertEqual(len(find_points_in_spheres(lattice, fcoords,
+                                                    centers, 0)[0]), 0)
+        # small chunks give the same pairs as a single pass
+        chunks = list(iter_points_in_spheres(lattice, fcoords, centers, 4.5,
+                                             max_pairs=10))
+        self.assertGreater(len(chunks), 1)
+        for a, b in zip(zip(*chunks), find_points_in_spheres(
+                lattice, fcoords, centers, 4.5)):
+            self.assertArrayAlmostEqual(np.concatenate(a), b)
+
     def test_get_angle(self):
         v1 = (1, 0, 0)
         v2 = (1, 1, 1)
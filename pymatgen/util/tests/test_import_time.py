@@ -0,0 +1,87 @@
+# coding: utf-8
+# Copyright (c) Pymatgen Development Team.
+# Distributed under the terms of the MIT License.
+
+from __future__ import division, unicode_literals
+
+import os
+import subprocess
+import sys
+import unittest
+
+import pymatgen
+from pymatgen.util.testing import PymatgenTest
+
+"""
+Import-time checks, which guard against heavy imports or data loading
+creeping back into the import path. The import-time budgets are only
+enforced when the PMG_TEST_IMPORT_TIME environment variable is set, since
+wall-clock timings depend on the machine running the tests.
+"""
+
+# Generous budgets (in s), a few times the import times recorded on a
+# developer machine (~0.005 s and ~0.3 s respectively).
+TOP_LEVEL_IMPORT_BUDGET = 0.05
+CORE_IMPORT_BUDGET = 1.5
+
+
+def run_in_subprocess(code):
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(
+        pymatgen.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(
+        [root] + [p for p in [env.get("PYTHONPATH")] if p])
+    return subprocess.check_output([sys.executable, "-c", code], env=env)\
+        .decode("utf-8").strip()
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 "Lazy module attributes require Python >= 3.7.")
+class ImportTimeTest(PymatgenTest):
+
+    def test_lazy_top_level(self):
+        out = run_in_subprocess(
+            "import sys; loaded = set(sys.modules); import pymatgen; "
+            "print(' '.join(m for m in ['numpy', 'pymatgen.core', "
+            "'pymatgen.ext.matproj', 'requests', 'ruamel.yaml'] "
+            "if m in sys.modules and m not in loaded))")
+        self.assertEqual(out, "")
+        from pymatgen import Structure, SETTINGS, MPRester
+        from pymatgen.core.structure import Structure as S
+        self.assertIs(Structure, S)
+        self.assertIsInstance(SETTINGS, dict)
+        self.assertIs(pymatgen.MPRester, MPRester)
+        self.assertIn("Composition", dir(pymatgen))
+        self.assertRaises(AttributeError, getattr, pymatgen, "spam")
+
+    def test_lazy_data(self):
+        out = run_in_subprocess(
+            "from pymatgen.analysis import bond_valence as bv; "
+            "from pymatgen.core import structure; "
+            "print(bv.BV_PARAMS.loaded, bv.PRIOR_PROB.loaded, "
+            "structure.FunctionalGroups.loaded)")
+        self.assertEqual(out, "False False False")
+
+    def test_star_import(self):
+        out = run_in_subprocess(
+            "from pymatgen import *; names = dir(); "
+            "print(all(n in names for n in ['Structure', 'Element', "
+            "'Composition', 'Lattice', 'Spin', 'MPRester', 'MSONable', "
+            "'SETTINGS', 'get_structure_from_mp']))")
+        self.assertEqual(out, "True")
+
+    @unittest.skipIf(not os.environ.get("PMG_TEST_IMPORT_TIME"),
+                     "PMG_TEST_IMPORT_TIME environment variable not set.")
+    def test_import_budget(self):
+        # Best of five, to reduce the effect of a busy machine.
+        for module, budget in [("pymatgen", TOP_LEVEL_IMPORT_BUDGET),
+                               ("pymatgen.core", CORE_IMPORT_BUDGET)]:
+            t = min(float(run_in_subprocess(
+                "import time; t = time.time(); import %s; "
+                "print(time.time() - t)" % module)) for i in range(5))
+            self.assertLess(t, budget,
+                            "Importing %s took %.3f s" % (module, t))
+
+
+if __name__ == "__main__":
+    unittest.main()
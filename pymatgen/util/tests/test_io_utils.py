@@ -18,9 +18,13 @@ __date__ = "Nov 14, 2012"
 
 import unittest
 import os
+import json
+import shutil
+import tempfile
 
 from pymatgen.util.testing import PymatgenTest
-from pymatgen.util.io_utils import micro_pyawk
+from pymatgen.util.io_utils import micro_pyawk, LazyMapping, \
+    load_data_file, get_data_cache_dir
 
 test_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..",
                         'test_files')
@@ -38,5 +42,81 @@ class FuncTest(PymatgenTest):
         micro_pyawk(filename, [["POTCAR:(.*)", f2, f]])
         self.assertEqual(len(data), 6)
 
+    def test_lazy_mapping(self):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return {"a": 1, "b": 2}
+
+        m = LazyMapping(load)
+        self.assertFalse(m.loaded)
+        self.assertEqual(calls, [])
+        self.assertIn("a", m)
+        self.assertEqual(m["b"], 2)
+        self.assertEqual(sorted(m.keys()), ["a", "b"])
+        self.assertEqual(len(m), 2)
+        self.assertTrue(m.loaded)
+        self.assertEqual(calls, [1])
+        self.assertRaises(KeyError, m.__getitem__, "c")
+
+    def test_load_data_file(self):
+        calls = []
+
+        def load(filename):
+            calls.append(filename)
+            with open(filename) as f:
+                return json.load(f)
+
+        tmp = tempfile.mkdtemp()
+        old = os.environ.get("PMG_DATA_CACHE_DIR")
+        try:
+            cache_dir = os.path.join(tmp, "cache")
+            os.environ["PMG_DATA_CACHE_DIR"] = cache_dir
+            self.assertEqual(get_data_cache_dir(), cache_dir)
+            fname = os.path.join(tmp, "data.json")
+            with open(fname, "w") as f:
+                json.dump({"a": [1, 2]}, f)
+            self.assertEqual(load_data_file(fname, load), {"a": [1, 2]})
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            # Served from the cache.
+            self.assertEqual(load_data_file(fname, load), {"a": [1, 2]})
+            self.assertEqual(len(calls), 1)
+
+            # Changed content invalidates the cache.
+            with open(fname, "w") as f:
+                json.dump({"a": [3]}, f)
+            self.assertEqual(load_data_file(fname, load), {"a": [3]})
+            self.assertEqual(len(calls), 2)
+
+            # Corrupt entries are rebuilt.
+            for f in os.listdir(cache_dir):
+                with open(os.path.join(cache_dir, f), "w") as fh:
+                    fh.write("junk")
+            self.assertEqual(load_data_file(fname, load), {"a": [3]})
+            self.assertEqual(len(calls), 3)
+
+            # Data that cannot be pickled is returned without leaving
+            # temporary files behind.
+            entries = sorted(os.listdir(cache_dir))
+            self.assertEqual(load_data_file(fname, lambda f: load), load)
+            self.assertEqual(sorted(os.listdir(cache_dir)), entries)
+
+            # The cache is disabled by default, or by an empty cache dir.
+            os.environ.pop("PMG_DATA_CACHE_DIR")
+            self.assertIsNone(get_data_cache_dir())
+            os.environ["PMG_DATA_CACHE_DIR"] = ""
+            self.assertIsNone(get_data_cache_dir())
+            self.assertEqual(load_data_file(fname, load), {"a": [3]})
+            self.assertEqual(load_data_file(fname, load), {"a": [3]})
+            self.assertEqual(len(calls), 5)
+        finally:
+            if old is None:
+                os.environ.pop("PMG_DATA_CACHE_DIR", None)
+            else:
+                os.environ["PMG_DATA_CACHE_DIR"] = old
+            shutil.rmtree(tmp)
+
 if __name__ == "__main__":
     unittest.main()
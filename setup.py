@@ -2,11 +2,20 @@
 # Copyright (c) Pymatgen Development Team.
 # Distributed under the terms of the MIT License.
 
+import os
 import sys
+import shutil
 import platform
+import tempfile
 
 from setuptools import setup, find_packages, Extension
 from setuptools.command.build_ext import build_ext as _build_ext
+from distutils.errors import CompileError, LinkError
+
+# Extensions with parallel loops, which are built with OpenMP if the
+# compiler supports it. Without it, these loops simply run on a single
+# thread.
+OPENMP_EXTENSIONS = ["pymatgen.util.coord_cython"]
 
 
 class build_ext(_build_ext):
@@ -30,6 +39,40 @@ class build_ext(_build_ext):
 
         self.include_dirs.append(numpy.get_include())
 
+    def build_extensions(self):
+        if self.has_openmp():
+            for ext in self.extensions:
+                if ext.name in OPENMP_EXTENSIONS:
+                    ext.extra_compile_args = ext.extra_compile_args + \
+                        ["-fopenmp"]
+                    ext.extra_link_args = ext.extra_link_args + ["-fopenmp"]
+        _build_ext.build_extensions(self)
+
+    def has_openmp(self):
+        """
+        Checks whether the compiler can build and link an OpenMP program
+        with -fopenmp. This fails, e.g., for clang without libomp, in which
+        case the extensions are built without OpenMP.
+        """
+        if self.compiler.compiler_type == "msvc":
+            return False
+        tmpdir = tempfile.mkdtemp()
+        try:
+            src = os.path.join(tmpdir, "test_openmp.c")
+            with open(src, "w") as f:
+                f.write("#include <omp.h>\n"
+                        "int main(void) { return omp_get_max_threads() < 1; }\n")
+            objs = self.compiler.compile([src], output_dir=tmpdir,
+                                         extra_postargs=["-fopenmp"])
+            self.compiler.link_executable(
+                objs, os.path.join(tmpdir, "test_openmp"),
+                extra_postargs=["-fopenmp"])
+            return True
+        except (CompileError, LinkError):
+            return False
+        finally:
+            shutil.rmtree(tmpdir)
+
 
 extra_link_args = []
 if sys.platform.startswith('win') and platform.machine().endswith('64'):